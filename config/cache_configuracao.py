@@ -0,0 +1,398 @@
+# config/cache_configuracao.py
+"""
+Cache em memória da configuração ativa da estufa.
+
+Responsabilidades:
+- Manter a configuração resolvida (preset + overrides + metadados) em memória,
+  alimentada por listeners `on_snapshot` do Firestore.
+- Entregar a configuração ao ciclo em O(1), sem nenhuma leitura de rede.
+- Versionar cada configuração e notificar ouvintes apenas quando ela muda.
+
+Documentos observados:
+- Dispositivos/{estufa_id}
+- Presets/{planta}/{fase}/Padrao (da planta/fase ativa)
+- Dispositivos/{estufa_id}/Dados/{categoria} (categorias com override)
+
+Fluxo esperado:
+- main → iniciar_cache_configuracao (publica o JSON local antes dos snapshots)
+- ciclo_estufa / teste_logger → obter_configuracao
+- após gravar uma nova fase → recarregar_configuracao
+"""
+
+import threading
+
+from config.firebase_config import firestore_db
+from config.cache_presets import cache_presets
+from config.configuracao_local import (
+    CAMPOS_OVERRIDE,
+    carregar_configuracao_local,
+    carregar_configuracao_salva,
+    montar_configuracao,
+    precisa_preset,
+    _salvar_local,
+    CAMINHO_CONFIGURACAO_ATIVA,
+)
+
+
+class ConfiguracaoImutavel(dict):
+    """
+    Configuração somente-leitura com número de versão.
+
+    Continua sendo um `dict` (os atuadores validam com `isinstance(config, dict)`),
+    mas bloqueia qualquer alteração para que a mesma instância possa ser
+    compartilhada entre threads sem cópias.
+    """
+
+    def __init__(self, dados, versao=0):
+        super().__init__(dados)
+        self.versao = versao
+
+    def _somente_leitura(self, *args, **kwargs):
+        raise TypeError("ConfiguracaoImutavel não pode ser alterada.")
+
+    __setitem__ = _somente_leitura
+    __delitem__ = _somente_leitura
+    __ior__ = _somente_leitura
+    clear = _somente_leitura
+    pop = _somente_leitura
+    popitem = _somente_leitura
+    setdefault = _somente_leitura
+    update = _somente_leitura
+
+    def copy(self):
+        """Retorna uma cópia mutável (dict comum)."""
+        return dict(self)
+
+    def __reduce__(self):
+        return (ConfiguracaoImutavel, (dict(self), self.versao))
+
+
+class CacheConfiguracao:
+    """
+    Cache da configuração ativa alimentado por snapshots do Firestore.
+
+    Uso:
+        cache = CacheConfiguracao("EG001")
+        cache.iniciar()
+        config = cache.obter()
+        cache.registrar_ouvinte(lambda nova, anterior: ...)
+    """
+
+    def __init__(self, estufa_id, caminho_arquivo=CAMINHO_CONFIGURACAO_ATIVA):
+        """
+        Parâmetros:
+            estufa_id (str): Identificador único da estufa.
+            caminho_arquivo (str): JSON local atualizado a cada mudança.
+        """
+        self.estufa_id = estufa_id
+        self.caminho_arquivo = caminho_arquivo
+
+        self._lock = threading.RLock()
+        self._configuracao = None
+        self._versao = 0
+        self._ouvintes = []
+
+        # Estado bruto recebido dos snapshots
+        self._dados_estufa = None
+        self._preset = None
+        self._preset_recebido = False
+        self._chave_preset = None
+        self._overrides = {}
+
+        # Watches ativos do Firestore
+        self._watch_estufa = None
+        self._watch_preset = None
+        self._watches_override = []
+
+    # ------------------------------------------------------------------
+    # API pública
+    # ------------------------------------------------------------------
+    def iniciar(self):
+        """
+        Publica a última configuração salva localmente (boot imediato, mesmo
+        sem rede) e ativa os listeners do documento da estufa e dos overrides.
+        """
+        self.carregar_arquivo_local()
+
+        try:
+            doc_estufa = firestore_db.collection("Dispositivos").document(
+                self.estufa_id
+            )
+            self._watch_estufa = doc_estufa.on_snapshot(self._ao_mudar_estufa)
+
+            for nome_categoria in CAMPOS_OVERRIDE:
+                doc_override = doc_estufa.collection("Dados").document(nome_categoria)
+                self._watches_override.append(
+                    doc_override.on_snapshot(
+                        self._criar_callback_override(nome_categoria)
+                    )
+                )
+        except Exception as e:
+            print(f"⚠️ Erro ao ativar listeners de configuração: {e}")
+
+    def parar(self):
+        """Cancela todos os listeners ativos."""
+        with self._lock:
+            watches = [self._watch_estufa, self._watch_preset] + self._watches_override
+            self._watch_estufa = None
+            self._watch_preset = None
+            self._watches_override = []
+
+        for watch in watches:
+            if watch:
+                try:
+                    watch.unsubscribe()
+                except Exception as e:
+                    print(f"⚠️ Erro ao cancelar listener de configuração: {e}")
+
+    def obter(self):
+        """
+        Retorna a configuração atual em memória (sem acesso à rede).
+
+        Retorna:
+            ConfiguracaoImutavel | None: None se nenhum snapshot chegou ainda.
+        """
+        return self._configuracao
+
+    @property
+    def versao(self):
+        """Versão da configuração atual (incrementa a cada mudança real)."""
+        return self._versao
+
+    def recarregar(self):
+        """
+        Força uma leitura bloqueante do Firestore e publica o resultado.
+
+        Usado logo após gravações feitas pelo próprio backend (ex.: avanço de
+        fase), quando o snapshot correspondente ainda não chegou.
+
+        Retorna:
+            ConfiguracaoImutavel | None: configuração atual após a leitura.
+        """
+        config = carregar_configuracao_local(self.estufa_id, self.caminho_arquivo)
+        if config is not None:
+            self._publicar(config, salvar=False)
+        return self._configuracao
+
+    def carregar_arquivo_local(self):
+        """
+        Publica a configuração persistida em disco, se o cache estiver vazio.
+
+        Retorna:
+            ConfiguracaoImutavel | None: configuração atual após a tentativa.
+        """
+        if self._configuracao is None:
+            config = carregar_configuracao_salva(self.caminho_arquivo)
+            if config is not None:
+                print("💾 Configuração carregada do arquivo local.")
+                self._publicar(config, salvar=False)
+        return self._configuracao
+
+    def registrar_ouvinte(self, callback):
+        """
+        Registra uma função chamada apenas quando a configuração muda.
+
+        Parâmetros:
+            callback (callable): recebe (config_nova, config_anterior).
+        """
+        with self._lock:
+            self._ouvintes.append(callback)
+
+    def remover_ouvinte(self, callback):
+        """Remove um ouvinte previamente registrado."""
+        with self._lock:
+            if callback in self._ouvintes:
+                self._ouvintes.remove(callback)
+
+    # ------------------------------------------------------------------
+    # Callbacks de snapshot (executados nas threads do Firestore)
+    # ------------------------------------------------------------------
+    def _ao_mudar_estufa(self, doc_snapshot, changes, read_time):
+        for doc in doc_snapshot:
+            with self._lock:
+                self._dados_estufa = doc.to_dict() if doc.exists else None
+                self._atualizar_watch_preset()
+            self._recalcular()
+
+    def _ao_mudar_preset(self, chave):
+        def callback(doc_snapshot, changes, read_time):
+            for doc in doc_snapshot:
+                with self._lock:
+                    # Ignora snapshots atrasados de um preset antigo
+                    if chave != self._chave_preset:
+                        return
+                    self._preset = doc.to_dict() if doc.exists else None
+                    self._preset_recebido = True
+                    preset = self._preset
+                # Mantém o cache de presets (fases, display) em dia
+                cache_presets.armazenar(*chave, preset)
+                self._recalcular()
+
+        return callback
+
+    def _criar_callback_override(self, nome_categoria):
+        def callback(doc_snapshot, changes, read_time):
+            for doc in doc_snapshot:
+                with self._lock:
+                    self._overrides[nome_categoria] = (
+                        doc.to_dict() if doc.exists else None
+                    )
+                self._recalcular()
+
+        return callback
+
+    # ------------------------------------------------------------------
+    # Internos
+    # ------------------------------------------------------------------
+    def _atualizar_watch_preset(self):
+        """Troca o listener de preset quando a planta/fase ativa muda."""
+        dados = self._dados_estufa
+        chave = None
+        if dados and precisa_preset(dados):
+            chave = (dados.get("PlantaAtual"), dados.get("FaseAtual"))
+
+        if chave == self._chave_preset:
+            return
+
+        if self._watch_preset:
+            try:
+                self._watch_preset.unsubscribe()
+            except Exception as e:
+                print(f"⚠️ Erro ao cancelar listener de preset: {e}")
+            self._watch_preset = None
+
+        self._chave_preset = chave
+        self._preset = None
+        self._preset_recebido = False
+
+        if chave:
+            planta, fase = chave
+            doc_preset = (
+                firestore_db.collection("Presets")
+                .document(planta)
+                .collection(fase)
+                .document("Padrao")
+            )
+            self._watch_preset = doc_preset.on_snapshot(self._ao_mudar_preset(chave))
+
+    def _recalcular(self):
+        """Resolve a configuração a partir do estado bruto e publica se mudou."""
+        with self._lock:
+            dados = self._dados_estufa
+            if dados is None:
+                return
+
+            # Aguarda o primeiro snapshot de todos os overrides
+            if len(self._overrides) < len(CAMPOS_OVERRIDE):
+                return
+
+            # Aguarda o snapshot do preset da nova planta/fase
+            if precisa_preset(dados) and not self._preset_recebido:
+                return
+
+            config = montar_configuracao(dados, self._preset, dict(self._overrides))
+
+        if config is not None:
+            self._publicar(config)
+
+    def _publicar(self, config, salvar=True):
+        """
+        Substitui a configuração atual se ela mudou e notifica os ouvintes.
+
+        Parâmetros:
+            config (dict): configuração resolvida.
+            salvar (bool): grava o JSON local (já gravado em `recarregar`).
+        """
+        with self._lock:
+            anterior = self._configuracao
+            if anterior is not None and dict(anterior) == config:
+                return
+
+            self._versao += 1
+            nova = ConfiguracaoImutavel(config, self._versao)
+            self._configuracao = nova
+            ouvintes = list(self._ouvintes)
+
+        if salvar:
+            _salvar_local(nova, self.caminho_arquivo)
+
+        for ouvinte in ouvintes:
+            try:
+                ouvinte(nova, anterior)
+            except Exception as e:
+                print(f"⚠️ Erro em ouvinte de configuração: {e}")
+
+
+# Instância única usada pelo backend
+_cache = None
+
+
+def iniciar_cache_configuracao(estufa_id):
+    """
+    Cria o cache da estufa e ativa os listeners do Firestore.
+
+    Parâmetros:
+        estufa_id (str): Identificador único da estufa.
+
+    Retorna:
+        CacheConfiguracao: instância ativa.
+    """
+    global _cache
+    if _cache is None or _cache.estufa_id != estufa_id:
+        if _cache:
+            _cache.parar()
+        _cache = CacheConfiguracao(estufa_id)
+        _cache.iniciar()
+    return _cache
+
+
+def obter_configuracao(estufa_id):
+    """
+    Retorna a configuração ativa em memória.
+
+    Se o cache ainda não recebeu nenhum snapshot (ou não foi iniciado),
+    faz uma única leitura bloqueante para preenchê-lo; se o Firestore
+    estiver indisponível, usa a última configuração salva em disco.
+
+    Parâmetros:
+        estufa_id (str): Identificador único da estufa.
+
+    Retorna:
+        ConfiguracaoImutavel | None: configuração ativa ou None em caso de erro.
+    """
+    global _cache
+    if _cache is None or _cache.estufa_id != estufa_id:
+        _cache = CacheConfiguracao(estufa_id)
+
+    config = _cache.obter()
+    if config is None:
+        config = _cache.recarregar() or _cache.carregar_arquivo_local()
+    return config
+
+
+def recarregar_configuracao(estufa_id):
+    """
+    Força a leitura da configuração no Firestore e atualiza o cache.
+
+    Parâmetros:
+        estufa_id (str): Identificador único da estufa.
+
+    Retorna:
+        ConfiguracaoImutavel | None: configuração atualizada.
+    """
+    global _cache
+    if _cache is None or _cache.estufa_id != estufa_id:
+        _cache = CacheConfiguracao(estufa_id)
+    return _cache.recarregar()
+
+
+def registrar_ouvinte_configuracao(callback):
+    """
+    Registra um ouvinte de mudanças de configuração no cache ativo.
+
+    Parâmetros:
+        callback (callable): recebe (config_nova, config_anterior).
+    """
+    if _cache is None:
+        raise RuntimeError("Cache de configuração não iniciado.")
+    _cache.registrar_ouvinte(callback)
@@ -0,0 +1,198 @@
+# config/cache_presets.py
+"""
+Cache de presets de cultivo (Presets/{planta}/{fase}/Padrao).
+
+Responsabilidades:
+- Evitar leituras repetidas do mesmo preset (ciclo, display e agendamento
+  consultam o mesmo DiasNaEtapa várias vezes por ciclo).
+- Invalidar entradas por TTL. A entrada do preset ativo é atualizada pelo
+  snapshot que o CacheConfiguracao já mantém (um único listener de preset,
+  em vez de um por entrada do cache).
+- Limitar o tamanho com despejo LRU.
+- Pré-carregar todas as fases da planta ativa em uma única leitura em lote.
+"""
+
+import threading
+import time
+from collections import OrderedDict
+
+from config.firebase_config import firestore_db
+
+# Ordem das fases do ciclo de cultivo
+ORDEM_FASES = ["Germinacao", "Crescimento", "Floracao", "Colheita"]
+
+
+def _referencia_preset(db, planta, fase):
+    """Retorna a referência do documento Presets/{planta}/{fase}/Padrao."""
+    return db.collection("Presets").document(planta).collection(fase).document("Padrao")
+
+
+class CachePresets:
+    """
+    Cache LRU de presets com TTL.
+
+    Presets inexistentes também são armazenados (como None), para que
+    consultas como a da fase Colheita não voltem à rede a cada ciclo.
+
+    Uso:
+        cache = CachePresets()
+        cache.pre_carregar("Alface")
+        preset = cache.obter("Alface", "Germinacao")
+        print(cache.estatisticas())
+    """
+
+    def __init__(self, ttl=3600, tamanho_maximo=32, db=None):
+        """
+        Parâmetros:
+            ttl (float): validade de cada entrada em segundos.
+            tamanho_maximo (int): número máximo de presets em memória.
+            db (Client|None): cliente Firestore (default = `firestore_db`).
+        """
+        self.ttl = ttl
+        self.tamanho_maximo = tamanho_maximo
+        self.db = db if db is not None else firestore_db
+
+        self._lock = threading.Lock()
+        # (planta, fase) → [preset, instante]
+        self._itens = OrderedDict()
+
+        self.acertos = 0
+        self.falhas = 0
+        self.despejos = 0
+        self.invalidacoes = 0
+
+    def obter(self, planta, fase):
+        """
+        Retorna o preset da planta/fase (do cache quando possível).
+
+        Parâmetros:
+            planta (str): Nome da planta.
+            fase (str): Nome da fase.
+
+        Retorna:
+            dict | None: cópia do preset ou None se não existir/erro.
+        """
+        chave = (planta, fase)
+        with self._lock:
+            item = self._itens.get(chave)
+            if item is not None and time.monotonic() - item[1] < self.ttl:
+                self._itens.move_to_end(chave)
+                self.acertos += 1
+                return dict(item[0]) if item[0] is not None else None
+            self.falhas += 1
+
+        try:
+            doc = _referencia_preset(self.db, planta, fase).get()
+        except Exception as e:
+            print(f"⚠️ Erro ao carregar preset {planta}/{fase}: {e}")
+            return None
+
+        preset = doc.to_dict() if doc.exists else None
+        self.armazenar(planta, fase, preset)
+        return dict(preset) if preset is not None else None
+
+    def contem(self, planta, fase):
+        """
+        Indica se há uma entrada válida (dentro do TTL) sem contar acerto/falha.
+
+        Retorna:
+            bool: True se o preset pode ser servido do cache.
+        """
+        with self._lock:
+            item = self._itens.get((planta, fase))
+            return item is not None and time.monotonic() - item[1] < self.ttl
+
+    def pre_carregar(self, planta, fases=ORDEM_FASES):
+        """
+        Carrega todas as fases da planta em uma única leitura em lote.
+
+        Parâmetros:
+            planta (str): Nome da planta.
+            fases (list[str]): fases a carregar (default = ciclo completo).
+
+        Retorna:
+            int: número de presets encontrados.
+        """
+        refs = {fase: _referencia_preset(self.db, planta, fase) for fase in fases}
+        fase_por_caminho = {ref.path: fase for fase, ref in refs.items()}
+        try:
+            encontrados = 0
+            for doc in self.db.get_all(list(refs.values())):
+                fase = fase_por_caminho.get(doc.reference.path)
+                if fase is None:
+                    continue
+                preset = doc.to_dict() if doc.exists else None
+                self.armazenar(planta, fase, preset)
+                if preset is not None:
+                    encontrados += 1
+            print(f"📦 Presets de '{planta}' pré-carregados ({encontrados} fases).")
+            return encontrados
+        except Exception as e:
+            print(f"⚠️ Erro ao pré-carregar presets de {planta}: {e}")
+            return 0
+
+    def invalidar(self, planta=None, fase=None):
+        """
+        Remove entradas do cache.
+
+        Parâmetros:
+            planta (str|None): remove apenas desta planta (None = todas).
+            fase (str|None): remove apenas desta fase (None = todas).
+        """
+        with self._lock:
+            chaves = [
+                chave
+                for chave in self._itens
+                if (planta is None or chave[0] == planta)
+                and (fase is None or chave[1] == fase)
+            ]
+            for chave in chaves:
+                del self._itens[chave]
+            self.invalidacoes += len(chaves)
+
+    def estatisticas(self):
+        """
+        Retorna contadores de uso do cache.
+
+        Retorna:
+            dict: acertos, falhas, taxa de acerto, tamanho, despejos e invalidações.
+        """
+        with self._lock:
+            total = self.acertos + self.falhas
+            return {
+                "acertos": self.acertos,
+                "falhas": self.falhas,
+                "taxa_acerto": self.acertos / total if total else None,
+                "tamanho": len(self._itens),
+                "despejos": self.despejos,
+                "invalidacoes": self.invalidacoes,
+            }
+
+    def armazenar(self, planta, fase, preset):
+        """
+        Grava/atualiza uma entrada e aplica o LRU.
+
+        Também chamado pelo snapshot do preset ativo (CacheConfiguracao).
+
+        Parâmetros:
+            planta (str): Nome da planta.
+            fase (str): Nome da fase.
+            preset (dict|None): preset lido (None = inexistente).
+        """
+        chave = (planta, fase)
+        with self._lock:
+            item = self._itens.get(chave)
+            if item is not None:
+                item[0] = preset
+                item[1] = time.monotonic()
+                self._itens.move_to_end(chave)
+            else:
+                self._itens[chave] = [preset, time.monotonic()]
+
+            while len(self._itens) > self.tamanho_maximo:
+                self._itens.popitem(last=False)
+                self.despejos += 1
+
+
+# Instância única usada pelo backend
+cache_presets = CachePresets()
@@ -1,132 +1,229 @@
 # config/configuracao_local.py
 from config.firebase_config import firestore_db
+from config.cache_presets import CachePresets, cache_presets
 import os
 from datetime import datetime, timezone
+import hashlib
 import json
+import tempfile
 
+# Arquivo local com a última configuração ativa
+CAMINHO_CONFIGURACAO_ATIVA = os.path.join(
+    os.path.dirname(__file__), "configuracao_ativa.json"
+)
 
-def carregar_configuracao_local(estufa_id, caminho_arquivo=None):
+# Categorias que podem ter override → campo desejado correspondente
+CAMPOS_OVERRIDE = {
+    "Temperatura": "TemperaturaDesejada",
+    "TemperaturaDoSolo": "TemperaturaDoSoloDesejada",
+    "Umidade": "UmidadeDesejada",
+    "UmidadeDoSolo": "UmidadeDoSoloDesejada",
+    "Luminosidade": "LuminosidadeDesejada",
+}
+
+# Caminho → (hash, versão) do último conteúdo gravado em disco
+_estado_arquivos = {}
+
+# Última planta/fase lida → permite incluir o preset no mesmo lote
+_ultima_chave_preset = None
+
+
+def precisa_preset(dados_estufa):
     """
-    Carrega a configuração ativa da estufa a partir do Firestore,
-    aplicando overrides e salvando localmente em JSON.
+    Indica se a planta/fase do documento da estufa exige um preset.
+
+    Parâmetros:
+        dados_estufa (dict): documento `Dispositivos/{estufa_id}`.
+
+    Retorna:
+        bool: False para Standby/Colheita (config mínima), True caso contrário.
+    """
+    planta = dados_estufa.get("PlantaAtual")
+    fase = dados_estufa.get("FaseAtual")
+    return not (planta == "Standby" or fase == "Standby" or fase == "Colheita")
+
+
+def montar_configuracao(dados_estufa, preset, overrides):
+    """
+    Aplica as regras de resolução da configuração ativa sem acessar a rede.
 
     Regras:
       - Standby → retorna config mínima (sem preset, sistema inativo).
       - Colheita → retorna config mínima (sistema inativo).
-      - Outras fases → carrega preset padrão + aplica overrides.
+      - Outras fases → preset padrão + overrides ativos + metadados.
+
+    Parâmetros:
+        dados_estufa (dict|None): documento `Dispositivos/{estufa_id}`.
+        preset (dict|None): preset `Presets/{planta}/{fase}/Padrao`.
+        overrides (dict): categoria → dict do documento
+            `Dispositivos/{estufa_id}/Dados/{categoria}` (ou None).
+
+    Retorna:
+        dict | None: configuração final ou None se os dados forem insuficientes.
+    """
+    if not dados_estufa:
+        print("🚫 Estufa não encontrada no Firestore.")
+        return None
+
+    planta = dados_estufa.get("PlantaAtual")
+    fase = dados_estufa.get("FaseAtual")
+
+    if not planta or not fase:
+        print("🚫 Campos PlantaAtual ou FaseAtual não definidos.")
+        return None
+
+    # 🛑 Standby
+    if planta == "Standby" or fase == "Standby":
+        return {
+            "FaseAtual": "Standby",
+            "EstadoSistema": False,
+            "PlantaAtual": "Standby",
+        }
+
+    # 🌾 Colheita
+    if fase == "Colheita":
+        return {
+            "FaseAtual": "Colheita",
+            "EstadoSistema": False,
+            "PlantaAtual": planta,
+        }
+
+    # 📦 Preset da planta/fase
+    if preset is None:
+        print(f"🚫 Preset da fase '{fase}' para planta '{planta}' não encontrado.")
+        return None
+
+    config_final = dict(preset)
+
+    # 🛠️ Overrides aplicáveis
+    for nome_categoria, campo_desejado in CAMPOS_OVERRIDE.items():
+        if dados_estufa.get(f"Override{nome_categoria}", False):
+            doc_override = overrides.get(nome_categoria)
+            if doc_override:
+                valor = doc_override.get(campo_desejado)
+                if valor is not None:
+                    config_final[campo_desejado] = valor
+
+    # 🔄 Metadados adicionais
+    config_final.update(
+        {
+            "EstadoSistema": dados_estufa.get("EstadoSistema", False),
+            "PlantaAtual": planta,
+            "FaseAtual": fase,
+            "OverrideTemperatura": dados_estufa.get("OverrideTemperatura", False),
+            "OverrideTemperaturaDoSolo": dados_estufa.get(
+                "OverrideTemperaturaDoSolo", False
+            ),
+            "OverrideUmidade": dados_estufa.get("OverrideUmidade", False),
+            "OverrideUmidadeDoSolo": dados_estufa.get("OverrideUmidadeDoSolo", False),
+            "OverrideLuminosidade": dados_estufa.get("OverrideLuminosidade", False),
+            "ForcarAvancoFase": dados_estufa.get("ForcarAvancoFase", False),
+        }
+    )
+
+    # ⏱️ Timestamp
+    ts_raw = dados_estufa.get("InicioFaseTimestamp")
+    if isinstance(ts_raw, datetime):
+        config_final["InicioFaseTimestamp"] = ts_raw.replace(
+            tzinfo=timezone.utc
+        ).isoformat()
+    else:
+        config_final["InicioFaseTimestamp"] = None
+
+    return config_final
+
+
+def carregar_configuracao_local(estufa_id, caminho_arquivo=None, db=None, presets=None):
+    """
+    Carrega a configuração ativa da estufa a partir do Firestore,
+    aplicando overrides e salvando localmente em JSON.
+
+    Leitura em lote:
+      - O documento da estufa, os cinco documentos de override e o preset da
+        última planta/fase conhecida são buscados com um único `get_all`
+        (~1 RTT em vez de até 7 leituras sequenciais).
+      - Se o preset já estiver no cache, ele não entra no lote.
+      - Se a planta/fase mudou desde a última leitura, o preset correto é
+        buscado em seguida (leitura extra apenas nesse caso).
+
+    As regras de resolução ficam em `montar_configuracao`.
 
     Parâmetros:
         estufa_id (str): Identificador único da estufa.
         caminho_arquivo (str|None): Caminho para salvar o JSON local.
             Se None, usa automaticamente `config/configuracao_ativa.json`.
+        db (Client|None): cliente Firestore (default = `firestore_db`).
+        presets (CachePresets|None): cache de presets (default =
+            `cache_presets`; com `db` informado, um cache novo sobre o mesmo
+            cliente, para que nenhuma leitura saia do `db` injetado).
 
     Retorna:
         dict | None: configuração final ou None em caso de erro.
     """
+    global _ultima_chave_preset
+
     if caminho_arquivo is None:
-        caminho_arquivo = os.path.join(
-            os.path.dirname(__file__), "configuracao_ativa.json"
-        )
+        caminho_arquivo = CAMINHO_CONFIGURACAO_ATIVA
+    if presets is None:
+        presets = cache_presets if db is None else CachePresets(db=db)
+    if db is None:
+        db = firestore_db
 
     try:
-        # 🔍 Busca documento principal da estufa
-        doc_estufa = firestore_db.collection("Dispositivos").document(estufa_id).get()
-        if not doc_estufa.exists:
-            print("🚫 Estufa não encontrada no Firestore.")
-            return None
+        # 🔍 Referências do lote: estufa + overrides (+ preset presumido)
+        ref_estufa = db.collection("Dispositivos").document(estufa_id)
+        refs_override = {
+            nome_categoria: ref_estufa.collection("Dados").document(nome_categoria)
+            for nome_categoria in CAMPOS_OVERRIDE
+        }
+        refs = [ref_estufa, *refs_override.values()]
 
-        dados_estufa = doc_estufa.to_dict()
-        planta = dados_estufa.get("PlantaAtual")
-        fase = dados_estufa.get("FaseAtual")
+        chave_presumida = _ultima_chave_preset
+        ref_preset = None
+        if chave_presumida and not presets.contem(*chave_presumida):
+            planta, fase = chave_presumida
+            ref_preset = (
+                db.collection("Presets")
+                .document(planta)
+                .collection(fase)
+                .document("Padrao")
+            )
+            refs.append(ref_preset)
 
-        if not planta or not fase:
-            print("🚫 Campos PlantaAtual ou FaseAtual não definidos.")
-            return None
+        docs = {doc.reference.path: doc for doc in db.get_all(refs)}
 
-        # 🛑 Standby
-        if planta == "Standby" or fase == "Standby":
-            config_final = {
-                "FaseAtual": "Standby",
-                "EstadoSistema": False,
-                "PlantaAtual": "Standby",
-            }
-            _salvar_local(config_final, caminho_arquivo)
-            return config_final
-
-        # 🌾 Colheita
-        if fase == "Colheita":
-            config_final = {
-                "FaseAtual": "Colheita",
-                "EstadoSistema": False,
-                "PlantaAtual": planta,
-            }
-            _salvar_local(config_final, caminho_arquivo)
-            return config_final
-
-        # 📦 Preset da planta/fase
-        doc_preset = (
-            firestore_db.collection("Presets")
-            .document(planta)
-            .collection(fase)
-            .document("Padrao")
-            .get()
+        doc_estufa = docs.get(ref_estufa.path)
+        dados_estufa = (
+            doc_estufa.to_dict() if doc_estufa and doc_estufa.exists else None
         )
-        if not doc_preset.exists:
-            print(f"🚫 Preset da fase '{fase}' para planta '{planta}' não encontrado.")
-            return None
 
-        config_final = doc_preset.to_dict()
+        if ref_preset is not None:
+            doc_preset = docs.get(ref_preset.path)
+            if doc_preset is not None:
+                presets.armazenar(
+                    *chave_presumida,
+                    doc_preset.to_dict() if doc_preset.exists else None,
+                )
 
-        # 🛠️ Overrides aplicáveis
-        campos_override = {
-            "Temperatura": "TemperaturaDesejada",
-            "TemperaturaDoSolo": "TemperaturaDoSoloDesejada",
-            "Umidade": "UmidadeDesejada",
-            "UmidadeDoSolo": "UmidadeDoSoloDesejada",
-            "Luminosidade": "LuminosidadeDesejada",
-        }
+        # 🧩 Mescla tudo em uma única passada
+        preset = None
+        overrides = {}
+        if dados_estufa and precisa_preset(dados_estufa):
+            planta = dados_estufa.get("PlantaAtual")
+            fase = dados_estufa.get("FaseAtual")
+            _ultima_chave_preset = (planta, fase)
 
-        for nome_categoria, campo_desejado in campos_override.items():
-            if dados_estufa.get(f"Override{nome_categoria}", False):
-                doc_override = (
-                    firestore_db.collection("Dispositivos")
-                    .document(estufa_id)
-                    .collection("Dados")
-                    .document(nome_categoria)
-                    .get()
-                )
-                if doc_override.exists:
-                    valor = doc_override.get(campo_desejado)
-                    if valor is not None:
-                        config_final[campo_desejado] = valor
-
-        # 🔄 Metadados adicionais
-        config_final.update(
-            {
-                "EstadoSistema": dados_estufa.get("EstadoSistema", False),
-                "PlantaAtual": planta,
-                "FaseAtual": fase,
-                "OverrideTemperatura": dados_estufa.get("OverrideTemperatura", False),
-                "OverrideTemperaturaDoSolo": dados_estufa.get(
-                    "OverrideTemperaturaDoSolo", False
-                ),
-                "OverrideUmidade": dados_estufa.get("OverrideUmidade", False),
-                "OverrideUmidadeDoSolo": dados_estufa.get(
-                    "OverrideUmidadeDoSolo", False
-                ),
-                "OverrideLuminosidade": dados_estufa.get("OverrideLuminosidade", False),
-                "ForcarAvancoFase": dados_estufa.get("ForcarAvancoFase", False),
-            }
-        )
+            # 📦 Preset da planta/fase (cache, já abastecido pelo lote)
+            preset = presets.obter(planta, fase)
 
-        # ⏱️ Timestamp
-        ts_raw = dados_estufa.get("InicioFaseTimestamp")
-        if isinstance(ts_raw, datetime):
-            config_final["InicioFaseTimestamp"] = ts_raw.replace(
-                tzinfo=timezone.utc
-            ).isoformat()
-        else:
-            config_final["InicioFaseTimestamp"] = None
+            for nome_categoria, ref_override in refs_override.items():
+                doc_override = docs.get(ref_override.path)
+                if doc_override is not None and doc_override.exists:
+                    overrides[nome_categoria] = doc_override.to_dict()
+
+        config_final = montar_configuracao(dados_estufa, preset, overrides)
+        if config_final is None:
+            return None
 
         # 💾 Salva local
         _salvar_local(config_final, caminho_arquivo)
@@ -142,6 +239,9 @@ def carregar_preset(planta, fase):
     """
     Retorna o dicionário do preset da planta/fase ou None se não existir.
 
+    A leitura passa pelo cache de presets (TTL + snapshot), então chamadas
+    repetidas no mesmo ciclo não acessam a rede.
+
     Parâmetros:
         planta (str): Nome da planta.
         fase (str): Nome da fase ("Germinacao", "Crescimento", etc.).
@@ -149,30 +249,134 @@ def carregar_preset(planta, fase):
     Retorna:
         dict | None: configuração padrão da planta/fase ou None se não encontrada.
     """
+    return cache_presets.obter(planta, fase)
+
+
+def _hash_configuracao(config):
+    """Hash SHA-256 do conteúdo canônico (chaves ordenadas) da configuração."""
+    conteudo = json.dumps(config, sort_keys=True, separators=(",", ":"), default=str)
+    return hashlib.sha256(conteudo.encode("utf-8")).hexdigest()
+
+
+def _ler_arquivo_local(caminho_arquivo):
+    """
+    Lê o JSON local, aceitando o formato antigo (config pura) e o novo
+    (envelope com Versao/SalvoEm/Hash/Configuracao).
+
+    Retorna:
+        dict | None: envelope normalizado ou None se ausente/corrompido.
+    """
     try:
-        doc = (
-            firestore_db.collection("Presets")
-            .document(planta)
-            .collection(fase)
-            .document("Padrao")
-            .get()
-        )
-        return doc.to_dict() if doc.exists else None
+        with open(caminho_arquivo, "r") as f:
+            dados = json.load(f)
+    except FileNotFoundError:
+        return None
     except Exception as e:
-        print(f"⚠️ Erro ao carregar preset {planta}/{fase}: {e}")
+        print(f"⚠️ Config local ilegível ({caminho_arquivo}): {e}")
+        return None
+
+    if not isinstance(dados, dict):
+        return None
+    if "Configuracao" not in dados:
+        return {
+            "Versao": 0,
+            "SalvoEm": None,
+            "Hash": _hash_configuracao(dados),
+            "Configuracao": dados,
+        }
+    return dados
+
+
+def carregar_configuracao_salva(caminho_arquivo=None):
+    """
+    Retorna a última configuração persistida localmente.
+
+    Usada no boot quando o Firestore está indisponível, para que o ciclo
+    comece imediatamente com o último estado conhecido.
+
+    Parâmetros:
+        caminho_arquivo (str|None): default = `config/configuracao_ativa.json`.
+
+    Retorna:
+        dict | None: configuração salva ou None se não houver arquivo válido.
+    """
+    if caminho_arquivo is None:
+        caminho_arquivo = CAMINHO_CONFIGURACAO_ATIVA
+
+    envelope = _ler_arquivo_local(caminho_arquivo)
+    if not envelope or not isinstance(envelope.get("Configuracao"), dict):
         return None
 
+    _estado_arquivos[caminho_arquivo] = (
+        envelope.get("Hash"),
+        envelope.get("Versao", 0),
+    )
+    return envelope["Configuracao"]
+
 
 def _salvar_local(config, caminho_arquivo):
     """
-    Salva a configuração em arquivo JSON local.
+    Salva a configuração em arquivo JSON local, apenas se ela mudou.
+
+    Escrita atômica: grava em arquivo temporário no mesmo diretório,
+    faz fsync e troca com `os.replace` (um crash nunca deixa o arquivo
+    truncado). Cada gravação incrementa a versão e registra o horário.
 
     Parâmetros:
         config (dict): configuração da estufa.
         caminho_arquivo (str): caminho para salvar o JSON.
+
+    Retorna:
+        bool: True se o arquivo foi regravado, False se não mudou ou erro.
     """
     try:
-        with open(caminho_arquivo, "w") as f:
-            json.dump(config, f, indent=4)
+        hash_novo = _hash_configuracao(config)
+
+        if caminho_arquivo not in _estado_arquivos:
+            envelope = _ler_arquivo_local(caminho_arquivo) or {}
+            _estado_arquivos[caminho_arquivo] = (
+                envelope.get("Hash"),
+                envelope.get("Versao", 0),
+            )
+
+        hash_salvo, versao = _estado_arquivos[caminho_arquivo]
+        if hash_novo == hash_salvo:
+            return False
+
+        envelope = {
+            "Versao": versao + 1,
+            "SalvoEm": datetime.now(timezone.utc).isoformat(),
+            "Hash": hash_novo,
+            "Configuracao": dict(config),
+        }
+
+        diretorio = os.path.dirname(os.path.abspath(caminho_arquivo))
+        fd, caminho_tmp = tempfile.mkstemp(
+            prefix=".configuracao_", suffix=".tmp", dir=diretorio
+        )
+        try:
+            with os.fdopen(fd, "w") as f:
+                json.dump(envelope, f, indent=4, default=str)
+                f.flush()
+                os.fsync(f.fileno())
+            os.replace(caminho_tmp, caminho_arquivo)
+        except BaseException:
+            if os.path.exists(caminho_tmp):
+                os.remove(caminho_tmp)
+            raise
+
+        # Garante que a troca de nome também chegou ao disco
+        try:
+            fd_dir = os.open(diretorio, os.O_RDONLY)
+            try:
+                os.fsync(fd_dir)
+            finally:
+                os.close(fd_dir)
+        except OSError:
+            pass
+
+        _estado_arquivos[caminho_arquivo] = (hash_novo, versao + 1)
+        return True
     except Exception as e:
         print(f"⚠️ Erro ao salvar config local: {e}")
+        return False
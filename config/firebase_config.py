@@ -1,8 +1,15 @@
 # config/firebase_config.py
 
+import asyncio
+import os
+import time
+from datetime import datetime, timezone, timedelta
+
 import firebase_admin
 from firebase_admin import credentials, firestore, db
 
+from utils.outbox import Outbox, ReenviadorOutbox
+
 # 🔥 Caminho para o arquivo de credenciais
 # Preferencialmente definido pela variável de ambiente FIREBASE_CREDENTIALS
 # 🔥 Caminho fixo para o arquivo de credenciais
@@ -22,6 +29,30 @@ if not firebase_admin._apps:
 # 🔥 Conexões globais
 firestore_db = firestore.client()
 realtime_db = db.reference()
+_firestore_async_db = None  # criado sob demanda (runtime asyncio)
+
+# 📦 Outbox do histórico (store-and-forward em disco)
+CAMINHO_OUTBOX_HISTORICO = os.path.join(
+    os.path.dirname(__file__), "outbox_historico.db"
+)
+LIMITE_OPERACOES_LOTE = 500  # máximo de escritas por batch no Firestore
+
+# 🗂️ Layout do histórico no Firestore:
+#   "documento" → Dados/{sensor}/Historico/{id} (um documento por sensor/janela)
+#   "bucket"    → HistoricoDiario/{AAAA-MM-DD} (um documento por dia)
+#   "ambos"     → grava nos dois (migração)
+LAYOUT_HISTORICO = "documento"
+
+# Chave do resumo estatístico da janela (mínimo, máximo, desvio padrão e
+# número de amostras por sensor); não é um sensor
+CHAVE_ESTATISTICAS_HISTORICO = "Estatisticas"
+_reenviador_historico = None
+
+# 📊 Resumos multi-resolução (rollup_service): um documento por estufa por dia
+#   Dispositivos/{estufa_id}/ResumosDiarios/{AAAA-MM-DD}
+CAMINHO_OUTBOX_RESUMOS = os.path.join(os.path.dirname(__file__), "outbox_resumos.db")
+CAMPOS_RESUMO = {"15min": "Intervalos15min", "1h": "Horas", "1d": "Dia"}
+_reenviador_resumos = None
 
 
 def enviar_dados_realtime(estufa_id, dados):
@@ -44,66 +75,530 @@ def enviar_dados_realtime(estufa_id, dados):
         return False
 
 
-def enviar_dados_firestore(estufa_id, dados):
+def _id_historico(dados):
     """
-    Envia os dados médios dos sensores para o Firestore (como histórico).
+    Identificador idempotente de uma janela de médias (timestamp em ms).
+
+    O mesmo id é usado em todos os sensores da janela, então reenvios
+    sobrescrevem os mesmos documentos em vez de criar duplicatas.
+    """
+    return str(int(round(dados.get("timestamp", time.time()) * 1000)))
 
-    Parâmetros:
-        estufa_id (str): Identificador único da estufa.
-        dados (dict): Médias calculadas dos sensores.
+
+def _sensores_janela(dados):
+    """
+    Separa as médias da janela das suas estatísticas.
 
     Retorna:
-        bool: True se envio bem-sucedido, False caso contrário.
+        list[tuple(str, float|None, dict)]: (sensor, média, estatísticas);
+        estatísticas vazias em janelas sem resumo (ex.: outbox antiga).
     """
-    try:
-        batch = firestore_db.batch()
-        timestamp = firestore.SERVER_TIMESTAMP
+    estatisticas = dados.get(CHAVE_ESTATISTICAS_HISTORICO) or {}
+    return [
+        (sensor, valor, estatisticas.get(sensor) or {})
+        for sensor, valor in dados.items()
+        if sensor not in ("timestamp", CHAVE_ESTATISTICAS_HISTORICO)
+    ]
+
+
+def _gravar_lote_documentos(registros):
+    """
+    Layout "documento": um documento por sensor por janela.
+
+        Dispositivos/{estufa_id}/Dados/{sensor}/Historico/{timestamp_ms}
+
+    Os registros são divididos em commits de até LIMITE_OPERACOES_LOTE
+    escritas (limite do batch do Firestore).
+    """
+    batch = firestore_db.batch()
+    operacoes = 0
 
-        sensores = {k: v for k, v in dados.items() if k != "timestamp"}
-        for sensor, valor in sensores.items():
+    for id_registro, estufa_id, dados in registros:
+        ts = dados.get("timestamp")
+        momento = (
+            datetime.fromtimestamp(ts, timezone.utc)
+            if ts is not None
+            else firestore.SERVER_TIMESTAMP
+        )
+        sensores = _sensores_janela(dados)
+
+        if operacoes + len(sensores) > LIMITE_OPERACOES_LOTE:
+            batch.commit()
+            batch = firestore_db.batch()
+            operacoes = 0
+
+        for sensor, valor, estatisticas in sensores:
             doc_ref = (
                 firestore_db.collection("Dispositivos")
                 .document(estufa_id)
                 .collection("Dados")
                 .document(sensor)
                 .collection("Historico")
-                .document()
+                .document(id_registro)
             )
-            batch.set(doc_ref, {f"{sensor}Atual": valor, "timestamp": timestamp})
+            documento = {f"{sensor}Atual": valor, "timestamp": momento}
+            if estatisticas:
+                documento.update(
+                    {
+                        "Minimo": estatisticas.get("minimo"),
+                        "Maximo": estatisticas.get("maximo"),
+                        "DesvioPadrao": estatisticas.get("desvio_padrao"),
+                        "Amostras": estatisticas.get("amostras"),
+                    }
+                )
+            batch.set(doc_ref, documento)
+            operacoes += 1
 
+    if operacoes:
         batch.commit()
-        print(f"✅ Firestore: Histórico atualizado para {estufa_id}")
+
+
+def _id_bucket(ts):
+    """Identificador do bucket diário (UTC) de um timestamp: "AAAA-MM-DD"."""
+    return datetime.fromtimestamp(ts, timezone.utc).strftime("%Y-%m-%d")
+
+
+def _gravar_lote_buckets(registros):
+    """
+    Layout "bucket": um documento por estufa por dia (UTC), com um array
+    compacto de pontos {"t": epoch_s, "v": média} por sensor; janelas com
+    resumo acrescentam "min", "max", "dp" (desvio padrão) e "n" (amostras).
+
+        Dispositivos/{estufa_id}/HistoricoDiario/{AAAA-MM-DD}
+            { "Data": "AAAA-MM-DD", "Temperatura": [{t, v, min, max, dp, n}, ...], ... }
+
+    Todas as janelas do mesmo dia viram UMA escrita (ArrayUnion com merge).
+    ArrayUnion não duplica elementos iguais, então reenvios são idempotentes.
+    """
+    buckets = {}
+    for _, estufa_id, dados in registros:
+        ts = dados.get("timestamp", time.time())
+        pontos = buckets.setdefault((estufa_id, _id_bucket(ts)), {})
+        for sensor, valor, estatisticas in _sensores_janela(dados):
+            if valor is None:
+                continue
+            ponto = {"t": ts, "v": valor}
+            if estatisticas:
+                ponto.update(
+                    {
+                        "min": estatisticas.get("minimo"),
+                        "max": estatisticas.get("maximo"),
+                        "dp": estatisticas.get("desvio_padrao"),
+                        "n": estatisticas.get("amostras"),
+                    }
+                )
+            pontos.setdefault(sensor, []).append(ponto)
+
+    batch = firestore_db.batch()
+    operacoes = 0
+    for (estufa_id, dia), pontos in buckets.items():
+        if operacoes >= LIMITE_OPERACOES_LOTE:
+            batch.commit()
+            batch = firestore_db.batch()
+            operacoes = 0
+
+        doc_ref = (
+            firestore_db.collection("Dispositivos")
+            .document(estufa_id)
+            .collection("HistoricoDiario")
+            .document(dia)
+        )
+        campos = {sensor: firestore.ArrayUnion(p) for sensor, p in pontos.items()}
+        campos["Data"] = dia
+        batch.set(doc_ref, campos, merge=True)
+        operacoes += 1
+
+    if operacoes:
+        batch.commit()
+
+
+def _gravar_lote_historico(registros):
+    """
+    Grava um lote de janelas de médias no Firestore, no layout configurado
+    em LAYOUT_HISTORICO ("documento", "bucket" ou "ambos" durante a migração).
+
+    Parâmetros:
+        registros (list[tuple(str, str, dict)]): (id, estufa_id, médias).
+
+    Retorna:
+        bool: True se todos os commits foram bem-sucedidos.
+    """
+    try:
+        if LAYOUT_HISTORICO in ("documento", "ambos"):
+            _gravar_lote_documentos(registros)
+        if LAYOUT_HISTORICO in ("bucket", "ambos"):
+            _gravar_lote_buckets(registros)
+
+        print(f"✅ Firestore: Histórico atualizado ({len(registros)} janela(s))")
         return True
     except Exception as e:
         print(f"⚠️ Erro ao enviar dados para Firestore: {e}")
         return False
 
 
-def atualizar_status_atuador(estufa_id, nome_atuador, ligado, motivo):
+def ler_historico_buckets(estufa_id, sensores, inicio, fim):
     """
-    Atualiza o status de um atuador no Firestore.
+    Reconstrói séries do layout "bucket" entre dois instantes.
 
-    Estrutura gravada:
-        Dispositivos/{estufa_id}/Dados/{nome_atuador}
+    Lê um documento por dia do intervalo em uma única chamada `get_all`
+    (um gráfico de 7 dias = 7 leituras de documento).
 
     Parâmetros:
         estufa_id (str): Identificador único da estufa.
-        nome_atuador (str): Nome do atuador (ex.: "Aquecedor").
-        ligado (bool): Estado atual (True = ligado, False = desligado).
-        motivo (str): Motivo do estado atual.
+        sensores (list[str]): sensores desejados (ex.: ["Temperatura"]).
+        inicio (float): epoch (s) inicial, inclusivo.
+        fim (float): epoch (s) final, inclusivo.
 
     Retorna:
-        bool: True se atualização bem-sucedida, False caso contrário.
+        dict: sensor → list[tuple(float, float)] ordenada por tempo.
     """
+    series = {sensor: [] for sensor in sensores}
+    if fim < inicio:
+        return series
+
+    dias = []
+    dia = datetime.fromtimestamp(inicio, timezone.utc).date()
+    ultimo = datetime.fromtimestamp(fim, timezone.utc).date()
+    while dia <= ultimo:
+        dias.append(dia.strftime("%Y-%m-%d"))
+        dia += timedelta(days=1)
+
+    colecao = (
+        firestore_db.collection("Dispositivos")
+        .document(estufa_id)
+        .collection("HistoricoDiario")
+    )
     try:
-        doc_ref = (
-            firestore_db.collection("Dispositivos")
-            .document(estufa_id)
-            .collection("Dados")
-            .document(nome_atuador)
+        for doc in firestore_db.get_all([colecao.document(d) for d in dias]):
+            if not doc.exists:
+                continue
+            dados = doc.to_dict()
+            for sensor in sensores:
+                for ponto in dados.get(sensor, []):
+                    if inicio <= ponto["t"] <= fim:
+                        series[sensor].append((ponto["t"], ponto["v"]))
+    except Exception as e:
+        print(f"⚠️ Erro ao ler histórico diário: {e}")
+
+    for pontos in series.values():
+        pontos.sort()
+    return series
+
+
+def _obter_reenviador_historico():
+    """Cria (na primeira chamada) a outbox do histórico e sua thread de reenvio."""
+    global _reenviador_historico
+    if _reenviador_historico is None:
+        _reenviador_historico = ReenviadorOutbox(
+            Outbox(CAMINHO_OUTBOX_HISTORICO),
+            _gravar_lote_historico,
+            tamanho_lote=LIMITE_OPERACOES_LOTE // 5,
+            nome="historico",
+        )
+        _reenviador_historico.iniciar()
+    return _reenviador_historico
+
+
+def iniciar_reenvio_historico():
+    """
+    Inicia a drenagem das outboxes do histórico e dos resumos (ex.: acúmulo
+    de uma queda de conexão anterior ao último boot).
+
+    Retorna:
+        int: número de janelas de histórico pendentes no momento do início.
+    """
+    _obter_reenviador_resumos().sinalizar()
+    reenviador = _obter_reenviador_historico()
+    reenviador.sinalizar()
+    return reenviador.outbox.tamanho()
+
+
+def enviar_dados_firestore(estufa_id, dados):
+    """
+    Registra os dados médios dos sensores para envio ao Firestore (histórico).
+
+    Os dados são gravados primeiro na outbox em disco; a thread de reenvio
+    faz o commit em lotes, com backoff exponencial enquanto a nuvem estiver
+    indisponível. Uma janela só sai da outbox depois de confirmada.
+
+    Estrutura gravada (conforme LAYOUT_HISTORICO):
+        Dispositivos/{estufa_id}/Dados/{sensor}/Historico/{timestamp_ms}
+        Dispositivos/{estufa_id}/HistoricoDiario/{AAAA-MM-DD}
+
+    Parâmetros:
+        estufa_id (str): Identificador único da estufa.
+        dados (dict): Médias calculadas dos sensores.
+
+    Retorna:
+        bool: True se os dados foram persistidos na outbox, False caso contrário.
+    """
+    try:
+        reenviador = _obter_reenviador_historico()
+        reenviador.outbox.adicionar(_id_historico(dados), estufa_id, dados)
+        reenviador.sinalizar()
+        return True
+    except Exception as e:
+        print(f"⚠️ Erro ao gravar histórico na outbox: {e}")
+        return False
+
+
+def _gravar_lote_resumos(registros):
+    """
+    Grava blocos de resumo (rollups) no documento diário de cada estufa.
+
+        Dispositivos/{estufa_id}/ResumosDiarios/{AAAA-MM-DD}
+            {
+                "Data": "AAAA-MM-DD",
+                "Intervalos15min": {"HHMM": {sensor: resumo, ...}, ...},
+                "Horas": {"HH": {sensor: resumo, ...}, ...},
+                "Dia": {sensor: resumo, ...}
+            }
+
+    resumo = {media, minimo, maximo, desvio_padrao, amostras}. Horários em
+    UTC (início do intervalo). Todos os blocos do mesmo dia viram UMA escrita
+    (set com merge, que mescla os mapas aninhados); reenvios sobrescrevem as
+    mesmas chaves.
+
+    Blocos parciais (intervalo iniciado antes da cobertura do motor, ex.:
+    boot sem estado salvo) só são gravados se a chave ainda não existir no
+    documento: nunca substituem um intervalo completo já enviado.
+
+    Parâmetros:
+        registros (list[tuple(str, str, dict)]): (id, estufa_id, bloco).
+
+    Retorna:
+        bool: True se todos os commits foram bem-sucedidos.
+    """
+    try:
+        documentos = {}
+        parciais = {}
+        for _, estufa_id, bloco in registros:
+            campo = CAMPOS_RESUMO.get(bloco["resolucao"])
+            if campo is None:
+                continue
+            inicio = datetime.fromtimestamp(bloco["inicio"], timezone.utc)
+            dia = inicio.strftime("%Y-%m-%d")
+            campos = documentos.setdefault((estufa_id, dia), {"Data": dia})
+            if bloco["resolucao"] == "1d":
+                chave = None
+                campos[campo] = bloco["metricas"]
+            else:
+                chave = inicio.strftime(
+                    "%H%M" if bloco["resolucao"] == "15min" else "%H"
+                )
+                campos.setdefault(campo, {})[chave] = bloco["metricas"]
+            if bloco.get("parcial"):
+                parciais.setdefault((estufa_id, dia), []).append((campo, chave))
+
+        batch = firestore_db.batch()
+        operacoes = 0
+        for (estufa_id, dia), campos in documentos.items():
+            if operacoes >= LIMITE_OPERACOES_LOTE:
+                batch.commit()
+                batch = firestore_db.batch()
+                operacoes = 0
+            doc_ref = (
+                firestore_db.collection("Dispositivos")
+                .document(estufa_id)
+                .collection("ResumosDiarios")
+                .document(dia)
+            )
+            if (estufa_id, dia) in parciais:
+                _descartar_parciais_existentes(
+                    campos, parciais[(estufa_id, dia)], doc_ref.get().to_dict()
+                )
+            batch.set(doc_ref, campos, merge=True)
+            operacoes += 1
+        if operacoes:
+            batch.commit()
+
+        print(f"✅ Firestore: Resumos atualizados ({len(registros)} bloco(s))")
+        return True
+    except Exception as e:
+        print(f"⚠️ Erro ao enviar resumos para Firestore: {e}")
+        return False
+
+
+def _descartar_parciais_existentes(campos, parciais, existente):
+    """
+    Remove de `campos` os intervalos parciais que o documento já possui.
+
+    Parâmetros:
+        campos (dict): campos a gravar no documento diário (alterado).
+        parciais (list[tuple(str, str|None)]): (campo, chave) parciais;
+            chave None → o próprio campo (resumo do dia).
+        existente (dict|None): conteúdo atual do documento.
+    """
+    existente = existente or {}
+    for campo, chave in parciais:
+        if chave is None:
+            if campo in existente:
+                campos.pop(campo, None)
+        elif chave in (existente.get(campo) or {}):
+            campos.get(campo, {}).pop(chave, None)
+            if not campos.get(campo):
+                campos.pop(campo, None)
+
+
+def _obter_reenviador_resumos():
+    """Cria (na primeira chamada) a outbox dos resumos e sua thread de reenvio."""
+    global _reenviador_resumos
+    if _reenviador_resumos is None:
+        _reenviador_resumos = ReenviadorOutbox(
+            Outbox(CAMINHO_OUTBOX_RESUMOS),
+            _gravar_lote_resumos,
+            tamanho_lote=LIMITE_OPERACOES_LOTE,
+            nome="resumos",
+        )
+        _reenviador_resumos.iniciar()
+    return _reenviador_resumos
+
+
+def enviar_resumos_firestore(estufa_id, blocos):
+    """
+    Registra blocos de resumo (rollup_service) para envio ao Firestore.
+
+    Como o histórico, passa pela outbox em disco; o documento diário é
+    escrito por `_gravar_lote_resumos`. Cada bloco é gravado assim que fecha
+    e liberado para envio em `envio_em` (agenda da resolução).
+
+    Parâmetros:
+        estufa_id (str): Identificador único da estufa.
+        blocos (list[dict]): {resolucao, inicio, fim, parcial, envio_em, metricas}.
+
+    Retorna:
+        bool: True se os blocos foram persistidos na outbox, False caso contrário.
+    """
+    try:
+        reenviador = _obter_reenviador_resumos()
+        for bloco in blocos:
+            id_registro = f"{bloco['resolucao']}-{int(bloco['inicio'])}"
+            reenviador.outbox.adicionar(
+                id_registro, estufa_id, bloco, disponivel_em=bloco.get("envio_em", 0)
+            )
+        reenviador.sinalizar()
+        return True
+    except Exception as e:
+        print(f"⚠️ Erro ao gravar resumos na outbox: {e}")
+        return False
+
+
+def ler_resumos_diarios(estufa_id, inicio, fim):
+    """
+    Lê os documentos de resumo dos dias entre dois instantes (UTC), em uma
+    única chamada `get_all` (um documento por dia).
+
+    Parâmetros:
+        estufa_id (str): Identificador único da estufa.
+        inicio (float): epoch (s) inicial.
+        fim (float): epoch (s) final.
+
+    Retorna:
+        dict: "AAAA-MM-DD" → documento (apenas dias existentes).
+    """
+    dias = []
+    dia = datetime.fromtimestamp(inicio, timezone.utc).date()
+    ultimo = datetime.fromtimestamp(fim, timezone.utc).date()
+    while dia <= ultimo:
+        dias.append(dia.strftime("%Y-%m-%d"))
+        dia += timedelta(days=1)
+
+    colecao = (
+        firestore_db.collection("Dispositivos")
+        .document(estufa_id)
+        .collection("ResumosDiarios")
+    )
+    resumos = {}
+    try:
+        for doc in firestore_db.get_all([colecao.document(d) for d in dias]):
+            if doc.exists:
+                resumos[doc.id] = doc.to_dict()
+    except Exception as e:
+        print(f"⚠️ Erro ao ler resumos diários: {e}")
+    return resumos
+
+
+def obter_firestore_async():
+    """
+    Cliente assíncrono do Firestore (firebase_admin.firestore_async, a partir
+    do firebase-admin 6.0), criado na primeira chamada.
+
+    Retorna:
+        AsyncClient | None: None se a versão instalada não tiver o cliente.
+    """
+    global _firestore_async_db
+    if _firestore_async_db is None:
+        try:
+            from firebase_admin import firestore_async
+
+            _firestore_async_db = firestore_async.client()
+        except Exception as e:
+            print(f"⚠️ Firestore assíncrono indisponível (usando o síncrono): {e}")
+            _firestore_async_db = False
+    return _firestore_async_db or None
+
+
+async def atualizar_status_atuadores_async(estufa_id, status_atuadores):
+    """
+    Versão assíncrona de atualizar_status_atuadores (mesma estrutura
+    gravada), para o runtime asyncio. Sem o cliente assíncrono, roda a
+    versão síncrona no executor padrão do laço.
+
+    Retorna:
+        bool: True se o commit foi bem-sucedido (ou nada a enviar).
+    """
+    if not status_atuadores:
+        return True
+    cliente = obter_firestore_async()
+    if cliente is None:
+        return await asyncio.get_running_loop().run_in_executor(
+            None, atualizar_status_atuadores, estufa_id, status_atuadores
         )
-        doc_ref.set({"Estado": ligado, "Motivo": motivo}, merge=True)
+    try:
+        batch = cliente.batch()
+        for nome_atuador, (ligado, motivo) in status_atuadores.items():
+            doc_ref = (
+                cliente.collection("Dispositivos")
+                .document(estufa_id)
+                .collection("Dados")
+                .document(nome_atuador)
+            )
+            batch.set(doc_ref, {"Estado": ligado, "Motivo": motivo}, merge=True)
+        await batch.commit()
+        return True
+    except Exception as e:
+        print(f"⚠️ Erro ao atualizar atuadores {list(status_atuadores)}: {e}")
+        return False
+
+
+def atualizar_status_atuadores(estufa_id, status_atuadores):
+    """
+    Atualiza o status de vários atuadores em um único commit (batch).
+
+    Estrutura gravada (merge):
+        Dispositivos/{estufa_id}/Dados/{nome_atuador} → {"Estado", "Motivo"}
+
+    Parâmetros:
+        estufa_id (str): Identificador único da estufa.
+        status_atuadores (dict): nome → (ligado, motivo).
+
+    Retorna:
+        bool: True se o commit foi bem-sucedido (ou nada a enviar), False caso contrário.
+    """
+    if not status_atuadores:
+        return True
+    try:
+        batch = firestore_db.batch()
+        for nome_atuador, (ligado, motivo) in status_atuadores.items():
+            doc_ref = (
+                firestore_db.collection("Dispositivos")
+                .document(estufa_id)
+                .collection("Dados")
+                .document(nome_atuador)
+            )
+            batch.set(doc_ref, {"Estado": ligado, "Motivo": motivo}, merge=True)
+        batch.commit()
         return True
     except Exception as e:
-        print(f"⚠️ Erro ao atualizar atuador {nome_atuador}: {e}")
+        print(f"⚠️ Erro ao atualizar atuadores {list(status_atuadores)}: {e}")
         return False
@@ -2,27 +2,26 @@
 main.py — Ponto de entrada do backend da estufa inteligente.
 
 Responsabilidades:
-- Inicializa sensores e atuadores conectados ao Raspberry Pi.
-- Executa o ciclo principal da estufa (coleta, controle, envio de dados).
-- Inicia o logger de dados em CSV (teste_logger).
+- Inicializa sensores e atuadores pela HAL (Raspberry Pi ou estufa simulada).
+- Executa o ciclo principal da estufa (coleta, controle, envio de dados) em
+  threads ou, opcionalmente, no runtime asyncio (RUNTIME_ASYNC).
+- Inicia o logger de dados em CSV (teste_logger), assinante do barramento de
+  eventos do ciclo.
 - Ativa listeners do Firestore para iniciar, reiniciar e avançar fases.
 - Mantém o processo ativo continuamente, mesmo se rodando em background.
 - Trata interrupções (CTRL+C) para desligar atuadores.
 """
 
+import asyncio
 import threading
-import board
 import signal
 import sys
 import time
 
 # ===============================
-# Sensores
+# Hardware (backend escolhido por ESTUFA_HAL: "rpi" ou "simulado")
 # ===============================
-from modules.sensores.luminosidade import BH1750
-from modules.sensores.temperatura_ar_umidade_ar import DHT22
-from modules.sensores.temperatura_solo import DS18B20
-from modules.sensores.umidade_solo import UmidadeSolo
+from modules.hal import criar_sensores
 
 # ===============================
 # Atuadores
@@ -35,12 +34,28 @@ from modules.atuadores.ventoinha import Ventoinha
 # ===============================
 # Configuração
 # ===============================
-from config.configuracao_local import carregar_configuracao_local
+from config.cache_configuracao import (
+    iniciar_cache_configuracao,
+    obter_configuracao,
+    registrar_ouvinte_configuracao,
+)
+from config.cache_presets import cache_presets
+from config.firebase_config import iniciar_reenvio_historico
 
 # ===============================
 # Services
 # ===============================
-from services.ciclo_service import ciclo_estufa
+from services.amostragem_service import iniciar_amostragem, parar_amostragem
+from services.ciclo_service import (
+    ciclo_estufa,
+    ciclo_estufa_agendado,
+    reagir_mudanca_configuracao,
+)
+from services.envio_service import enviar_resumos_periodicamente
+from services.eventos_service import barramento_eventos
+from services.fila_envio_service import fila_envio
+from services.rollup_service import motor_rollup
+from services.runtime_async_service import executar_estufa_async
 from services.listeners_service import (
     escutar_solicitacao_iniciar,
     escutar_solicitacao_reiniciar,
@@ -56,21 +71,59 @@ from testes.teste_logger import teste_logger
 # 🔥 Identificador único da estufa
 ESTUFA_ID = "EG001"
 
-# Carrega configuração inicial
-config = carregar_configuracao_local(ESTUFA_ID)
+# Ativa o cache de configuração e carrega a configuração inicial
+# (arquivo local primeiro → o ciclo começa mesmo sem acesso ao Firestore)
+iniciar_cache_configuracao(ESTUFA_ID)
+config = obter_configuracao(ESTUFA_ID)
 if not config:
-    exit("❌ Erro ao carregar a configuração da estufa.")
+    exit("❌ Erro ao carregar a configuração da estufa (Firestore e arquivo local).")
+
+# Pré-carrega os presets de todas as fases da planta ativa
+if config.get("PlantaAtual") not in (None, "Standby"):
+    cache_presets.pre_carregar(config.get("PlantaAtual"))
+
+# Drena janelas de histórico que ficaram na outbox (ex.: queda de conexão)
+iniciar_reenvio_historico()
+
+# Restaura a hora e o dia em andamento dos rollups (antes das amostras)
+motor_rollup.carregar()
 
 # 🔥 Intervalo do ciclo principal (segundos)
 TEMPO_CICLO = 30
 
+# ⏱️ Ciclo agendado (services.agendador_service): aquecedor/ventoinha a cada
+# PERIODO_SEGURANCA s, luminária/bomba e envios a cada TEMPO_CICLO s e fase a
+# cada PERIODO_FASE s (services.ciclo_service), em grade fixa sem deriva
+# (False → laço único de ciclo_estufa a cada TEMPO_CICLO s)
+CICLO_AGENDADO = True
+
+# 🧵 Amostragem contínua: cada sensor lido em segundo plano no próprio ritmo
+# (False → o ciclo lê os sensores a cada rodada)
+AMOSTRAGEM_CONTINUA = True
+
+# ⚡ Runtime asyncio (services.runtime_async_service): amostragem, etapas do
+# ciclo agendado, temporizadores e envios como tarefas de um único laço, com
+# executores limitados para controle, drivers e rede (menos threads e memória).
+# Ignora CICLO_AGENDADO e AMOSTRAGEM_CONTINUA.
+RUNTIME_ASYNC = False
+
 # ===============================
 # Inicialização de Sensores
 # ===============================
-luminosidade_sensor = BH1750()
-temperatura_solo_sensor = DS18B20()
-temperatura_ar_sensor = DHT22(pin=board.D17)  # GPIO 17
-umidade_solo_sensor = UmidadeSolo()
+(
+    luminosidade_sensor,  # BH1750
+    temperatura_solo_sensor,  # DS18B20
+    temperatura_ar_sensor,  # DHT22 no GPIO 17
+    umidade_solo_sensor,  # ADS1115
+) = criar_sensores()
+
+if AMOSTRAGEM_CONTINUA and not RUNTIME_ASYNC:
+    iniciar_amostragem(
+        luminosidade_sensor,
+        temperatura_solo_sensor,
+        temperatura_ar_sensor,
+        umidade_solo_sensor,
+    )
 
 # ===============================
 # Inicialização de Atuadores
@@ -96,16 +149,59 @@ def encerrar(sig, frame):
     except Exception as e:
         print(f"⚠️ Erro ao desligar atuadores: {e}")
 
+    parar_amostragem()
+
+    # Drena os assinantes do barramento (o logger grava o buffer e
+    # fecha/comprime o segmento atual; o histórico grava as últimas amostras)
+    barramento_eventos.parar(timeout=5)
+
+    # Resumos já fechados vão para a outbox e os intervalos abertos (hora e
+    # dia em andamento) são salvos para o próximo boot
+    enviar_resumos_periodicamente(ESTUFA_ID, forcar=True)
+
+    # Dá alguns segundos para a fila de envio esvaziar
+    fila_envio.parar(timeout=5)
+
     sys.exit(0)
 
 
+def executar_runtime_async():
+    """Roda a estufa no runtime asyncio; CTRL+C encerra o laço e depois `encerrar`."""
+    teste_logger()
+    escutar_solicitacao_iniciar(ESTUFA_ID)
+    escutar_solicitacao_reiniciar(ESTUFA_ID)
+    escutar_solicitacao_avancar(ESTUFA_ID)
+
+    asyncio.run(
+        executar_estufa_async(
+            ESTUFA_ID,
+            luminosidade_sensor,
+            temperatura_solo_sensor,
+            temperatura_ar_sensor,
+            umidade_solo_sensor,
+            ventoinha,
+            luminaria,
+            bomba,
+            aquecedor,
+            TEMPO_CICLO,
+        )
+    )
+    encerrar(signal.SIGINT, None)
+
+
 if __name__ == "__main__":
+    # Roda o ciclo imediatamente quando a configuração mudar
+    registrar_ouvinte_configuracao(reagir_mudanca_configuracao)
+
+    if RUNTIME_ASYNC:
+        executar_runtime_async()
+
     # Registra handler para CTRL+C
     signal.signal(signal.SIGINT, encerrar)
 
     # 🌱 Thread do ciclo principal
     thread_ciclo = threading.Thread(
-        target=ciclo_estufa,
+        target=ciclo_estufa_agendado if CICLO_AGENDADO else ciclo_estufa,
         args=(
             ESTUFA_ID,
             luminosidade_sensor,
@@ -121,12 +217,12 @@ if __name__ == "__main__":
         daemon=True,
     )
 
-    # 📝 Thread do logger CSV
-    thread_logger = threading.Thread(target=teste_logger, daemon=True)
+    # 📝 Logger CSV: assinante em fila do barramento de eventos
+    # (assina antes do ciclo começar: nenhum ciclo perdido)
+    teste_logger()
 
-    # Inicia threads principais
+    # Inicia a thread do ciclo
     thread_ciclo.start()
-    thread_logger.start()
 
     # Ativa listeners do Firestore (rodam em background sem threads extras)
     escutar_solicitacao_iniciar(ESTUFA_ID)
@@ -135,4 +231,3 @@ if __name__ == "__main__":
 
     # Mantém processo vivo
     thread_ciclo.join()
-    thread_logger.join()
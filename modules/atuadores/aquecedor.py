@@ -1,5 +1,5 @@
 # modules/atuadores/aquecedor.py
-import RPi.GPIO as GPIO
+from modules.hal import GPIO
 
 
 class Aquecedor:
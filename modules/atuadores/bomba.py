@@ -1,7 +1,5 @@
 # modules/atuadores/bomba.py
-import RPi.GPIO as GPIO
-from datetime import datetime
-import threading
+from modules.hal import GPIO, agendar, agora
 
 
 class Bomba:
@@ -12,6 +10,8 @@ class Bomba:
       - Se OverrideUmidadeDoSolo estiver ativo → usa valor desejado.
       - Caso contrário → usa limites do preset (UmidadeDoSoloMin e UmidadeDoSoloMax).
       - Após cada irrigação, espera TEMPO_REACAO_UMIDADE antes de permitir nova ativação.
+      - Uma irrigação em andamento nunca é interrompida pelo controle: o
+        desligamento agendado em `ligar` entrega o volume completo.
       - Sempre inicia desligada por segurança.
 
     Retorno do método `controlar`:
@@ -49,7 +49,7 @@ class Bomba:
     def ligar(self, duracao):
         """
         Liga a bomba por um tempo definido (segundos).
-        Agenda desligamento automático com threading.Timer.
+        Agenda desligamento automático no relógio do backend (modules.hal).
 
         Parâmetros:
             duracao (float): tempo em segundos para manter a bomba ligada.
@@ -66,9 +66,8 @@ class Bomba:
             return
 
         # agenda desligamento
-        self._timer = threading.Timer(duracao, self.desligar)
-        self._timer.start()
-        self.ultimo_acionamento = datetime.now()
+        self._timer = agendar(duracao, self.desligar)
+        self.ultimo_acionamento = agora()
 
     def desligar(self):
         """Desliga a bomba imediatamente e cancela o timer se existir."""
@@ -98,13 +97,17 @@ class Bomba:
             self.desligar()
             return False, "Configuração inválida"
 
+        # 💧 Irrigação em andamento (ex.: ciclo adiantado por mudança de config)
+        if self.is_irrigando:
+            return True, f"Irrigando ({self.VOLUME_POR_IRRIGACAO} mL)"
+
         if umidade_solo is None:
             self.desligar()
             return False, "Leitura inválida de umidade"
 
         # ⏱️ Verifica tempo desde última irrigação
         if self.ultimo_acionamento:
-            tempo_passado = (datetime.now() - self.ultimo_acionamento).total_seconds()
+            tempo_passado = (agora() - self.ultimo_acionamento).total_seconds()
             if tempo_passado < self.TEMPO_REACAO_UMIDADE:
                 self.desligar()
                 return (
@@ -1,5 +1,5 @@
 # modules/atuadores/luminaria.py
-import RPi.GPIO as GPIO
+from modules.hal import GPIO, agora
 from datetime import datetime, timedelta
 
 
@@ -67,7 +67,7 @@ class Luminaria:
             return False, "Configuração inválida"
 
         fotoperiodo = config.get("Fotoperiodo", 12)
-        hora_atual = datetime.now().time()
+        hora_atual = agora().time()
 
         hora_inicio = datetime.strptime(self.HORA_INICIO, "%H:%M").time()
         hora_fim_dt = datetime.combine(datetime.today(), hora_inicio) + timedelta(
@@ -1,5 +1,5 @@
 # modules/atuadores/ventoinha.py
-import RPi.GPIO as GPIO
+from modules.hal import GPIO
 
 
 class Ventoinha:
@@ -0,0 +1,149 @@
+# modules/hal/__init__.py
+"""
+Camada de abstração de hardware (HAL).
+
+Backends:
+    "rpi"      → Raspberry Pi real (RPi.GPIO, smbus2, adafruit_*, sysfs);
+                 as bibliotecas só são importadas quando usadas.
+    "simulado" → estufa simulada (modelo físico) que roda em qualquer Linux,
+                 mais rápido que o tempo real.
+
+Escolha do backend: variável de ambiente ESTUFA_HAL ("rpi" por padrão) ou
+`definir_backend()` antes de criar atuadores e sensores.
+
+Fachadas usadas por atuadores e serviços:
+    GPIO                       → subconjunto de RPi.GPIO (setmode, setup,
+                                 output, input, BCM, OUT, LOW, HIGH)
+    agora() / tempo()          → data/hora e timestamp do relógio do backend
+    agendar(segundos, funcao)  → temporizador cancelável (.cancel()); em
+                                 backends de tempo real pode ser trocado por
+                                 definir_agendador (ex.: laço asyncio)
+    agendar_tempo_real(s, f)   → idem, sempre em tempo real
+    criar_sensores()           → (BH1750, DS18B20, DHT22, UmidadeSolo)
+"""
+
+import os
+import threading
+
+_backend = None
+_lock = threading.Lock()
+_agendador = None
+_agendador_tempo_real = None
+
+
+def _criar(nome, **opcoes):
+    """Instancia o backend pelo nome (import tardio)."""
+    if nome == "rpi":
+        from modules.hal.rpi import BackendRPi
+
+        return BackendRPi(**opcoes)
+    if nome == "simulado":
+        from modules.hal.simulado import BackendSimulado
+
+        return BackendSimulado(**opcoes)
+    raise ValueError(f"Backend de hardware desconhecido: {nome}")
+
+
+def definir_backend(backend="rpi", **opcoes):
+    """
+    Define o backend ativo.
+
+    Parâmetros:
+        backend (str|obj): "rpi", "simulado" ou uma instância de backend.
+        **opcoes: argumentos do construtor (ex.: velocidade=600 no simulado).
+
+    Retorna:
+        obj: backend ativo.
+    """
+    global _backend
+    with _lock:
+        _backend = _criar(backend, **opcoes) if isinstance(backend, str) else backend
+        print(f"🔧 Backend de hardware: {_backend.nome}")
+        return _backend
+
+
+def obter_backend():
+    """Retorna o backend ativo (criado pela variável ESTUFA_HAL se preciso)."""
+    global _backend
+    if _backend is None:
+        with _lock:
+            if _backend is None:
+                _backend = _criar(os.environ.get("ESTUFA_HAL", "rpi"))
+    return _backend
+
+
+class _FachadaGPIO:
+    """Encaminha cada acesso (GPIO.output, GPIO.LOW, ...) ao backend ativo."""
+
+    def __getattr__(self, nome):
+        return getattr(obter_backend().gpio, nome)
+
+
+GPIO = _FachadaGPIO()
+
+
+def agora():
+    """Data/hora atual do backend (datetime)."""
+    return obter_backend().agora()
+
+
+def tempo():
+    """Timestamp atual do backend (segundos desde a época)."""
+    return obter_backend().tempo()
+
+
+def agendar(segundos, funcao):
+    """
+    Executa `funcao` após `segundos` no relógio do backend.
+
+    Retorna:
+        obj: temporizador com .cancel().
+    """
+    backend = obter_backend()
+    if _agendador is not None and getattr(backend, "TEMPO_REAL", False):
+        return _agendador(segundos, funcao)
+    return backend.agendar(segundos, funcao)
+
+
+def agendar_tempo_real(segundos, funcao):
+    """
+    Executa `funcao` após `segundos` reais, em qualquer backend (ex.: prazos
+    de calendário como o avanço de fase). Usa o agendador de tempo real de
+    definir_agendador, se houver, ou um threading.Timer (daemon).
+
+    Retorna:
+        obj: temporizador com .cancel().
+    """
+    if _agendador_tempo_real is not None:
+        return _agendador_tempo_real(segundos, funcao)
+    temporizador = threading.Timer(segundos, funcao)
+    temporizador.daemon = True
+    temporizador.start()
+    return temporizador
+
+
+def definir_agendador(agendador, tempo_real=None):
+    """
+    Substitui os temporizadores dos backends de tempo real (ex.: timers do
+    laço asyncio no lugar de um threading.Timer por chamada). Backends com
+    relógio próprio (simulado) continuam usando o seu.
+
+    Parâmetros:
+        agendador (callable|None): (segundos, funcao) → obj com .cancel();
+            None restaura os temporizadores do backend.
+        tempo_real (callable|None): o mesmo para agendar_tempo_real (prazos
+            de calendário, que podem acessar a rede); default = `agendador`.
+    """
+    global _agendador, _agendador_tempo_real
+    _agendador = agendador
+    _agendador_tempo_real = tempo_real or agendador
+
+
+def criar_sensores(**opcoes):
+    """
+    Cria os sensores da estufa no backend ativo.
+
+    Retorna:
+        tuple: (luminosidade, temperatura_solo, temperatura_ar, umidade_solo).
+    """
+    return obter_backend().criar_sensores(**opcoes)
@@ -0,0 +1,75 @@
+# modules/hal/rpi.py
+"""
+Backend do Raspberry Pi: hardware real.
+
+RPi.GPIO e os drivers dos sensores (smbus2, adafruit_*, sysfs) são
+importados apenas na primeira vez em que são usados.
+"""
+
+import threading
+import time
+from datetime import datetime
+
+
+class BackendRPi:
+    """
+    Hardware real do Raspberry Pi.
+
+    Uso:
+        backend = BackendRPi()
+        backend.gpio.output(22, backend.gpio.HIGH)
+        sensores = backend.criar_sensores()
+    """
+
+    nome = "rpi"
+    TEMPO_REAL = True
+
+    def __init__(self):
+        self._gpio = None
+
+    @property
+    def gpio(self):
+        """Módulo RPi.GPIO (importado na primeira chamada)."""
+        if self._gpio is None:
+            import RPi.GPIO as GPIO
+
+            self._gpio = GPIO
+        return self._gpio
+
+    def agora(self):
+        """Data/hora do sistema."""
+        return datetime.now()
+
+    def tempo(self):
+        """Timestamp do sistema."""
+        return time.time()
+
+    def agendar(self, segundos, funcao):
+        """Temporizador em tempo real (threading.Timer)."""
+        temporizador = threading.Timer(segundos, funcao)
+        temporizador.start()
+        return temporizador
+
+    def criar_sensores(self, pino_dht="D17"):
+        """
+        Cria os drivers reais dos sensores.
+
+        Parâmetros:
+            pino_dht (str): nome do pino do DHT22 em `board` (default = "D17").
+
+        Retorna:
+            tuple: (BH1750, DS18B20, DHT22, UmidadeSolo).
+        """
+        import board
+
+        from modules.sensores.luminosidade import BH1750
+        from modules.sensores.temperatura_ar_umidade_ar import DHT22
+        from modules.sensores.temperatura_solo import DS18B20
+        from modules.sensores.umidade_solo import UmidadeSolo
+
+        return (
+            BH1750(),
+            DS18B20(),
+            DHT22(pin=getattr(board, pino_dht)),
+            UmidadeSolo(),
+        )
@@ -0,0 +1,438 @@
+# modules/hal/simulado.py
+"""
+Backend simulado: estufa virtual para testes e benchmarks fora do Raspberry Pi.
+
+Responsabilidades:
+- Relógio simulado: proporcional ao tempo real (`velocidade` × mais rápido)
+  ou avançado manualmente (`velocidade=None`, o mais rápido possível).
+- GPIO simulado: guarda o nível de cada pino e conta as transições dos relés.
+- Modelo físico: aquecedor, ventoinha, luminária e bomba alteram temperatura
+  e umidade do ar, umidade e temperatura do solo e luminosidade ao longo do
+  tempo simulado (integração de Euler).
+- Sensores simulados com a mesma interface dos drivers reais, com ruído,
+  falhas de leitura e picos ocasionais (exercitam tentativas e filtros).
+"""
+
+import heapq
+import itertools
+import math
+import random
+import threading
+import time
+from datetime import datetime
+
+# Pinos BCM padrão dos atuadores (ver modules/atuadores)
+PINOS_PADRAO = {"aquecedor": 10, "ventoinha": 27, "luminaria": 9, "bomba": 22}
+
+
+class TemporizadorSimulado:
+    """Temporizador no relógio simulado (mesma interface do threading.Timer)."""
+
+    def __init__(self, instante, funcao):
+        self.instante = instante
+        self.funcao = funcao
+        self.cancelado = False
+
+    def cancel(self):
+        self.cancelado = True
+
+
+class RelogioSimulado:
+    """
+    Relógio da simulação.
+
+    Uso:
+        relogio = RelogioSimulado(velocidade=None)   # manual
+        relogio.avancar(30)                           # +30 s simulados
+        relogio = RelogioSimulado(velocidade=600)     # 10 min simulados por segundo
+    """
+
+    def __init__(self, inicio=None, velocidade=60.0):
+        """
+        Parâmetros:
+            inicio (float|None): timestamp simulado inicial (default = agora).
+            velocidade (float|None): fator sobre o tempo real; None = só
+                avança com `avancar()`.
+        """
+        self.inicio = time.time() if inicio is None else inicio
+        self.velocidade = velocidade
+        self._real_inicial = time.monotonic()
+        self._deslocamento = 0.0
+        self._agenda = []  # heap (instante, seq, temporizador)
+        self._sequencia = itertools.count()
+        self._lock = threading.Lock()
+
+    def tempo(self):
+        """Timestamp simulado atual."""
+        decorrido = self._deslocamento
+        if self.velocidade:
+            decorrido += (time.monotonic() - self._real_inicial) * self.velocidade
+        return self.inicio + decorrido
+
+    def avancar(self, segundos):
+        """
+        Avança o relógio e dispara os temporizadores vencidos, cada um no
+        próprio instante (ex.: a bomba desliga no meio do passo, não no fim).
+        """
+        fim = self.tempo() + segundos
+        while True:
+            with self._lock:
+                proximo = self._agenda[0][0] if self._agenda else None
+            if proximo is None or proximo > fim:
+                break
+            self._deslocamento += max(0.0, proximo - self.tempo())
+            self.processar()
+        self._deslocamento += max(0.0, fim - self.tempo())
+        self.processar()
+
+    def agendar(self, segundos, funcao):
+        """
+        Agenda `funcao` para daqui a `segundos` simulados.
+
+        Retorna:
+            TemporizadorSimulado: com .cancel().
+        """
+        temporizador = TemporizadorSimulado(self.tempo() + segundos, funcao)
+        with self._lock:
+            heapq.heappush(
+                self._agenda,
+                (temporizador.instante, next(self._sequencia), temporizador),
+            )
+        if self.velocidade:
+            disparo = threading.Timer(segundos / self.velocidade, self.processar)
+            disparo.daemon = True
+            disparo.start()
+        return temporizador
+
+    def processar(self):
+        """Executa os temporizadores cujo instante já passou."""
+        while True:
+            with self._lock:
+                if not self._agenda or self._agenda[0][0] > self.tempo():
+                    return
+                _, _, temporizador = heapq.heappop(self._agenda)
+            if not temporizador.cancelado:
+                temporizador.funcao()
+
+
+class GPIOSimulado:
+    """Subconjunto de RPi.GPIO sobre pinos em memória."""
+
+    BCM = "BCM"
+    OUT = "OUT"
+    IN = "IN"
+    LOW = 0
+    HIGH = 1
+
+    def __init__(self, antes_de_mudar=None):
+        """
+        Parâmetros:
+            antes_de_mudar (callable|None): chamado antes de um pino mudar de
+                nível (o modelo integra o estado até este instante).
+        """
+        self.antes_de_mudar = antes_de_mudar
+        self.niveis = {}
+        self.transicoes = {}
+
+    def setmode(self, modo):
+        pass
+
+    def setwarnings(self, ativo):
+        pass
+
+    def setup(self, pino, modo):
+        self.niveis.setdefault(pino, self.HIGH)
+
+    def output(self, pino, nivel):
+        anterior = self.niveis.get(pino)
+        if anterior == nivel:
+            return
+        if self.antes_de_mudar:
+            self.antes_de_mudar()
+        self.niveis[pino] = nivel
+        if anterior is not None:
+            self.transicoes[pino] = self.transicoes.get(pino, 0) + 1
+
+    def input(self, pino):
+        return self.niveis.get(pino, self.HIGH)
+
+    def cleanup(self):
+        self.niveis.clear()
+
+
+class ModeloEstufa:
+    """
+    Modelo físico simplificado da estufa (relés ativos em LOW).
+
+    Ar:   perde calor para o ambiente; aquecedor aquece; ventoinha troca ar
+          com o exterior; a transpiração do solo umidifica.
+    Solo: evapora mais rápido com calor; a bomba adiciona água pela vazão
+          calibrada; a temperatura segue a do ar com atraso.
+    Luz:  luz do dia + luminária.
+    """
+
+    # Ambiente externo
+    TEMPERATURA_EXTERNA_MEDIA = 20.0  # °C
+    AMPLITUDE_DIARIA = 6.0  # °C (máxima às 15h)
+    UMIDADE_EXTERNA = 60.0  # %
+    LUZ_DO_DIA = 3000.0  # lux ao meio-dia
+
+    # Dinâmica
+    CONSTANTE_PERDA = 1800.0  # s, troca térmica passiva
+    CONSTANTE_VENTOINHA = 600.0  # s, troca forçada com o exterior
+    POTENCIA_AQUECEDOR = 0.01  # °C/s
+    CALOR_LUMINARIA = 0.001  # °C/s
+    SECAGEM_AQUECEDOR = 0.005  # %UR/s
+    TRANSPIRACAO = 0.01  # %UR/s com solo saturado
+    EVAPORACAO_SOLO = 0.0003  # %/s a 20 °C
+    VAZAO_BOMBA = 1.31  # mL/s (igual à Bomba real)
+    GANHO_POR_ML = 0.08  # % de umidade do solo por mL
+    CONSTANTE_SOLO = 7200.0  # s, atraso térmico do solo
+    LUZ_LUMINARIA = 12000.0  # lux
+
+    PASSO_MAXIMO = 5.0  # s simulados por passo de integração
+
+    def __init__(self, relogio, gpio, pinos=None, estado_inicial=None):
+        """
+        Parâmetros:
+            relogio (RelogioSimulado): relógio da simulação.
+            gpio (GPIOSimulado): pinos dos relés.
+            pinos (dict|None): atuador → pino BCM (default = PINOS_PADRAO).
+            estado_inicial (dict|None): valores iniciais das grandezas.
+        """
+        self.relogio = relogio
+        self.gpio = gpio
+        self.pinos = PINOS_PADRAO if pinos is None else pinos
+        self.temperatura_ar = 22.0
+        self.umidade_ar = 65.0
+        self.temperatura_solo = 21.0
+        self.umidade_solo = 45.0
+        for chave, valor in (estado_inicial or {}).items():
+            setattr(self, chave, valor)
+
+        self._lock = threading.RLock()
+        self._instante = relogio.tempo()
+        self.agua_bombeada = 0.0  # mL
+
+    def _ligado(self, atuador):
+        return self.gpio.niveis.get(self.pinos[atuador]) == GPIOSimulado.LOW
+
+    def _hora(self, instante):
+        local = time.localtime(instante)
+        return local.tm_hour + local.tm_min / 60 + local.tm_sec / 3600
+
+    def temperatura_externa(self, instante):
+        """Temperatura externa com ciclo diário (mínima às 3h, máxima às 15h)."""
+        return self.TEMPERATURA_EXTERNA_MEDIA + self.AMPLITUDE_DIARIA * math.sin(
+            2 * math.pi * (self._hora(instante) - 9) / 24
+        )
+
+    def _luz_do_dia(self, instante):
+        hora = self._hora(instante)
+        if not 6 <= hora <= 18:
+            return 0.0
+        return self.LUZ_DO_DIA * math.sin(math.pi * (hora - 6) / 12)
+
+    def atualizar(self):
+        """Integra o modelo até o instante atual do relógio."""
+        with self._lock:
+            agora = self.relogio.tempo()
+            aquecedor = self._ligado("aquecedor")
+            ventoinha = self._ligado("ventoinha")
+            luminaria = self._ligado("luminaria")
+            bomba = self._ligado("bomba")
+
+            while self._instante < agora:
+                dt = min(self.PASSO_MAXIMO, agora - self._instante)
+                externa = self.temperatura_externa(self._instante)
+                troca = 1 / self.CONSTANTE_PERDA + (
+                    1 / self.CONSTANTE_VENTOINHA if ventoinha else 0.0
+                )
+
+                d_temperatura = (externa - self.temperatura_ar) * troca
+                d_umidade = (self.UMIDADE_EXTERNA - self.umidade_ar) * troca
+                d_umidade += self.TRANSPIRACAO * self.umidade_solo / 100
+                if aquecedor:
+                    d_temperatura += self.POTENCIA_AQUECEDOR
+                    d_umidade -= self.SECAGEM_AQUECEDOR
+                if luminaria:
+                    d_temperatura += self.CALOR_LUMINARIA
+
+                d_solo = -self.EVAPORACAO_SOLO * (
+                    1 + max(0.0, self.temperatura_ar - 20) / 10
+                )
+                if bomba:
+                    d_solo += self.VAZAO_BOMBA * self.GANHO_POR_ML
+                    self.agua_bombeada += self.VAZAO_BOMBA * dt
+
+                self.temperatura_ar += d_temperatura * dt
+                self.umidade_ar = max(0.0, min(100.0, self.umidade_ar + d_umidade * dt))
+                self.umidade_solo = max(
+                    0.0, min(100.0, self.umidade_solo + d_solo * dt)
+                )
+                self.temperatura_solo += (
+                    (self.temperatura_ar - self.temperatura_solo)
+                    / self.CONSTANTE_SOLO
+                    * dt
+                )
+                self._instante += dt
+
+    def luminosidade(self):
+        """Luminosidade atual (lux)."""
+        with self._lock:
+            luz = self._luz_do_dia(self.relogio.tempo())
+            return luz + (self.LUZ_LUMINARIA if self._ligado("luminaria") else 0.0)
+
+    def estado(self):
+        """Grandezas atuais do modelo."""
+        self.atualizar()
+        with self._lock:
+            return {
+                "TemperaturaDoAr": self.temperatura_ar,
+                "UmidadeDoAr": self.umidade_ar,
+                "TemperaturaDoSolo": self.temperatura_solo,
+                "UmidadeDoSolo": self.umidade_solo,
+                "Luminosidade": self.luminosidade(),
+                "AguaBombeada": self.agua_bombeada,
+            }
+
+
+class _SensorSimulado:
+    """Base dos sensores simulados: ruído, falhas e picos sobre o modelo."""
+
+    INTERVALO_MINIMO_LEITURA = 0.0
+
+    def __init__(self, modelo, aleatorio, ruido, taxa_falhas=0.0, taxa_picos=0.0):
+        self.modelo = modelo
+        self.aleatorio = aleatorio
+        self.ruido = ruido
+        self.taxa_falhas = taxa_falhas
+        self.taxa_picos = taxa_picos
+
+    def _medir(self, valor, pico):
+        if self.aleatorio.random() < self.taxa_picos:
+            return pico
+        return valor + self.aleatorio.gauss(0, self.ruido)
+
+    def _falhou(self):
+        return self.aleatorio.random() < self.taxa_falhas
+
+    def close(self):
+        pass
+
+
+class BH1750Simulado(_SensorSimulado):
+    """Mesma interface de modules.sensores.luminosidade.BH1750."""
+
+    def ler_luminosidade(self):
+        self.modelo.atualizar()
+        luz = self.modelo.luminosidade()
+        return max(0.0, luz + self.aleatorio.gauss(0, self.ruido * max(luz, 1.0)))
+
+
+class DS18B20Simulado(_SensorSimulado):
+    """Mesma interface de modules.sensores.temperatura_solo.DS18B20."""
+
+    def read_temp(self):
+        if self._falhou():
+            return None
+        self.modelo.atualizar()
+        return self._medir(self.modelo.temperatura_solo, 85.0)
+
+
+class DHT22Simulado(_SensorSimulado):
+    """Mesma interface de modules.sensores.temperatura_ar_umidade_ar.DHT22."""
+
+    def ler_dados(self):
+        if self._falhou():
+            return None, None
+        self.modelo.atualizar()
+        temperatura = self._medir(self.modelo.temperatura_ar, -40.0)
+        umidade = max(0.0, min(100.0, self._medir(self.modelo.umidade_ar, 99.9)))
+        return temperatura, umidade
+
+
+class UmidadeSoloSimulado(_SensorSimulado):
+    """Mesma interface de modules.sensores.umidade_solo.UmidadeSolo."""
+
+    def ler_umidade(self):
+        if self._falhou():
+            return None
+        self.modelo.atualizar()
+        umidade = self._medir(self.modelo.umidade_solo, 0.0)
+        return round(max(0.0, min(100.0, umidade)), 2)
+
+
+class BackendSimulado:
+    """
+    Estufa simulada completa (relógio + GPIO + modelo + sensores).
+
+    Uso:
+        backend = BackendSimulado(velocidade=None, semente=1)
+        sensores = backend.criar_sensores()
+        backend.relogio.avancar(30)
+        print(backend.modelo.estado())
+    """
+
+    nome = "simulado"
+    TEMPO_REAL = False
+
+    def __init__(
+        self,
+        velocidade=60.0,
+        inicio=None,
+        semente=None,
+        pinos=None,
+        estado_inicial=None,
+    ):
+        """
+        Parâmetros:
+            velocidade (float|None): fator sobre o tempo real; None = manual.
+            inicio (float|None): timestamp simulado inicial.
+            semente (int|None): semente do ruído/falhas (reprodutível).
+            pinos (dict|None): atuador → pino BCM.
+            estado_inicial (dict|None): valores iniciais do modelo.
+        """
+        self.relogio = RelogioSimulado(inicio, velocidade)
+        self.gpio = GPIOSimulado()
+        self.modelo = ModeloEstufa(self.relogio, self.gpio, pinos, estado_inicial)
+        self.gpio.antes_de_mudar = self.modelo.atualizar
+        self.aleatorio = random.Random(semente)
+
+    def agora(self):
+        """Data/hora simulada."""
+        return datetime.fromtimestamp(self.relogio.tempo())
+
+    def tempo(self):
+        """Timestamp simulado."""
+        return self.relogio.tempo()
+
+    def agendar(self, segundos, funcao):
+        """Temporizador no tempo simulado."""
+        return self.relogio.agendar(segundos, funcao)
+
+    def criar_sensores(self, taxa_falhas_dht=0.05, taxa_picos=0.01):
+        """
+        Cria os sensores simulados.
+
+        Parâmetros:
+            taxa_falhas_dht (float): fração de leituras do DHT22 que falham.
+            taxa_picos (float): fração de leituras com pico espúrio.
+
+        Retorna:
+            tuple: (luminosidade, temperatura_solo, temperatura_ar, umidade_solo).
+        """
+        return (
+            BH1750Simulado(self.modelo, self.aleatorio, 0.02),
+            DS18B20Simulado(self.modelo, self.aleatorio, 0.05, taxa_picos=taxa_picos),
+            DHT22Simulado(
+                self.modelo,
+                self.aleatorio,
+                0.1,
+                taxa_falhas=taxa_falhas_dht,
+                taxa_picos=taxa_picos,
+            ),
+            UmidadeSoloSimulado(
+                self.modelo, self.aleatorio, 0.3, taxa_picos=taxa_picos
+            ),
+        )
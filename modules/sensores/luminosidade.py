@@ -9,52 +9,187 @@ class BH1750:
 
     Funcionamento:
       - Mede a intensidade de luz ambiente em lux.
-      - Usa modo de medição contínuo em alta resolução (0x10).
-      - Requer ~120ms de tempo de conversão após o comando.
+      - Configura uma única vez um modo de medição contínuo: o chip converte
+        sozinho e a leitura apenas busca o último resultado (sem espera).
+      - Leituras mais rápidas que o tempo de conversão devolvem o último
+        valor lido, sem acessar o barramento.
+      - MTreg (tempo de medição) ajustável: valores altos aumentam a
+        sensibilidade em pouca luz; valores baixos estendem a faixa em luz forte.
 
     Uso:
-        sensor = BH1750()
+        sensor = BH1750()                       # alta resolução, MTreg 69
+        sensor = BH1750(modo=BH1750.MODO_CONTINUO_ALTA_2, mtreg=254)  # pouca luz
         lux = sensor.ler_luminosidade()
         sensor.close()
     """
 
     ENDERECO_I2C = 0x23  # Endereço padrão do BH1750
-    MODO_MEDICAO = 0x10  # Alta resolução (1 lx / 1.2)
 
-    def __init__(self, bus=1, address=ENDERECO_I2C):
+    # Instruções
+    DESLIGAR = 0x00
+    LIGAR = 0x01
+
+    # Modos contínuos
+    MODO_CONTINUO_ALTA = 0x10  # 1 lx de resolução
+    MODO_CONTINUO_ALTA_2 = 0x11  # 0,5 lx de resolução
+    MODO_CONTINUO_BAIXA = 0x13  # 4 lx de resolução
+    MODO_MEDICAO = MODO_CONTINUO_ALTA  # modo padrão
+
+    # Tempo máximo de conversão com MTreg padrão (datasheet, s)
+    TEMPO_CONVERSAO = {
+        MODO_CONTINUO_ALTA: 0.180,
+        MODO_CONTINUO_ALTA_2: 0.180,
+        MODO_CONTINUO_BAIXA: 0.024,
+    }
+
+    # Tempo de medição (MTreg)
+    MTREG_PADRAO = 69
+    MTREG_MINIMO = 31
+    MTREG_MAXIMO = 254
+
+    INTERVALO_MINIMO_LEITURA = 0.2  # conversão de ~120ms + margem (s)
+
+    def __init__(
+        self, bus=1, address=ENDERECO_I2C, modo=MODO_MEDICAO, mtreg=MTREG_PADRAO
+    ):
         """
         Inicializa o sensor BH1750.
 
         Parâmetros:
             bus (int): número do barramento I²C (default = 1).
             address (hex): endereço do sensor no barramento.
+            modo (hex): modo contínuo de medição (default = alta resolução).
+            mtreg (int): tempo de medição, entre 31 e 254 (default = 69).
         """
         self.bus = smbus2.SMBus(bus)
         self.address = address
+        self.modo = modo
+        self.mtreg = mtreg
+
+        self._configurado = False
+        self._proxima_conversao = 0.0  # instante monotônico do próximo resultado
+        self._ultimo_lux = None
+        self._atualizar_intervalo()
+
+        try:
+            self.configurar()
+        except Exception as e:
+            print(f"⚠️ Erro ao configurar BH1750: {e}")
+
+    def _atualizar_intervalo(self):
+        """Recalcula o tempo de conversão para o modo/MTreg atuais."""
+        self.tempo_conversao = (
+            self.TEMPO_CONVERSAO[self.modo] * self.mtreg / self.MTREG_PADRAO
+        )
+        # Usado pela amostragem contínua como intervalo mínimo entre leituras
+        self.INTERVALO_MINIMO_LEITURA = self.tempo_conversao
+
+    def configurar(self, modo=None, mtreg=None):
+        """
+        Liga o sensor, grava o MTreg e inicia o modo contínuo.
+
+        Parâmetros:
+            modo (hex|None): novo modo contínuo (None = mantém o atual).
+            mtreg (int|None): novo MTreg (None = mantém o atual).
+
+        Levanta:
+            ValueError: modo ou MTreg fora do suportado.
+            OSError: falha de comunicação no barramento.
+        """
+        modo = self.modo if modo is None else modo
+        mtreg = self.mtreg if mtreg is None else mtreg
+        if modo not in self.TEMPO_CONVERSAO:
+            raise ValueError(f"Modo do BH1750 não suportado: {modo:#x}")
+        if not self.MTREG_MINIMO <= mtreg <= self.MTREG_MAXIMO:
+            raise ValueError(
+                f"MTreg deve estar entre {self.MTREG_MINIMO} e {self.MTREG_MAXIMO}"
+            )
+
+        self._configurado = False
+        self.bus.write_byte(self.address, self.LIGAR)
+        # MTreg é gravado em duas instruções: 3 bits altos e 5 bits baixos
+        self.bus.write_byte(self.address, 0x40 | (mtreg >> 5))
+        self.bus.write_byte(self.address, 0x60 | (mtreg & 0x1F))
+        self.bus.write_byte(self.address, modo)
+
+        self.modo = modo
+        self.mtreg = mtreg
+        self._atualizar_intervalo()
+        self._ultimo_lux = None
+        self._proxima_conversao = time.monotonic() + self.tempo_conversao
+        self._configurado = True
+
+    def ajustar_mtreg(self, mtreg):
+        """
+        Altera o tempo de medição (ex.: 254 para ambientes escuros).
+
+        Parâmetros:
+            mtreg (int): novo MTreg (31–254).
+
+        Retorna:
+            bool: True se o sensor foi reconfigurado.
+        """
+        try:
+            self.configurar(mtreg=mtreg)
+            return True
+        except Exception as e:
+            print(f"⚠️ Erro ao ajustar MTreg do BH1750: {e}")
+            return False
+
+    def _converter(self, bruto):
+        """Converte o valor bruto em lux para o modo/MTreg atuais."""
+        lux = bruto / 1.2 * (self.MTREG_PADRAO / self.mtreg)
+        if self.modo == self.MODO_CONTINUO_ALTA_2:
+            lux /= 2
+        return lux
 
     def ler_luminosidade(self):
         """
         Lê o nível de luminosidade em lux.
 
+        Não espera conversão: devolve o resultado mais recente do chip. Se
+        chamada antes de uma nova conversão ficar pronta, devolve o último
+        valor lido (sem acessar o barramento).
+
         Retorna:
             float | None:
                 - Valor da luminosidade em lux, se leitura bem-sucedida.
                 - None, em caso de erro.
         """
         try:
-            self.bus.write_byte(self.address, self.MODO_MEDICAO)  # envia comando
-            time.sleep(0.2)  # aguarda conversão (~120ms)
+            if not self._configurado:
+                self.configurar()
+
+            agora = time.monotonic()
+            if agora < self._proxima_conversao:
+                if self._ultimo_lux is not None:
+                    return self._ultimo_lux
+                # Primeira conversão após configurar ainda em andamento
+                time.sleep(self._proxima_conversao - agora)
 
-            data = self.bus.read_i2c_block_data(self.address, 0, 2)  # lê 2 bytes
+            # Leitura pura de 2 bytes: um comando antes dela (ex.: 0x00)
+            # desligaria o sensor e interromperia o modo contínuo.
+            mensagem = smbus2.i2c_msg.read(self.address, 2)
+            self.bus.i2c_rdwr(mensagem)
+            data = list(mensagem)
             nivel_luminosidade = (data[0] << 8) | data[1]  # converte p/ decimal
-            return nivel_luminosidade / 1.2  # fator de correção
+
+            self._ultimo_lux = self._converter(nivel_luminosidade)
+            self._proxima_conversao = time.monotonic() + self.tempo_conversao
+            return self._ultimo_lux
 
         except Exception as e:
             print(f"⚠️ Erro ao ler BH1750: {e}")
+            # Reconfigura na próxima leitura (o sensor pode ter reiniciado)
+            self._configurado = False
             return None
 
     def close(self):
-        """Fecha a comunicação com o barramento I²C."""
+        """Desliga o sensor e fecha a comunicação com o barramento I²C."""
+        try:
+            self.bus.write_byte(self.address, self.DESLIGAR)
+        except Exception:
+            pass
         try:
             self.bus.close()
         except Exception as e:
@@ -17,6 +17,8 @@ class DHT22:
       - Leituras falhas são comuns → usar tentativas múltiplas no controle.
     """
 
+    INTERVALO_MINIMO_LEITURA = 2.0  # o DHT22 não converte mais rápido (s)
+
     def __init__(self, pin=board.D17):
         """
         Inicializa o sensor DHT22 no pino especificado.
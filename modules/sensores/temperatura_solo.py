@@ -1,6 +1,240 @@
 # modules/sensores/temperatura_solo.py
 import glob
+import os
+import threading
 import time
+from concurrent.futures import ThreadPoolExecutor
+
+DIRETORIO_W1 = "/sys/bus/w1/devices/"
+
+
+class BarramentoOneWire:
+    """
+    Gerenciador do barramento 1-Wire com várias sondas DS18B20.
+
+    Funcionamento:
+      - Descobre todas as sondas ("28-*") e repete a varredura em segundo
+        plano, então sondas conectadas depois do boot passam a ser lidas.
+      - Se o kernel oferece "therm_bulk_read", dispara uma única conversão
+        para o barramento inteiro e depois só busca o resultado de cada sonda.
+      - Cada sonda é lida com um único os.read do arquivo do sysfs, em
+        paralelo com as demais.
+
+    Uso:
+        barramento = BarramentoOneWire()
+        barramento.iniciar()
+        print(barramento.ler_sondas())   # {"28-0316...": 23.5, ...}
+        print(barramento.ler_resumo())   # média/mínimo/máximo + sondas
+        barramento.parar()
+    """
+
+    TEMPO_CONVERSAO = 0.75  # conversão de 12 bits (s)
+
+    def __init__(self, diretorio=DIRETORIO_W1, intervalo_varredura=60):
+        """
+        Parâmetros:
+            diretorio (str): diretório de dispositivos 1-Wire no sysfs.
+            intervalo_varredura (float): intervalo entre varreduras (s).
+        """
+        self.diretorio = diretorio
+        self.intervalo_varredura = intervalo_varredura
+
+        self._lock = threading.Lock()
+        self._sondas = []  # caminhos dos diretórios das sondas
+        self._mestres_bulk = []  # arquivos therm_bulk_read disponíveis
+        self._executor = None
+        self._parar = threading.Event()
+        self._thread = None
+
+        self.varrer()
+
+    # ------------------------------------------------------------------
+    # Descoberta
+    # ------------------------------------------------------------------
+    def varrer(self):
+        """
+        Atualiza a lista de sondas e de mestres com conversão em lote.
+
+        Retorna:
+            list[str]: identificadores das sondas encontradas.
+        """
+        sondas = sorted(glob.glob(os.path.join(self.diretorio, "28*")))
+        mestres = sorted(
+            glob.glob(os.path.join(self.diretorio, "w1_bus_master*", "therm_bulk_read"))
+        )
+        with self._lock:
+            novas = set(sondas) - set(self._sondas)
+            perdidas = set(self._sondas) - set(sondas)
+            self._sondas = sondas
+            self._mestres_bulk = mestres
+
+        for caminho in sorted(novas):
+            print(f"🌱 Sonda DS18B20 encontrada: {os.path.basename(caminho)}")
+        for caminho in sorted(perdidas):
+            print(f"⚠️ Sonda DS18B20 removida: {os.path.basename(caminho)}")
+        return [os.path.basename(caminho) for caminho in sondas]
+
+    def iniciar(self):
+        """Inicia a varredura periódica em segundo plano (idempotente)."""
+        with self._lock:
+            if self._thread is not None and self._thread.is_alive():
+                return
+            self._parar.clear()
+            self._thread = threading.Thread(
+                target=self._varrer_periodicamente, name="varredura-1wire", daemon=True
+            )
+            self._thread.start()
+
+    def parar(self):
+        """Encerra a varredura periódica e o executor de leituras."""
+        self._parar.set()
+        if self._thread:
+            self._thread.join(2)
+        if self._executor:
+            self._executor.shutdown(wait=False)
+            self._executor = None
+
+    def _varrer_periodicamente(self):
+        while not self._parar.wait(self.intervalo_varredura):
+            try:
+                self.varrer()
+            except Exception as e:
+                print(f"⚠️ Erro na varredura 1-Wire: {e}")
+
+    def sondas(self):
+        """Identificadores das sondas conhecidas."""
+        with self._lock:
+            return [os.path.basename(caminho) for caminho in self._sondas]
+
+    # ------------------------------------------------------------------
+    # Leitura
+    # ------------------------------------------------------------------
+    @staticmethod
+    def _ler_arquivo(caminho):
+        """Lê o arquivo inteiro do sysfs com um único os.read."""
+        fd = os.open(caminho, os.O_RDONLY)
+        try:
+            return os.read(fd, 256).decode("ascii", "replace")
+        finally:
+            os.close(fd)
+
+    def _disparar_conversao_lote(self, mestres):
+        """
+        Dispara a conversão em todas as sondas de uma vez e aguarda o fim.
+
+        Retorna:
+            bool: True se os resultados podem ser lidos em "temperature".
+        """
+        try:
+            for mestre in mestres:
+                with open(mestre, "w") as f:
+                    f.write("trigger\n")
+            limite = time.monotonic() + self.TEMPO_CONVERSAO + 0.5
+            while time.monotonic() < limite:
+                # -1 → conversão em andamento; 0/1 → concluída
+                if all(self._ler_arquivo(m).strip() != "-1" for m in mestres):
+                    return True
+                time.sleep(0.05)
+        except Exception as e:
+            print(f"⚠️ Erro na conversão em lote 1-Wire: {e}")
+        return False
+
+    @staticmethod
+    def _converter_w1_slave(conteudo):
+        """Extrai °C do formato w1_slave (CRC "YES" na primeira linha)."""
+        linhas = conteudo.splitlines()
+        if len(linhas) < 2 or not linhas[0].strip().endswith("YES"):
+            return None
+        posicao = linhas[1].find("t=")
+        if posicao == -1:
+            return None
+        return float(linhas[1][posicao + 2 :]) / 1000.0
+
+    def _ler_sonda(self, caminho):
+        """
+        Lê uma sonda (uma nova tentativa imediata em caso de CRC inválido).
+
+        Usa "temperature" (valor em m°C, já validado pelo kernel) quando
+        existe; senão, "w1_slave".
+        """
+        arquivo_temperatura = os.path.join(caminho, "temperature")
+        usar_temperatura = os.path.exists(arquivo_temperatura)
+        for _ in range(2):
+            try:
+                if usar_temperatura:
+                    conteudo = self._ler_arquivo(arquivo_temperatura).strip()
+                    if conteudo:
+                        return int(conteudo) / 1000.0
+                else:
+                    valor = self._converter_w1_slave(
+                        self._ler_arquivo(os.path.join(caminho, "w1_slave"))
+                    )
+                    if valor is not None:
+                        return valor
+            except Exception as e:
+                print(f"⚠️ Erro ao ler DS18B20 {os.path.basename(caminho)}: {e}")
+        return None
+
+    def ler_sondas(self):
+        """
+        Lê todas as sondas do barramento.
+
+        Retorna:
+            dict: identificador da sonda → temperatura em °C (ou None).
+        """
+        with self._lock:
+            sondas = list(self._sondas)
+            mestres = list(self._mestres_bulk)
+        if not sondas:
+            return {}
+
+        if mestres:
+            self._disparar_conversao_lote(mestres)
+
+        if len(sondas) == 1:
+            return {os.path.basename(sondas[0]): self._ler_sonda(sondas[0])}
+
+        if self._executor is None:
+            self._executor = ThreadPoolExecutor(
+                max_workers=8, thread_name_prefix="leitura-1wire"
+            )
+        valores = self._executor.map(self._ler_sonda, sondas)
+        return {
+            os.path.basename(caminho): valor for caminho, valor in zip(sondas, valores)
+        }
+
+    def ler_resumo(self):
+        """
+        Lê todas as sondas e agrega as válidas.
+
+        Retorna:
+            dict: {"media", "minimo", "maximo", "validas", "sondas"};
+                  media/minimo/maximo são None se nenhuma sonda respondeu.
+        """
+        sondas = self.ler_sondas()
+        validas = [v for v in sondas.values() if v is not None]
+        return {
+            "media": sum(validas) / len(validas) if validas else None,
+            "minimo": min(validas) if validas else None,
+            "maximo": max(validas) if validas else None,
+            "validas": len(validas),
+            "sondas": sondas,
+        }
+
+
+# Barramento compartilhado pelas instâncias de DS18B20 (criado sob demanda)
+_barramento_padrao = None
+_lock_barramento_padrao = threading.Lock()
+
+
+def obter_barramento():
+    """Retorna o barramento 1-Wire compartilhado, com varredura ativa."""
+    global _barramento_padrao
+    with _lock_barramento_padrao:
+        if _barramento_padrao is None:
+            _barramento_padrao = BarramentoOneWire()
+            _barramento_padrao.iniciar()
+        return _barramento_padrao
 
 
 class DS18B20:
@@ -8,79 +242,74 @@ class DS18B20:
     Driver para o sensor DS18B20 (temperatura do solo) via 1-Wire.
 
     Funcionamento:
-      - O sensor aparece em /sys/bus/w1/devices/ com prefixo "28-".
-      - A leitura é feita no arquivo "w1_slave".
-      - A validação é feita via CRC ("YES" no final da primeira linha).
-      - Retorna a temperatura em °C, ou None em caso de falha.
+      - As sondas aparecem em /sys/bus/w1/devices/ com prefixo "28-";
+        todas são lidas pelo BarramentoOneWire compartilhado.
+      - A validação é feita via CRC ("YES" no final da primeira linha) ou
+        pelo kernel, no arquivo "temperature".
+      - `read_temp` retorna a média das sondas válidas em °C, ou None em
+        caso de falha; `ler_resumo` traz cada sonda e o mínimo/máximo.
     """
 
-    def __init__(self):
+    INTERVALO_MINIMO_LEITURA = 0.75  # conversão de 12 bits (s)
+
+    def __init__(self, barramento=None):
         """
-        Inicializa o DS18B20, identificando o diretório do dispositivo.
+        Inicializa o DS18B20 sobre o barramento 1-Wire.
+
+        Parâmetros:
+            barramento (BarramentoOneWire|None): default = barramento compartilhado.
         """
-        base_dir = "/sys/bus/w1/devices/"
-        device_folders = glob.glob(base_dir + "28*")
-        if device_folders:
-            self.device_file = device_folders[0] + "/w1_slave"
-        else:
-            self.device_file = None
+        self.barramento = barramento or obter_barramento()
+        if not self.barramento.sondas():
             print("⚠️ DS18B20 não encontrado no boot. (verifique conexões e 1-Wire)")
 
+    @property
+    def device_file(self):
+        """Arquivo w1_slave da primeira sonda (compatibilidade)."""
+        sondas = self.barramento.sondas()
+        if not sondas:
+            return None
+        return os.path.join(self.barramento.diretorio, sondas[0], "w1_slave")
+
     def read_temp_raw(self):
         """
-        Lê os dados brutos do sensor (duas linhas de texto).
+        Lê os dados brutos da primeira sonda (duas linhas de texto).
 
         Retorna:
             list[str] | None:
                 - Linhas do arquivo w1_slave.
                 - None em caso de erro ou sensor não encontrado.
         """
-        if not self.device_file:
+        device_file = self.device_file
+        if not device_file:
             return None
         try:
-            with open(self.device_file, "r") as f:
-                return f.readlines()
+            return BarramentoOneWire._ler_arquivo(device_file).splitlines(True)
         except Exception as e:
             print(f"⚠️ Erro ao ler DS18B20: {e}")
             return None
 
     def read_temp(self):
         """
-        Processa os dados e retorna a temperatura em °C.
+        Retorna a temperatura média das sondas em °C.
 
         Retorna:
             float | None:
-                - Temperatura em °C se a leitura for válida.
-                - None em caso de falha.
+                - Média das sondas com leitura válida.
+                - None se nenhuma sonda respondeu.
         """
-        lines = self.read_temp_raw()
-        if not lines:
-            return None
+        return self.ler_resumo()["media"]
 
-        # Verifica integridade até 3 tentativas
-        retries = 3
-        while lines and lines[0].strip()[-3:] != "YES" and retries > 0:
-            time.sleep(0.2)
-            lines = self.read_temp_raw()
-            retries -= 1
-        if not lines or retries == 0:
-            return None
+    def ler_sondas(self):
+        """Temperatura de cada sonda: identificador → °C (ou None)."""
+        return self.barramento.ler_sondas()
 
-        # Extrai temperatura
-        equals_pos = lines[1].find("t=")
-        if equals_pos != -1:
-            try:
-                temp_string = lines[1][equals_pos + 2 :]
-                temp_c = float(temp_string) / 1000.0
-                return temp_c
-            except Exception as e:
-                print(f"⚠️ Erro ao converter leitura do DS18B20: {e}")
-                return None
-
-        return None
+    def ler_resumo(self):
+        """Média/mínimo/máximo e leituras por sonda (ver BarramentoOneWire)."""
+        return self.barramento.ler_resumo()
 
     def close(self):
-        """Método de fechamento (mantido por consistência, não necessário no DS18B20)."""
+        """Método de fechamento (o barramento compartilhado continua ativo)."""
         pass
 
 
@@ -88,9 +317,15 @@ class DS18B20:
 if __name__ == "__main__":
     sensor = DS18B20()
     while True:
-        temp = sensor.read_temp()
-        if temp is not None:
-            print(f"🌱 Temperatura do Solo: {temp:.2f}°C")
+        resumo = sensor.ler_resumo()
+        if resumo["media"] is not None:
+            print(
+                f"🌱 Temperatura do Solo: {resumo['media']:.2f}°C "
+                f"(mín {resumo['minimo']:.2f} / máx {resumo['maximo']:.2f}, "
+                f"{resumo['validas']} sonda(s))"
+            )
+            for sonda, temp in resumo["sondas"].items():
+                print(f"   • {sonda}: {f'{temp:.2f}°C' if temp is not None else '--'}")
         else:
             print("❌ Falha ao ler DS18B20")
         time.sleep(2)
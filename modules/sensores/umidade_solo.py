@@ -1,22 +1,194 @@
 # modules/sensores/umidade_solo.py
+import threading
 import time
+from array import array
+
 import board
 import busio
 import adafruit_ads1x15.ads1115 as ADS
+from adafruit_ads1x15.ads1x15 import Mode
 from adafruit_ads1x15.analog_in import AnalogIn
 
+# Calibração padrão (valor cru no solo seco, valor cru no solo úmido)
+CALIBRACAO_PADRAO = (25000, 12000)
+
+
+def media_aparada(valores, fracao=0.25):
+    """
+    Média descartando `fracao` dos valores em cada extremo.
+
+    Parâmetros:
+        valores (Sequence[int|float]): amostras.
+        fracao (float): fração descartada de cada lado (0 = média simples).
+
+    Retorna:
+        float | None: média aparada ou None se não houver amostras.
+    """
+    ordenados = sorted(valores)
+    n = len(ordenados)
+    if n == 0:
+        return None
+    corte = min(int(n * fracao), (n - 1) // 2)
+    centro = ordenados[corte : n - corte]
+    return sum(centro) / len(centro)
+
+
+def mediana(valores):
+    """Mediana das amostras (None se não houver amostras)."""
+    ordenados = sorted(valores)
+    n = len(ordenados)
+    if n == 0:
+        return None
+    meio = n // 2
+    if n % 2:
+        return float(ordenados[meio])
+    return (ordenados[meio - 1] + ordenados[meio]) / 2
+
+
+class LeitorCanaisUmidade:
+    """
+    Leitura sobreamostrada dos canais do ADS1115 em modo contínuo.
+
+    Funcionamento:
+      - O ADS1115 fica em conversão contínua na taxa configurada; ao trocar
+        de canal a biblioteca reconfigura o multiplexador e aguarda o
+        primeiro resultado.
+      - Cada canal recebe `amostras` leituras espaçadas pelo período de
+        conversão, gravadas em um array fixo de inteiros.
+      - O valor robusto de cada canal é a média aparada (ou a mediana) das
+        amostras, convertido em % pela calibração seco/molhado do canal.
+
+    Uso:
+        leitor = LeitorCanaisUmidade(ads, calibracoes={ADS.P0: (25000, 12000),
+                                                       ADS.P1: (24000, 11500)})
+        leitor.ler_umidades()  # {0: 41.7, 1: 38.2}
+    """
+
+    def __init__(
+        self,
+        ads,
+        calibracoes=None,
+        taxa=860,
+        amostras=16,
+        estimador="media_aparada",
+        fracao_descarte=0.25,
+    ):
+        """
+        Parâmetros:
+            ads (ADS.ADS1115): conversor já inicializado.
+            calibracoes (dict|None): canal → (seco, molhado).
+                Default = os quatro canais com CALIBRACAO_PADRAO.
+            taxa (int): taxa de conversão em amostras/s (8 a 860).
+            amostras (int): leituras por canal a cada rodada.
+            estimador (str): "media_aparada" ou "mediana".
+            fracao_descarte (float): fração descartada em cada extremo
+                pela média aparada.
+        """
+        if estimador not in ("media_aparada", "mediana"):
+            raise ValueError(f"Estimador desconhecido: {estimador}")
+
+        self.ads = ads
+        self.calibracoes = (
+            {canal: CALIBRACAO_PADRAO for canal in (ADS.P0, ADS.P1, ADS.P2, ADS.P3)}
+            if calibracoes is None
+            else dict(calibracoes)
+        )
+        self.canais = tuple(self.calibracoes)
+        self.amostras = amostras
+        self.estimador = estimador
+        self.fracao_descarte = fracao_descarte
+
+        self._lock = threading.Lock()
+        # Um bloco de `amostras` posições por canal
+        self._brutos = array("i", [0]) * (len(self.canais) * amostras)
+
+        self.ads.mode = Mode.CONTINUOUS
+        self.ads.data_rate = taxa
+        self.periodo = 1.0 / taxa
+
+    def _estimar(self, bloco):
+        if self.estimador == "mediana":
+            return mediana(bloco)
+        return media_aparada(bloco, self.fracao_descarte)
+
+    def ler_brutos(self, canais=None):
+        """
+        Sobreamostra os canais e retorna o valor robusto de cada um.
+
+        Parâmetros:
+            canais (Iterable|None): subconjunto de canais (None = todos).
+
+        Retorna:
+            dict: canal → valor cru estimado (ou None em caso de erro).
+        """
+        resultado = {}
+        with self._lock:
+            for i, canal in enumerate(self.canais):
+                if canais is not None and canal not in canais:
+                    continue
+                inicio = i * self.amostras
+                try:
+                    for j in range(self.amostras):
+                        if j:
+                            time.sleep(self.periodo)  # próxima conversão
+                        self._brutos[inicio + j] = self.ads.read(canal)
+                except Exception as e:
+                    print(f"⚠️ Erro ao ler canal {canal} do ADS1115: {e}")
+                    resultado[canal] = None
+                    continue
+                resultado[canal] = self._estimar(
+                    self._brutos[inicio : inicio + self.amostras]
+                )
+        return resultado
+
+    def converter(self, canal, bruto):
+        """
+        Converte o valor cru de um canal em % pela calibração do canal.
+
+        Retorna:
+            float | None: umidade entre 0% e 100%, arredondada em 2 casas.
+        """
+        if bruto is None:
+            return None
+        seco, molhado = self.calibracoes[canal]
+        umidade = 100 - ((bruto - molhado) / (seco - molhado) * 100)
+        return round(max(0, min(100, umidade)), 2)
+
+    def ler_umidades(self):
+        """
+        Lê todos os canais configurados.
+
+        Retorna:
+            dict: canal → umidade (%) ou None em caso de erro.
+        """
+        return {
+            canal: self.converter(canal, bruto)
+            for canal, bruto in self.ler_brutos().items()
+        }
+
 
 class UmidadeSolo:
     """
     Driver para o sensor capacitivo de umidade do solo via ADS1115.
 
     Funcionamento:
-      - Lê valor analógico bruto (0–65535).
+      - Lê valor analógico bruto (0–65535), sobreamostrado em modo contínuo.
       - Converte para porcentagem (%), calibrado entre valores de solo seco e úmido.
       - Mantém saída entre 0% e 100%.
+      - Sondas extras nos canais P1–P3 são lidas com `ler_umidades`.
     """
 
-    def __init__(self, canal=ADS.P0, seco=25000, molhado=12000):
+    INTERVALO_MINIMO_LEITURA = 0.01  # recalculado pela taxa e nº de amostras (s)
+
+    def __init__(
+        self,
+        canal=ADS.P0,
+        seco=25000,
+        molhado=12000,
+        calibracoes=None,
+        taxa=860,
+        amostras=16,
+    ):
         """
         Inicializa o sensor de umidade do solo.
 
@@ -24,44 +196,62 @@ class UmidadeSolo:
             canal: canal analógico do ADS1115 (default = ADS.P0).
             seco (int): valor lido no solo seco (ajustar conforme calibração).
             molhado (int): valor lido no solo úmido (ajustar conforme calibração).
+            calibracoes (dict|None): sondas extras, canal → (seco, molhado).
+            taxa (int): taxa de conversão contínua (amostras/s).
+            amostras (int): leituras por canal em cada rodada.
         """
+        self.canal = canal
+        self.seco = seco
+        self.molhado = molhado
+        self.leitor = None
+
         try:
             self.i2c = busio.I2C(board.SCL, board.SDA)
             self.ads = ADS.ADS1115(self.i2c)
             self.canal_umidade = AnalogIn(self.ads, canal)
+            self.leitor = LeitorCanaisUmidade(
+                self.ads,
+                {canal: (seco, molhado), **(calibracoes or {})},
+                taxa=taxa,
+                amostras=amostras,
+            )
+            # Uma rodada sobreamostrada do canal principal antes da próxima
+            self.INTERVALO_MINIMO_LEITURA = max(
+                self.INTERVALO_MINIMO_LEITURA, amostras / taxa
+            )
         except Exception as e:
             print(f"⚠️ Erro ao inicializar ADS1115: {e}")
             self.canal_umidade = None
 
-        # valores de calibração
-        self.seco = seco
-        self.molhado = molhado
-
     def ler_umidade(self):
         """
-        Lê o valor de umidade do solo em porcentagem.
+        Lê o valor de umidade do solo em porcentagem (canal principal).
 
         Retorna:
             float | None:
                 - Valor de umidade (%), arredondado para 2 casas decimais.
                 - None, em caso de erro ou falha de leitura.
         """
-        if not self.canal_umidade:
+        if not self.leitor:
             return None
         try:
-            leitura = self.canal_umidade.value  # valor cru (0–65535)
-
-            # Converte para escala calibrada
-            umidade = 100 - (
-                (leitura - self.molhado) / (self.seco - self.molhado) * 100
-            )
-            umidade = max(0, min(100, umidade))  # mantém entre 0% e 100%
-
-            return round(umidade, 2)
+            bruto = self.leitor.ler_brutos((self.canal,)).get(self.canal)
+            return self.leitor.converter(self.canal, bruto)
         except Exception as e:
             print(f"⚠️ Erro ao ler umidade do solo: {e}")
             return None
 
+    def ler_umidades(self):
+        """
+        Lê todas as sondas configuradas.
+
+        Retorna:
+            dict: canal → umidade (%) ou None; vazio se o ADS1115 não iniciou.
+        """
+        if not self.leitor:
+            return {}
+        return self.leitor.ler_umidades()
+
     def close(self):
         """Método de fechamento (mantido por consistência, não necessário para ADS1115)."""
         pass
@@ -2,7 +2,7 @@ from config.firebase_config import firestore_db
 from services.ciclo_service import ciclo_reset_event
 from google.cloud import firestore
 from services.fases_service import proxima_fase, agendar_avanco_fase
-from config.configuracao_local import carregar_configuracao_local
+from config.cache_configuracao import obter_configuracao
 
 
 def avancar_fase_forcado(estufa_id: str) -> None:
@@ -13,7 +13,7 @@ def avancar_fase_forcado(estufa_id: str) -> None:
     Atualiza diretamente o Firestore e dispara o reset do ciclo principal.
 
     Fluxo:
-        1. Carrega a configuração atual da estufa.
+        1. Obtém a configuração atual da estufa (cache em memória).
         2. Determina a próxima fase com base na fase atual.
         3. Atualiza o documento principal em Firestore:
             - FaseAtual → nova fase.
@@ -35,7 +35,7 @@ def avancar_fase_forcado(estufa_id: str) -> None:
           ou se a fase atual não tiver próxima fase definida.
     """
     # 1. Carrega configuração atual
-    config = carregar_configuracao_local(estufa_id)
+    config = obter_configuracao(estufa_id)
     if not config:
         raise Exception("Configuração local não encontrada.")
 
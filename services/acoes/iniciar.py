@@ -1,6 +1,7 @@
 from config.firebase_config import firestore_db
 from google.cloud import firestore
 from config.configuracao_local import carregar_preset
+from config.cache_presets import cache_presets
 from services.ciclo_service import ciclo_reset_event
 from services.fases_service import agendar_avanco_fase
 
@@ -14,7 +15,8 @@ def iniciar_estufa(estufa_id: str, planta: str, fase: str) -> None:
     o ciclo principal e agenda o próximo avanço automático.
 
     Fluxo:
-        1. Valida se existe preset da planta/fase escolhida.
+        1. Pré-carrega os presets de todas as fases da planta (uma leitura
+           em lote) e valida se existe preset da planta/fase escolhida.
         2. Atualiza o documento principal da estufa no Firestore:
             - PlantaAtual → planta escolhida.
             - FaseAtual → fase inicial escolhida.
@@ -35,7 +37,8 @@ def iniciar_estufa(estufa_id: str, planta: str, fase: str) -> None:
     Exceções:
         - Levanta Exception se o preset da planta/fase não for encontrado.
     """
-    # 1. Valida preset da planta/fase
+    # 1. Pré-carrega todas as fases da planta e valida o preset inicial
+    cache_presets.pre_carregar(planta)
     preset = carregar_preset(planta, fase)
     if not preset:
         raise Exception(f"Preset não encontrado para planta={planta}, fase={fase}")
@@ -0,0 +1,312 @@
+# services/agendador_service.py
+"""
+Agendador de tarefas periódicas com taxas independentes.
+
+Responsabilidades:
+- Cada tarefa tem o próprio período e roda em uma grade fixa
+  (inicio + k·periodo, relógio monotônico): o tempo de execução não
+  acumula deriva, ao contrário de "executar; esperar(periodo)".
+- Política para execuções perdidas (tarefa anterior demorou mais que o
+  período): PULAR (volta para a grade e conta as perdidas), RECUPERAR
+  (executa as atrasadas em sequência, até um limite) ou ATRASAR (próxima
+  execução a um período do fim da atual).
+- Estatísticas por tarefa: execuções, perdidas, estouros (duração maior
+  que o período), falhas, atraso em relação à grade (média = atraso,
+  desvio padrão = jitter) e duração, em ms.
+- Um evento de despertar (ex.: ciclo_reset_event) executa imediatamente as
+  tarefas marcadas com `despertar=True`, sem mudar a grade delas.
+
+As tarefas rodam em sequência na thread de `executar` (ou no laço asyncio,
+com `executar_async`); tarefas lentas (ex.: rede) devem apenas enfileirar o
+trabalho ou, no laço, devolver um awaitable (ex.: run_in_executor).
+
+Uso:
+    agendador = Agendador()
+    agendador.adicionar("seguranca", controlar, periodo=5, despertar=True)
+    agendador.adicionar("fase", verificar_fase, periodo=300, politica=PULAR)
+    agendador.executar(despertar=ciclo_reset_event)
+"""
+
+import asyncio
+import inspect
+import math
+import threading
+import time
+
+from services.agregacao_service import AgregadoWelford
+
+PULAR = "pular"
+RECUPERAR = "recuperar"
+ATRASAR = "atrasar"
+POLITICAS = (PULAR, RECUPERAR, ATRASAR)
+
+MAXIMO_RECUPERAR_PADRAO = 3
+
+
+class EventoDespertar(threading.Event):
+    """
+    threading.Event que também avisa ouvintes ao ser sinalizado (ex.: o
+    laço asyncio do runtime_async_service, que não pode esperar um
+    threading.Event sem ocupar uma thread).
+    """
+
+    def __init__(self):
+        super().__init__()
+        self._ouvintes = []
+
+    def registrar_ouvinte(self, callback):
+        """callback() é chamado (na thread de quem sinaliza) a cada set()."""
+        self._ouvintes.append(callback)
+
+    def remover_ouvinte(self, callback):
+        if callback in self._ouvintes:
+            self._ouvintes.remove(callback)
+
+    def set(self):
+        super().set()
+        for callback in list(self._ouvintes):
+            callback()
+
+
+class Tarefa:
+    """Tarefa periódica registrada no Agendador (estado e estatísticas)."""
+
+    def __init__(self, nome, funcao, periodo, politica, despertar, proxima):
+        self.nome = nome
+        self.funcao = funcao
+        self.periodo = periodo
+        self.politica = politica
+        self.despertar = despertar
+        self.proxima = proxima
+        self.imediata = False
+
+        self.execucoes = 0
+        self.perdidas = 0
+        self.estouros = 0
+        self.falhas = 0
+        self.atraso = AgregadoWelford()  # ms após o horário previsto
+        self.duracao = AgregadoWelford()  # ms
+
+    def estatisticas(self):
+        """
+        Retorna:
+            dict: {periodo, politica, execucoes, perdidas, estouros, falhas,
+            atraso_ms {media, maximo, jitter}, duracao_ms {media, maximo}}.
+        """
+        atraso = self.atraso.resumo(casas=3)
+        duracao = self.duracao.resumo(casas=3)
+        return {
+            "periodo": self.periodo,
+            "politica": self.politica,
+            "execucoes": self.execucoes,
+            "perdidas": self.perdidas,
+            "estouros": self.estouros,
+            "falhas": self.falhas,
+            "atraso_ms": {
+                "media": atraso["media"],
+                "maximo": atraso["maximo"],
+                "jitter": atraso["desvio_padrao"],
+            },
+            "duracao_ms": {"media": duracao["media"], "maximo": duracao["maximo"]},
+        }
+
+
+class Agendador:
+    """
+    Executa tarefas periódicas de períodos diferentes em uma única thread.
+    """
+
+    def __init__(self, relogio=time.monotonic, maximo_recuperar=None):
+        """
+        Parâmetros:
+            relogio (callable): fonte de tempo monotônica (s).
+            maximo_recuperar (int|None): execuções atrasadas feitas em
+                sequência na política RECUPERAR; o excedente é pulado
+                (default = MAXIMO_RECUPERAR_PADRAO).
+        """
+        self._relogio = relogio
+        self.maximo_recuperar = (
+            MAXIMO_RECUPERAR_PADRAO if maximo_recuperar is None else maximo_recuperar
+        )
+        self._tarefas = []
+        self._lock = threading.Lock()
+
+    def adicionar(
+        self, nome, funcao, periodo, politica=PULAR, atraso_inicial=0.0, despertar=False
+    ):
+        """
+        Registra uma tarefa.
+
+        Parâmetros:
+            nome (str): identificação nas estatísticas.
+            funcao (callable): chamada sem argumentos a cada execução.
+            periodo (float): intervalo entre execuções (s).
+            politica (str): PULAR, RECUPERAR ou ATRASAR.
+            atraso_inicial (float): espera antes da primeira execução (s).
+            despertar (bool): executa imediatamente quando o evento de
+                despertar de `executar` for sinalizado.
+
+        Retorna:
+            Tarefa
+        """
+        if periodo <= 0:
+            raise ValueError(f"Período inválido para '{nome}': {periodo}")
+        if politica not in POLITICAS:
+            raise ValueError(f"Política inválida para '{nome}': {politica}")
+        tarefa = Tarefa(
+            nome,
+            funcao,
+            periodo,
+            politica,
+            despertar,
+            self._relogio() + atraso_inicial,
+        )
+        with self._lock:
+            self._tarefas.append(tarefa)
+        return tarefa
+
+    def _proxima_tarefa(self):
+        with self._lock:
+            tarefas = list(self._tarefas)
+        imediatas = [t for t in tarefas if t.imediata]
+        if imediatas:
+            return imediatas[0]
+        return min(tarefas, key=lambda t: t.proxima) if tarefas else None
+
+    def _executar_tarefa(self, tarefa, inicio):
+        fora_da_grade = tarefa.imediata
+        tarefa.imediata = False
+        try:
+            tarefa.funcao()
+        except Exception as e:
+            tarefa.falhas += 1
+            print(f"⚠️ Erro na tarefa '{tarefa.nome}': {e}")
+        self._concluir_tarefa(tarefa, inicio, fora_da_grade)
+
+    async def _executar_tarefa_async(self, tarefa, inicio):
+        fora_da_grade = tarefa.imediata
+        tarefa.imediata = False
+        try:
+            resultado = tarefa.funcao()
+            if inspect.isawaitable(resultado):
+                await resultado
+        except Exception as e:
+            tarefa.falhas += 1
+            print(f"⚠️ Erro na tarefa '{tarefa.nome}': {e}")
+        self._concluir_tarefa(tarefa, inicio, fora_da_grade)
+
+    def _concluir_tarefa(self, tarefa, inicio, fora_da_grade):
+        """Estatísticas e próxima execução conforme a política."""
+        fim = self._relogio()
+
+        tarefa.execucoes += 1
+        tarefa.duracao.adicionar((fim - inicio) * 1000)
+        if fim - inicio > tarefa.periodo:
+            tarefa.estouros += 1
+        if fora_da_grade:
+            return
+
+        tarefa.atraso.adicionar((inicio - tarefa.proxima) * 1000)
+        if tarefa.politica == ATRASAR:
+            tarefa.proxima = fim + tarefa.periodo
+            return
+
+        tarefa.proxima += tarefa.periodo
+        if tarefa.proxima > fim:
+            return
+        perdidas = math.floor((fim - tarefa.proxima) / tarefa.periodo) + 1
+        if tarefa.politica == RECUPERAR:
+            perdidas -= self.maximo_recuperar
+        if perdidas > 0:
+            tarefa.perdidas += perdidas
+            tarefa.proxima += perdidas * tarefa.periodo
+
+    def executar(self, parar=None, despertar=None):
+        """
+        Executa as tarefas até `parar` ser sinalizado.
+
+        Parâmetros:
+            parar (threading.Event|None): encerra o laço (verificado a cada
+                execução ou espera).
+            despertar (threading.Event|None): ao ser sinalizado, executa já
+                as tarefas com `despertar=True` (o evento é limpo).
+        """
+        parar = parar or threading.Event()
+        espera_evento = despertar or parar
+
+        while not parar.is_set():
+            tarefa = self._proxima_tarefa()
+            if tarefa is None:
+                parar.wait(1.0)
+                continue
+
+            agora = self._relogio()
+            espera = tarefa.proxima - agora
+            if not tarefa.imediata and espera > 0:
+                if espera_evento.wait(timeout=espera) and despertar is not None:
+                    despertar.clear()
+                    print("🔄 Ciclo resetado por listener!")
+                    self.disparar()
+                continue
+
+            self._executar_tarefa(tarefa, agora)
+
+    async def executar_async(self, parar=None, despertar=None):
+        """
+        Como `executar`, no laço asyncio (a espera não ocupa threads).
+
+        Funções das tarefas rodam no laço; se devolverem um awaitable
+        (ex.: `laco.run_in_executor(...)` para trabalho bloqueante), a tarefa
+        termina quando ele concluir.
+
+        Parâmetros:
+            parar (asyncio.Event|None): encerra o laço.
+            despertar (asyncio.Event|None): ao ser sinalizado, executa já as
+                tarefas com `despertar=True` (o evento é limpo).
+        """
+        parar = parar or asyncio.Event()
+        eventos = [parar] + ([despertar] if despertar is not None else [])
+
+        while not parar.is_set():
+            tarefa = self._proxima_tarefa()
+            agora = self._relogio()
+            espera = 1.0 if tarefa is None else tarefa.proxima - agora
+            if tarefa is None or (not tarefa.imediata and espera > 0):
+                esperas = [asyncio.ensure_future(e.wait()) for e in eventos]
+                try:
+                    await asyncio.wait(
+                        esperas, timeout=espera, return_when=asyncio.FIRST_COMPLETED
+                    )
+                finally:
+                    for espera_evento in esperas:
+                        espera_evento.cancel()
+                if despertar is not None and despertar.is_set():
+                    despertar.clear()
+                    print("🔄 Ciclo resetado por listener!")
+                    self.disparar()
+                continue
+
+            await self._executar_tarefa_async(tarefa, agora)
+
+    def disparar(self, nomes=None):
+        """
+        Marca tarefas para execução imediata (fora da grade).
+
+        Parâmetros:
+            nomes (iterable[str]|None): tarefas; None = as com `despertar=True`.
+        """
+        with self._lock:
+            for tarefa in self._tarefas:
+                if (nomes is None and tarefa.despertar) or (
+                    nomes is not None and tarefa.nome in nomes
+                ):
+                    tarefa.imediata = True
+
+    def estatisticas(self):
+        """
+        Retorna:
+            dict: nome → Tarefa.estatisticas().
+        """
+        with self._lock:
+            tarefas = list(self._tarefas)
+        return {t.nome: t.estatisticas() for t in tarefas}
@@ -0,0 +1,216 @@
+# services/agregacao_service.py
+"""
+Agregados em fluxo (streaming) das leituras, em memória constante.
+
+Responsabilidades:
+- AgregadoWelford → contagem, média/variância (algoritmo de Welford),
+  mínimo, máximo e último valor de uma métrica, em um array de 6 floats.
+- JanelaAgregados → um agregado por métrica, com janela que fecha por
+  tempo (não pela contagem de um sensor).
+
+Substitui as listas do buffer histórico: a memória não cresce com a taxa de
+amostragem nem quando um sensor para de responder.
+"""
+
+import math
+import threading
+from array import array
+
+from modules import hal
+
+# Posições do estado no array de cada agregado
+_CONTAGEM, _MEDIA, _M2, _MINIMO, _MAXIMO, _ULTIMO = range(6)
+
+
+class AgregadoWelford:
+    """
+    Estatísticas de uma métrica atualizadas a cada amostra, em O(1).
+
+    Uso:
+        agregado = AgregadoWelford()
+        agregado.adicionar(21.5)
+        print(agregado.media, agregado.desvio_padrao)
+    """
+
+    __slots__ = ("_estado",)
+
+    def __init__(self):
+        self._estado = array("d", [0.0] * 6)
+        self.reiniciar()
+
+    def reiniciar(self):
+        """Descarta todas as amostras."""
+        e = self._estado
+        e[_CONTAGEM] = e[_MEDIA] = e[_M2] = 0.0
+        e[_MINIMO] = math.inf
+        e[_MAXIMO] = -math.inf
+        e[_ULTIMO] = math.nan
+
+    def adicionar(self, valor):
+        """Inclui uma amostra (None é ignorado)."""
+        if valor is None:
+            return
+        e = self._estado
+        e[_CONTAGEM] += 1
+        delta = valor - e[_MEDIA]
+        e[_MEDIA] += delta / e[_CONTAGEM]
+        e[_M2] += delta * (valor - e[_MEDIA])
+        if valor < e[_MINIMO]:
+            e[_MINIMO] = valor
+        if valor > e[_MAXIMO]:
+            e[_MAXIMO] = valor
+        e[_ULTIMO] = valor
+
+    def combinar(self, outro):
+        """Incorpora as amostras de outro agregado (fórmula de Chan)."""
+        a, b = self._estado, outro._estado
+        if not b[_CONTAGEM]:
+            return
+        if not a[_CONTAGEM]:
+            a[:] = b
+            return
+        contagem = a[_CONTAGEM] + b[_CONTAGEM]
+        delta = b[_MEDIA] - a[_MEDIA]
+        a[_M2] += b[_M2] + delta * delta * a[_CONTAGEM] * b[_CONTAGEM] / contagem
+        a[_MEDIA] += delta * b[_CONTAGEM] / contagem
+        a[_CONTAGEM] = contagem
+        a[_MINIMO] = min(a[_MINIMO], b[_MINIMO])
+        a[_MAXIMO] = max(a[_MAXIMO], b[_MAXIMO])
+        a[_ULTIMO] = b[_ULTIMO]
+
+    def estado(self):
+        """Estado interno (contagem, média, M2, mínimo, máximo, último) como lista."""
+        return list(self._estado)
+
+    def restaurar(self, valores):
+        """Substitui o estado pelo retornado por `estado()`."""
+        self._estado[:] = array("d", valores)
+
+    @property
+    def contagem(self):
+        return int(self._estado[_CONTAGEM])
+
+    @property
+    def media(self):
+        return self._estado[_MEDIA] if self.contagem else None
+
+    @property
+    def variancia(self):
+        """Variância amostral (n - 1); 0.0 com uma amostra."""
+        n = self.contagem
+        if not n:
+            return None
+        return self._estado[_M2] / (n - 1) if n > 1 else 0.0
+
+    @property
+    def desvio_padrao(self):
+        variancia = self.variancia
+        return math.sqrt(variancia) if variancia is not None else None
+
+    @property
+    def minimo(self):
+        return self._estado[_MINIMO] if self.contagem else None
+
+    @property
+    def maximo(self):
+        return self._estado[_MAXIMO] if self.contagem else None
+
+    @property
+    def ultimo(self):
+        return self._estado[_ULTIMO] if self.contagem else None
+
+    def resumo(self, casas=2):
+        """
+        Retorna:
+            dict: {media, minimo, maximo, desvio_padrao, amostras, ultimo}
+                  (valores None sem amostras).
+        """
+
+        def arredondar(valor):
+            return round(valor, casas) if valor is not None else None
+
+        return {
+            "media": arredondar(self.media),
+            "minimo": arredondar(self.minimo),
+            "maximo": arredondar(self.maximo),
+            "desvio_padrao": arredondar(self.desvio_padrao),
+            "amostras": self.contagem,
+            "ultimo": arredondar(self.ultimo),
+        }
+
+
+class JanelaAgregados:
+    """
+    Agregados de várias métricas em uma janela que fecha por tempo.
+
+    Uso:
+        janela = JanelaAgregados(["Temperatura", "Umidade"], duracao=150)
+        janela.adicionar("Temperatura", 21.5)
+        if janela.vencida():
+            resumos, inicio, fim = janela.fechar()
+    """
+
+    def __init__(self, metricas, duracao, relogio=None):
+        """
+        Parâmetros:
+            metricas (list[str]): nomes das métricas.
+            duracao (float): duração da janela (s).
+            relogio (callable|None): fonte de tempo (default = hal.tempo).
+        """
+        self.duracao = duracao
+        self._relogio = relogio or hal.tempo
+        self._lock = threading.Lock()
+        self._agregados = {metrica: AgregadoWelford() for metrica in metricas}
+        self._inicio = None
+
+    def __contains__(self, metrica):
+        return metrica in self._agregados
+
+    def __iter__(self):
+        return iter(self._agregados)
+
+    def adicionar(self, metrica, valor):
+        """Inclui uma amostra na janela aberta (None é ignorado)."""
+        if valor is None:
+            return
+        with self._lock:
+            if self._inicio is None:
+                self._inicio = self._relogio()
+            self._agregados[metrica].adicionar(valor)
+
+    def contagem(self, metrica):
+        """Número de amostras da métrica na janela aberta."""
+        with self._lock:
+            return self._agregados[metrica].contagem
+
+    def vencida(self, agora=None):
+        """True se a janela tem amostras e já durou `duracao` segundos."""
+        agora = self._relogio() if agora is None else agora
+        with self._lock:
+            return self._inicio is not None and agora - self._inicio >= self.duracao
+
+    def fechar(self, agora=None):
+        """
+        Encerra a janela e abre outra vazia.
+
+        Retorna:
+            tuple(dict, float|None, float): (métrica → resumo, início, fim).
+        """
+        agora = self._relogio() if agora is None else agora
+        with self._lock:
+            resumos = {
+                metrica: agregado.resumo()
+                for metrica, agregado in self._agregados.items()
+            }
+            inicio = self._inicio
+            for agregado in self._agregados.values():
+                agregado.reiniciar()
+            self._inicio = None
+        return resumos, inicio, agora
+
+    def limpar(self):
+        """Descarta a janela aberta."""
+        with self._lock:
+            for agregado in self._agregados.values():
+                agregado.reiniciar()
+            self._inicio = None
@@ -0,0 +1,471 @@
+# services/amostragem_service.py
+"""
+Amostragem contínua dos sensores em segundo plano.
+
+Responsabilidades:
+- Uma thread por sensor (ou uma tarefa do laço asyncio, com as leituras em
+  um executor limitado: `executar_async`), cada uma no seu próprio ritmo,
+  respeitando o
+  intervalo mínimo do hardware (atributo INTERVALO_MINIMO_LEITURA do driver,
+  ex.: 2 s no DHT22).
+- Cada métrica grava em um buffer circular de tamanho fixo (array de floats).
+- Amostras rejeitadas pelo filtro de outliers (filtro_service) não entram
+  no buffer.
+- O ciclo lê apenas um instantâneo (último valor + estatísticas da janela),
+  sem esperar nenhum sensor.
+
+Concorrência:
+- Cada buffer tem um único escritor (a thread do sensor). O valor e o
+  instante são gravados antes de o contador avançar, então leitores nunca
+  veem uma posição incompleta e não precisam de lock.
+- Sensores no mesmo barramento I²C compartilham um lock de barramento.
+"""
+
+import asyncio
+import math
+import threading
+import time
+from array import array
+
+from modules import hal
+from services.filtro_service import filtro_metricas
+from services.saude_sensores_service import MEIO_ABERTO, monitor_saude
+
+# Intervalo usado quando o driver não declara INTERVALO_MINIMO_LEITURA (s)
+INTERVALO_MINIMO_PADRAO = 1.0
+
+# Cadência padrão de cada sensor (s); nunca abaixo do mínimo do hardware
+INTERVALOS_PADRAO = {
+    "BH1750": 1.0,
+    "DS18B20": 2.0,
+    "DHT22": 2.0,
+    "UmidadeSolo": 1.0,
+}
+
+
+class BufferCircular:
+    """
+    Buffer circular de tamanho fixo com (instante, valor) em arrays de float.
+
+    Uso:
+        buffer = BufferCircular(256)
+        buffer.adicionar(25.3)
+        valor, instante = buffer.ultimo()
+        buffer.estatisticas(60)  # últimos 60 s
+    """
+
+    def __init__(self, capacidade=256):
+        """
+        Parâmetros:
+            capacidade (int): número máximo de amostras mantidas.
+        """
+        self.capacidade = capacidade
+        self._valores = array("d", [math.nan]) * capacidade
+        self._instantes = array("d", [0.0]) * capacidade
+        self._total = 0  # amostras já escritas (só o escritor altera)
+
+    def adicionar(self, valor, instante=None):
+        """Grava uma amostra (chamado apenas pela thread do sensor)."""
+        posicao = self._total % self.capacidade
+        self._valores[posicao] = valor
+        self._instantes[posicao] = hal.tempo() if instante is None else instante
+        self._total += 1  # publica a amostra
+
+    def __len__(self):
+        return min(self._total, self.capacidade)
+
+    @property
+    def total(self):
+        """Número de amostras já gravadas desde a criação."""
+        return self._total
+
+    def ultimo(self):
+        """
+        Retorna a amostra mais recente.
+
+        Retorna:
+            tuple(float, float) | None: (valor, instante) ou None se vazio.
+        """
+        total = self._total
+        if total == 0:
+            return None
+        posicao = (total - 1) % self.capacidade
+        return self._valores[posicao], self._instantes[posicao]
+
+    def desde(self, total_anterior):
+        """
+        Retorna os valores gravados depois de `total_anterior` (ver `total`).
+
+        Retorna:
+            tuple(list[float], int): (valores novos, total atual).
+        """
+        total = self._total
+        inicio = max(total_anterior, total - self.capacidade)
+        valores = [self._valores[i % self.capacidade] for i in range(inicio, total)]
+        return valores, total
+
+    def amostras_desde(self, total_anterior):
+        """
+        Como `desde`, mas com o instante de cada valor.
+
+        Retorna:
+            tuple(list[tuple(float, float)], int): ((valor, instante) novos,
+            total atual).
+        """
+        total = self._total
+        inicio = max(total_anterior, total - self.capacidade)
+        amostras = [
+            (self._valores[i % self.capacidade], self._instantes[i % self.capacidade])
+            for i in range(inicio, total)
+        ]
+        return amostras, total
+
+    def janela(self, segundos, agora=None):
+        """Valores dos últimos `segundos` (mais antigo → mais recente)."""
+        agora = hal.tempo() if agora is None else agora
+        total = self._total
+        valores = []
+        for i in range(max(0, total - self.capacidade), total):
+            posicao = i % self.capacidade
+            if agora - self._instantes[posicao] <= segundos:
+                valores.append(self._valores[posicao])
+        return valores
+
+    def estatisticas(self, segundos, agora=None):
+        """
+        Estatísticas da janela.
+
+        Retorna:
+            dict | None: {"media", "minimo", "maximo", "amostras"} ou None se vazia.
+        """
+        valores = self.janela(segundos, agora)
+        if not valores:
+            return None
+        return {
+            "media": sum(valores) / len(valores),
+            "minimo": min(valores),
+            "maximo": max(valores),
+            "amostras": len(valores),
+        }
+
+
+class Amostrador:
+    """
+    Thread que lê um sensor periodicamente e grava nos buffers das métricas.
+
+    A função de leitura retorna um valor (uma métrica) ou uma tupla
+    (várias métricas, na ordem de `metricas`). None significa leitura falha.
+    """
+
+    def __init__(
+        self,
+        nome,
+        leitura,
+        metricas,
+        intervalo,
+        intervalo_minimo=INTERVALO_MINIMO_PADRAO,
+        capacidade=256,
+        lock_barramento=None,
+        saude=None,
+        filtro=None,
+    ):
+        """
+        Parâmetros:
+            nome (str): nome do sensor (logs).
+            leitura (callable): função de leitura do driver.
+            metricas (tuple[str]): chaves de `dados_atuais` preenchidas.
+            intervalo (float): intervalo desejado entre leituras (s).
+            intervalo_minimo (float): limite do hardware (s).
+            capacidade (int): tamanho de cada buffer circular.
+            lock_barramento (Lock|None): lock compartilhado do barramento.
+            saude (SaudeSensor|None): disjuntor do sensor; com ele aberto a
+                thread não lê o hardware até o fim do resfriamento.
+            filtro (FiltroMetricas|None): filtro de outliers; amostras
+                rejeitadas não entram no buffer.
+        """
+        self.nome = nome
+        self.leitura = leitura
+        self.metricas = tuple(metricas)
+        self.intervalo = max(intervalo, intervalo_minimo)
+        self.lock_barramento = lock_barramento
+        self.saude = saude
+        self.filtro = filtro
+        self.buffers = {m: BufferCircular(capacidade) for m in self.metricas}
+
+        self.leituras = 0
+        self.falhas = 0
+        self._falhas_rodada = 0
+        self.rejeitadas = 0
+
+        self._parar = threading.Event()
+        self._thread = None
+
+    def iniciar(self):
+        """Inicia a thread de amostragem."""
+        self._thread = threading.Thread(
+            target=self._executar, name=f"amostrador-{self.nome}", daemon=True
+        )
+        self._thread.start()
+
+    def parar(self, timeout=2):
+        """Encerra a thread de amostragem."""
+        self._parar.set()
+        if self._thread:
+            self._thread.join(timeout)
+
+    def _ler(self):
+        if self.lock_barramento is None:
+            return self.leitura()
+        with self.lock_barramento:
+            return self.leitura()
+
+    def _amostrar(self):
+        """
+        Uma leitura; a próxima tentativa é o próximo tique.
+
+        Para o disjuntor, uma rodada falha equivale a `politica.tentativas`
+        tiques seguidos sem leitura válida (como no `tentar_ler`); a leitura
+        de teste do disjuntor meio-aberto é única e decide sozinha.
+        """
+        try:
+            valor = self._ler()
+        except Exception as e:
+            print(f"⚠️ Erro no amostrador {self.nome}: {e}")
+            valor = None
+
+        valores = valor if isinstance(valor, tuple) else (valor,)
+        sucesso = valor is not None and all(v is not None for v in valores)
+        if not sucesso:
+            self.falhas += 1
+            self._falhas_rodada += 1
+            if self.saude is not None and (
+                self.saude.estado == MEIO_ABERTO
+                or self._falhas_rodada >= self.saude.politica.tentativas
+            ):
+                self.saude.registrar(False)
+                self._falhas_rodada = 0
+            return
+
+        self._falhas_rodada = 0
+        if self.saude is not None:
+            self.saude.registrar(True)
+
+        instante = hal.tempo()  # relógio do backend (rollups, janela)
+        for metrica, v in zip(self.metricas, valores):
+            if self.filtro is not None:
+                v, rejeitado = self.filtro.filtrar(metrica, v, instante)
+                if rejeitado:
+                    self.rejeitadas += 1
+                    continue
+            self.buffers[metrica].adicionar(v, instante)
+        self.leituras += 1
+
+    def _proximo_tique(self, proximo):
+        """Ritmo fixo sem deriva; se atrasou, recomeça a partir de agora."""
+        proximo += self.intervalo
+        espera = proximo - time.monotonic()
+        if espera < 0:
+            return time.monotonic(), 0
+        return proximo, espera
+
+    def _executar(self):
+        proximo = time.monotonic()
+        while not self._parar.is_set():
+            if self.saude is None or self.saude.disponivel():
+                self._amostrar()
+            proximo, espera = self._proximo_tique(proximo)
+            self._parar.wait(espera)
+
+    async def executar_async(self, executor=None):
+        """
+        Laço de amostragem como tarefa asyncio: a leitura (bloqueante) roda
+        em `executor` e a espera não ocupa thread. Termina com `parar()` ou
+        com o cancelamento da tarefa.
+        """
+        laco = asyncio.get_running_loop()
+        proximo = time.monotonic()
+        while not self._parar.is_set():
+            if self.saude is None or self.saude.disponivel():
+                await laco.run_in_executor(executor, self._amostrar)
+            proximo, espera = self._proximo_tique(proximo)
+            await asyncio.sleep(espera)
+
+
+class GerenciadorAmostragem:
+    """
+    Conjunto de amostradores dos sensores da estufa.
+
+    Uso:
+        gerenciador = GerenciadorAmostragem(lux, solo, dht, umidade_solo)
+        gerenciador.iniciar()
+        dados = gerenciador.instantaneo(janela=60)
+    """
+
+    def __init__(
+        self,
+        luminosidade_sensor,
+        temperatura_solo_sensor,
+        temperatura_ar_sensor,
+        umidade_solo_sensor,
+        intervalos=None,
+        capacidade=256,
+    ):
+        """
+        Parâmetros:
+            *_sensor: instâncias dos drivers.
+            intervalos (dict|None): nome do sensor → intervalo desejado (s).
+                Nomes: "BH1750", "DS18B20", "DHT22", "UmidadeSolo".
+                Sem valor → INTERVALOS_PADRAO.
+            capacidade (int): tamanho de cada buffer circular.
+        """
+        intervalos = {**INTERVALOS_PADRAO, **(intervalos or {})}
+        lock_i2c = threading.Lock()  # BH1750 e ADS1115 dividem o barramento
+
+        def criar(nome, sensor, leitura, metricas, lock=None):
+            minimo = getattr(
+                sensor, "INTERVALO_MINIMO_LEITURA", INTERVALO_MINIMO_PADRAO
+            )
+            return Amostrador(
+                nome,
+                leitura,
+                metricas,
+                intervalos.get(nome, minimo),
+                minimo,
+                capacidade,
+                lock,
+                monitor_saude.obter(nome),
+                filtro_metricas,
+            )
+
+        self.amostradores = [
+            criar(
+                "BH1750",
+                luminosidade_sensor,
+                luminosidade_sensor.ler_luminosidade,
+                ("LuminosidadeAtual",),
+                lock_i2c,
+            ),
+            criar(
+                "DS18B20",
+                temperatura_solo_sensor,
+                temperatura_solo_sensor.read_temp,
+                ("TemperaturaDoSoloAtual",),
+            ),
+            criar(
+                "DHT22",
+                temperatura_ar_sensor,
+                temperatura_ar_sensor.ler_dados,
+                ("TemperaturaDoArAtual", "UmidadeDoArAtual"),
+            ),
+            criar(
+                "UmidadeSolo",
+                umidade_solo_sensor,
+                umidade_solo_sensor.ler_umidade,
+                ("UmidadeDoSoloAtual",),
+                lock_i2c,
+            ),
+        ]
+        self.buffers = {}
+        for amostrador in self.amostradores:
+            self.buffers.update(amostrador.buffers)
+
+    def iniciar(self):
+        """Inicia todas as threads de amostragem."""
+        for amostrador in self.amostradores:
+            amostrador.iniciar()
+        print(
+            "🧵 Amostragem contínua iniciada: "
+            + ", ".join(f"{a.nome} {a.intervalo:g}s" for a in self.amostradores)
+        )
+
+    async def executar_async(self, executor=None):
+        """
+        Amostragem contínua no laço asyncio (uma tarefa por sensor, leituras
+        em `executor`), no lugar de `iniciar`.
+        """
+        print(
+            "⚡ Amostragem contínua (asyncio) iniciada: "
+            + ", ".join(f"{a.nome} {a.intervalo:g}s" for a in self.amostradores)
+        )
+        await asyncio.gather(
+            *(amostrador.executar_async(executor) for amostrador in self.amostradores)
+        )
+
+    def parar(self):
+        """Encerra todas as threads de amostragem."""
+        for amostrador in self.amostradores:
+            amostrador.parar()
+
+    def instantaneo(self, janela=60, idade_maxima=120):
+        """
+        Retorna o último valor de cada métrica, sua idade e as estatísticas
+        da janela — sem nenhuma leitura de hardware.
+
+        Parâmetros:
+            janela (float): tamanho da janela das estatísticas (s).
+            idade_maxima (float): valores mais antigos que isso viram None.
+
+        Retorna:
+            tuple(dict, dict, dict):
+                - métrica → último valor (ou None)
+                - métrica → idade do último valor (s)
+                - métrica → estatísticas da janela (ou None)
+        """
+        agora = hal.tempo()
+        valores, idades, estatisticas = {}, {}, {}
+        for metrica, buffer in self.buffers.items():
+            ultimo = buffer.ultimo()
+            if ultimo is None or agora - ultimo[1] > idade_maxima:
+                valores[metrica] = None
+            else:
+                valores[metrica] = ultimo[0]
+                idades[metrica] = round(agora - ultimo[1], 1)
+            estatisticas[metrica] = buffer.estatisticas(janela, agora)
+        return valores, idades, estatisticas
+
+
+# Instância ativa (None → coleta síncrona)
+amostragem_ativa = None
+
+
+def iniciar_amostragem(
+    luminosidade_sensor,
+    temperatura_solo_sensor,
+    temperatura_ar_sensor,
+    umidade_solo_sensor,
+    intervalos=None,
+    threads=True,
+):
+    """
+    Cria e inicia a amostragem contínua; a partir daí `coletar_dados` passa
+    a devolver instantâneos dos buffers.
+
+    Parâmetros:
+        intervalos (dict|None): ver GerenciadorAmostragem.
+        threads (bool): False → não inicia as threads (o runtime asyncio
+            roda `executar_async`).
+
+    Retorna:
+        GerenciadorAmostragem: instância ativa.
+    """
+    global amostragem_ativa
+    if amostragem_ativa is not None:
+        amostragem_ativa.parar()
+    amostragem_ativa = GerenciadorAmostragem(
+        luminosidade_sensor,
+        temperatura_solo_sensor,
+        temperatura_ar_sensor,
+        umidade_solo_sensor,
+        intervalos,
+    )
+    if threads:
+        amostragem_ativa.iniciar()
+    return amostragem_ativa
+
+
+def parar_amostragem():
+    """Encerra a amostragem contínua (volta à coleta síncrona)."""
+    global amostragem_ativa
+    if amostragem_ativa is not None:
+        amostragem_ativa.parar()
+        amostragem_ativa = None
@@ -1,12 +1,35 @@
 # services/ciclo_service.py
 import time
-import threading
-from services.controle_service import controlar_atuadores
-from services.envio_service import enviar_dados_periodicamente
+from services.agendador_service import ATRASAR, PULAR, Agendador, EventoDespertar
+from services.controle_service import (
+    controlar_atuadores,
+    controlar_irrigacao_iluminacao,
+    controlar_seguranca,
+)
+from services.envio_service import (
+    enviar_dados_periodicamente,
+    enviar_resumos_periodicamente,
+)
 from services.fases_service import verificar_e_avancar_fase
-from services.coleta_service import coletar_dados
-from config.firebase_config import enviar_dados_realtime, atualizar_status_atuador
-from config.configuracao_local import carregar_configuracao_local
+from services.coleta_service import coletar_dados, CHAVES_LOCAIS
+from services.status_atuadores_service import PublicadorStatusAtuadores
+from services.realtime_service import PoliticaPublicacao, publicar_dados_realtime
+from services.fila_envio_service import fila_envio
+from services.historico_local_service import registrar_amostras
+from services.rollup_service import motor_rollup
+from services.saude_sensores_service import monitor_saude
+from services.eventos_service import (
+    SINCRONO,
+    AmostrasColetadas,
+    ConfiguracaoAlterada,
+    DecisaoAtuadores,
+    DecisaoSeguranca,
+    FaseAvancada,
+    LeituraSensores,
+    barramento_eventos,
+)
+from config.firebase_config import enviar_dados_firestore
+from config.cache_configuracao import obter_configuracao, recarregar_configuracao
 from utils.display import (
     exibir_bloco_sensores,
     exibir_status_atuadores,
@@ -15,7 +38,149 @@ from utils.display import (
 )
 
 # Evento global usado para resetar o ciclo de forma imediata
-ciclo_reset_event = threading.Event()
+# (EventoDespertar: também acorda o laço do runtime asyncio)
+ciclo_reset_event = EventoDespertar()
+
+# Períodos padrão do ciclo com agendador (s)
+PERIODO_SEGURANCA = 5  # aquecedor/ventoinha
+PERIODO_FASE = 300  # verificação de avanço de fase
+
+# Idade máxima de uma coleta reaproveitada entre etapas agendadas juntas (s)
+IDADE_MAXIMA_COLETA = 1.0
+
+
+def reagir_mudanca_configuracao(config_nova, config_anterior):
+    """
+    Ouvinte do cache de configuração: roda o ciclo imediatamente quando a
+    configuração muda (ex.: override alterado pelo app).
+
+    Parâmetros:
+        config_nova (dict): configuração recém-publicada.
+        config_anterior (dict|None): configuração anterior.
+    """
+    barramento_eventos.publicar(
+        ConfiguracaoAlterada(
+            time.time(),
+            getattr(config_nova, "versao", None),
+            getattr(config_anterior, "versao", None),
+            config_nova,
+        )
+    )
+    if config_anterior is not None:
+        ciclo_reset_event.set()
+
+
+def _enfileirar_historico(estufa_id, media_dados):
+    """Agenda a gravação das médias no Firestore sem bloquear o ciclo."""
+    return fila_envio.enfileirar(
+        "firestore",
+        ("Historico", media_dados.get("timestamp")),
+        enviar_dados_firestore,
+        estufa_id,
+        media_dados,
+    )
+
+
+def registrar_consumidores_ciclo(
+    estufa_id, barramento=barramento_eventos, assincrono=False
+):
+    """
+    Assina no barramento os consumidores dos eventos do ciclo.
+
+    - Síncronos (thread do ciclo, apenas enfileiram): status dos atuadores
+      (Firestore), dados atuais (Realtime DB) e médias periódicas (ficam na
+      thread do ciclo porque compartilham a janela de agregados com a
+      coleta).
+    - Em fila (pool do barramento): exibição no terminal.
+    - Em fila própria, sem limite e com thread dedicada: histórico (rollups,
+      histórico local em SQLite e outbox dos resumos, na ordem das coletas);
+      nenhuma amostra é descartada se o pool compartilhado travar.
+
+    Parâmetros:
+        estufa_id (str): identificador da estufa.
+        barramento (BarramentoEventos): barramento dos eventos.
+        assincrono (bool): status dos atuadores pelo cliente assíncrono do
+            Firestore (exige fila_envio no laço asyncio, ver
+            runtime_async_service).
+
+    Retorna:
+        list[Assinante]: assinantes criados.
+    """
+    publicador_status = PublicadorStatusAtuadores(estufa_id)
+    politica_realtime = PoliticaPublicacao()
+
+    def enfileirar_status(evento):
+        if evento.atuadores:
+            fila_envio.enfileirar(
+                "firestore",
+                "StatusAtuadores",
+                (
+                    publicador_status.publicar_async
+                    if assincrono
+                    else publicador_status.publicar
+                ),
+                evento.atuadores,
+                # DecisaoSeguranca traz só aquecedor/ventoinha: não apaga os
+                # demais atuadores de um status ainda pendente
+                mesclar=lambda pendentes, novos: ({**pendentes[0], **novos[0]},),
+            )
+
+    def enfileirar_realtime(evento):
+        fila_envio.enfileirar(
+            "realtime",
+            "DadosAtuais",
+            publicar_dados_realtime,
+            estufa_id,
+            {k: v for k, v in evento.dados.items() if k not in CHAVES_LOCAIS},
+            politica_realtime,
+        )
+
+    def enviar_periodicos(evento):
+        enviar_dados_periodicamente(
+            estufa_id, exibir_dados_periodicos, enviar=_enfileirar_historico
+        )
+
+    def gravar_historico(evento):
+        # métricas chegam agrupadas: em ordem de tempo, nenhuma amostra cai
+        # em um intervalo já fechado por outra
+        for nome, instante, valor in sorted(evento.amostras, key=lambda a: a[1]):
+            motor_rollup.adicionar(nome, valor, instante)
+        registrar_amostras(evento.amostras)
+        enviar_resumos_periodicamente(estufa_id)
+
+    def exibir_terminal(evento):
+        if isinstance(evento, FaseAvancada):
+            print(f"⏩ Estufa {evento.estufa_id} avançou para a fase {evento.fase}")
+        elif isinstance(evento, ConfiguracaoAlterada):
+            print(f"🔧 Configuração atualizada (versão {evento.versao})")
+        elif isinstance(evento, DecisaoAtuadores):
+            exibir_status_fase(evento.config)
+            exibir_status_atuadores(evento.atuadores)
+        elif evento.dados:
+            exibir_bloco_sensores(evento.dados)
+
+    return [
+        barramento.assinar(
+            (DecisaoAtuadores, DecisaoSeguranca),
+            enfileirar_status,
+            "status_atuadores",
+            SINCRONO,
+        ),
+        barramento.assinar(LeituraSensores, enfileirar_realtime, "realtime", SINCRONO),
+        barramento.assinar(DecisaoAtuadores, enviar_periodicos, "periodicos", SINCRONO),
+        barramento.assinar(
+            AmostrasColetadas,
+            gravar_historico,
+            "historico",
+            capacidade=None,
+            dedicado=True,
+        ),
+        barramento.assinar(
+            (FaseAvancada, ConfiguracaoAlterada, DecisaoAtuadores, LeituraSensores),
+            exibir_terminal,
+            "terminal",
+        ),
+    ]
 
 
 def ciclo_estufa(
@@ -34,27 +199,37 @@ def ciclo_estufa(
     Executa o ciclo principal da estufa.
 
     Nova ordem:
-      1. Carrega configuração ativa da estufa.
+      1. Obtém a configuração ativa do cache em memória (sem leitura de rede).
       2. Verifica avanço de fase automático e recarrega config se necessário.
-      3. Coleta leituras dos sensores.
-      4. Controla atuadores com base na config atualizada.
-      5. Atualiza status dos atuadores no Firestore.
-      6. Envia dados atuais para o Realtime Database.
-      7. Exibe status de sensores, atuadores e fase no terminal.
-      8. Calcula e envia médias periódicas para o Firestore.
-      9. Aguarda até o próximo ciclo (ou reseta imediatamente se solicitado).
+      3. Coleta leituras dos sensores (instantâneo da amostragem contínua ou
+         barramentos em paralelo, com prazo).
+      4. Publica LeituraSensores e controla os atuadores com base na config
+         atualizada.
+      5. Publica DecisaoAtuadores (decisões e configuração usada).
+      6. Aguarda até o próximo ciclo (ou reseta imediatamente se solicitado).
+
+    Envios (status, Realtime DB, médias e rollups), exibição no terminal e
+    logger são assinantes do barramento (registrar_consumidores_ciclo): o
+    controle não espera por nenhum deles.
     """
+    registrar_consumidores_ciclo(estufa_id)
+    numero_ciclo = 0
+
     while True:
         try:
-            # 1. Carrega config
-            config = carregar_configuracao_local(estufa_id)
+            # 1. Config em memória (atualizada por snapshots)
+            config = obter_configuracao(estufa_id)
 
             # 2. Verifica avanço de fase antes do controle
             nova_fase = verificar_e_avancar_fase(estufa_id, config)
             if nova_fase:
-                print(f"⏩ Estufa {estufa_id} avançou para a fase {nova_fase}")
                 # recarrega config já com a nova fase
-                config = carregar_configuracao_local(estufa_id)
+                config = recarregar_configuracao(estufa_id)
+                barramento_eventos.publicar(
+                    FaseAvancada(
+                        time.time(), estufa_id, config.get("PlantaAtual"), nova_fase
+                    )
+                )
 
             # 3. Coleta sensores
             dados = coletar_dados(
@@ -62,8 +237,16 @@ def ciclo_estufa(
                 temperatura_solo_sensor,
                 temperatura_ar_sensor,
                 umidade_solo_sensor,
+                paralelo=True,
             )
 
+            numero_ciclo += 1
+            instante = dados.get("timestamp") if dados else time.time()
+            if dados:
+                barramento_eventos.publicar(
+                    LeituraSensores(numero_ciclo, instante, dict(dados))
+                )
+
             # 4. Controle dos atuadores
             status_atuadores = controlar_atuadores(
                 ventoinha,
@@ -75,31 +258,232 @@ def ciclo_estufa(
                 dados.get("UmidadeDoSoloAtual") if dados else None,
                 config,
             )
-            if status_atuadores:
-                for nome, (ativo, motivo) in status_atuadores.items():
-                    atualizar_status_atuador(estufa_id, nome, ativo, motivo)
-
-            # 5. Envio dos dados atuais para o Realtime DB
-            if dados:
-                enviar_dados_realtime(estufa_id, dados)
-
-            # 6. Exibição no terminal
-            exibir_status_fase(config)
-            exibir_status_atuadores(status_atuadores)
-            if dados:
-                exibir_bloco_sensores(dados)
-
-            # 7. Envio periódico de médias
-            enviar_dados_periodicamente(estufa_id, exibir_dados_periodicos)
+            # 5. Decisões do ciclo para os assinantes (envios, terminal, logger)
+            barramento_eventos.publicar(
+                DecisaoAtuadores(
+                    numero_ciclo, instante, dict(status_atuadores or {}), config
+                )
+            )
 
-            # 8. Conclusão
+            # Conclusão
             print(f"✅ Ciclo da estufa concluído às {time.strftime('%H:%M:%S')}")
+            suspensos = monitor_saude.suspensos()
+            if suspensos:
+                print(f"🔌 Sensores suspensos: {', '.join(suspensos)}")
+            pendentes = fila_envio.profundidade()
+            if pendentes:
+                print(f"📤 Envios pendentes na fila: {pendentes}")
 
         except Exception as e:
             print(f"⚠️ Erro no ciclo_estufa: {e}")
 
-        # 9. Intervalo até o próximo ciclo (com suporte a reset imediato)
+        # 6. Intervalo até o próximo ciclo (com suporte a reset imediato)
         print(f"⏳ Aguardando próximo ciclo ({tempo_ciclo}s)...\n")
         if ciclo_reset_event.wait(timeout=tempo_ciclo):
             print("🔄 Ciclo resetado por listener!")
             ciclo_reset_event.clear()
+
+
+class EtapasEstufa:
+    """
+    Etapas do ciclo da estufa separadas por taxa (usadas por
+    ciclo_estufa_agendado):
+
+    - seguranca: coleta + aquecedor/ventoinha (a cada poucos segundos);
+      publica DecisaoSeguranca (só o status dos atuadores reage) apenas
+      quando algum deles muda de estado.
+    - ciclo: coleta + luminária/bomba; publica LeituraSensores e
+      DecisaoAtuadores (envios, terminal, logger) no ritmo do ciclo.
+    - fase: avanço automático de fase (a cada poucos minutos).
+    """
+
+    def __init__(self, estufa_id, sensores, ventoinha, luminaria, bomba, aquecedor):
+        """
+        Parâmetros:
+            estufa_id (str): identificador da estufa.
+            sensores (tuple): (luminosidade, temperatura_solo, temperatura_ar,
+                umidade_solo), na ordem de coletar_dados.
+            ventoinha, luminaria, bomba, aquecedor: atuadores.
+        """
+        self.estufa_id = estufa_id
+        self.sensores = sensores
+        self.ventoinha = ventoinha
+        self.luminaria = luminaria
+        self.bomba = bomba
+        self.aquecedor = aquecedor
+        self.numero_ciclo = 0
+        self.status_atuadores = {}
+        self._dados = {}
+        self._instante_coleta = None
+
+    def _coletar(self, idade_maxima=0.0):
+        """Coleta os sensores (ou reaproveita a última coleta, se recente)."""
+        agora = time.monotonic()
+        if (
+            self._instante_coleta is None
+            or agora - self._instante_coleta > idade_maxima
+        ):
+            self._dados = coletar_dados(*self.sensores, paralelo=True) or {}
+            self._instante_coleta = agora
+        return self._dados
+
+    def _publicar_decisao(self, config, instante):
+        barramento_eventos.publicar(
+            DecisaoAtuadores(
+                self.numero_ciclo, instante, dict(self.status_atuadores), config
+            )
+        )
+
+    def seguranca(self):
+        config = obter_configuracao(self.estufa_id)
+        dados = self._coletar()
+        status = controlar_seguranca(
+            self.ventoinha,
+            self.aquecedor,
+            dados.get("TemperaturaDoArAtual"),
+            dados.get("UmidadeDoArAtual"),
+            config,
+        )
+        mudou = any(
+            (self.status_atuadores.get(nome) or (None,))[0] != ligado
+            for nome, (ligado, _) in status.items()
+        )
+        self.status_atuadores.update(status)
+        if mudou:
+            barramento_eventos.publicar(
+                DecisaoSeguranca(
+                    dados.get("timestamp") or time.time(), dict(status), config
+                )
+            )
+
+    def ciclo(self):
+        config = obter_configuracao(self.estufa_id)
+        dados = self._coletar(IDADE_MAXIMA_COLETA)
+        self.numero_ciclo += 1
+        instante = dados.get("timestamp") or time.time()
+        if dados:
+            barramento_eventos.publicar(
+                LeituraSensores(self.numero_ciclo, instante, dict(dados))
+            )
+        self.status_atuadores.update(
+            controlar_irrigacao_iluminacao(
+                self.luminaria, self.bomba, dados.get("UmidadeDoSoloAtual"), config
+            )
+        )
+        self._publicar_decisao(config, instante)
+
+        print(f"✅ Ciclo da estufa concluído às {time.strftime('%H:%M:%S')}")
+        suspensos = monitor_saude.suspensos()
+        if suspensos:
+            print(f"🔌 Sensores suspensos: {', '.join(suspensos)}")
+        pendentes = fila_envio.profundidade()
+        if pendentes:
+            print(f"📤 Envios pendentes na fila: {pendentes}")
+
+    def fase(self):
+        config = obter_configuracao(self.estufa_id)
+        nova_fase = verificar_e_avancar_fase(self.estufa_id, config)
+        if nova_fase:
+            config = recarregar_configuracao(self.estufa_id)
+            barramento_eventos.publicar(
+                FaseAvancada(
+                    time.time(), self.estufa_id, config.get("PlantaAtual"), nova_fase
+                )
+            )
+            # controla já com a configuração da nova fase
+            ciclo_reset_event.set()
+
+
+def agendar_etapas(
+    agendador,
+    etapas,
+    tempo_ciclo,
+    periodo_seguranca,
+    periodo_fase,
+    fase=None,
+    seguranca=None,
+    ciclo=None,
+):
+    """
+    Registra as etapas da estufa no agendador.
+
+    Parâmetros:
+        agendador (Agendador): agendador de destino.
+        etapas (EtapasEstufa): etapas do ciclo.
+        tempo_ciclo, periodo_seguranca, periodo_fase (float): períodos (s).
+        fase, seguranca, ciclo (callable|None): substituem `etapas.fase`,
+            `etapas.seguranca` e `etapas.ciclo` (ex.: versões que rodam em
+            um executor no runtime asyncio).
+    """
+    agendador.adicionar("fase", fase or etapas.fase, periodo_fase, politica=ATRASAR)
+    # (ordem de registro = ordem de execução quando vencem juntas: o ciclo
+    # reaproveita a coleta da segurança)
+    agendador.adicionar(
+        "seguranca",
+        seguranca or etapas.seguranca,
+        periodo_seguranca,
+        politica=PULAR,
+        despertar=True,
+    )
+    agendador.adicionar("ciclo", ciclo or etapas.ciclo, tempo_ciclo, despertar=True)
+
+
+def ciclo_estufa_agendado(
+    estufa_id,
+    luminosidade_sensor,
+    temperatura_solo_sensor,
+    temperatura_ar_sensor,
+    umidade_solo_sensor,
+    ventoinha,
+    luminaria,
+    bomba,
+    aquecedor,
+    tempo_ciclo,
+    periodo_seguranca=PERIODO_SEGURANCA,
+    periodo_fase=PERIODO_FASE,
+    parar=None,
+):
+    """
+    Executa o ciclo da estufa com taxas independentes por etapa
+    (EtapasEstufa + Agendador), em grade fixa sem deriva:
+
+      - seguranca a cada `periodo_seguranca` s (aquecedor/ventoinha);
+      - ciclo a cada `tempo_ciclo` s (luminária/bomba, eventos e envios);
+      - fase a cada `periodo_fase` s.
+
+    Envios para a nuvem continuam no ritmo do ciclo (e das janelas de
+    histórico/rollups), independentemente da taxa do controle térmico.
+    `ciclo_reset_event` executa seguranca e ciclo imediatamente.
+
+    Parâmetros:
+        (mesmos de ciclo_estufa)
+        periodo_seguranca (float): período do controle térmico (s).
+        periodo_fase (float): período da verificação de fase (s).
+        parar (threading.Event|None): encerra o agendador.
+
+    Retorna:
+        Agendador: (ao encerrar) com as estatísticas das etapas.
+    """
+    registrar_consumidores_ciclo(estufa_id)
+    etapas = EtapasEstufa(
+        estufa_id,
+        (
+            luminosidade_sensor,
+            temperatura_solo_sensor,
+            temperatura_ar_sensor,
+            umidade_solo_sensor,
+        ),
+        ventoinha,
+        luminaria,
+        bomba,
+        aquecedor,
+    )
+
+    agendador = Agendador()
+    agendar_etapas(agendador, etapas, tempo_ciclo, periodo_seguranca, periodo_fase)
+    print(
+        f"⏱️ Ciclo agendado: segurança {periodo_seguranca}s, ciclo {tempo_ciclo}s, "
+        f"fase {periodo_fase}s"
+    )
+    agendador.executar(parar=parar, despertar=ciclo_reset_event)
+    return agendador
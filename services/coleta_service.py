@@ -1,19 +1,77 @@
 # services/coleta_service.py
+import threading
 import time
+from concurrent.futures import ThreadPoolExecutor
+from concurrent.futures import TimeoutError as FuturoTimeout
 
-# Buffer global para o histórico (compartilhado com envio periódico).
-# Cada chave representa um tipo de sensor e armazena uma lista com as últimas leituras.
-# Esse buffer é consumido depois pelo envio periódico (envio_service) para calcular médias.
-buffer_sensores = {
-    "Luminosidade": [],
-    "TemperaturaDoSolo": [],
-    "Temperatura": [],
-    "Umidade": [],
-    "UmidadeDoSolo": [],
+from modules import hal
+from services import amostragem_service
+from services.agregacao_service import JanelaAgregados
+from services.eventos_service import AmostrasColetadas, barramento_eventos
+from services.filtro_service import filtro_metricas
+from services.saude_sensores_service import monitor_saude
+
+# Janela do histórico (compartilhada com o envio periódico).
+# Cada chave representa um tipo de sensor e guarda agregados em memória
+# constante (média/variância de Welford, mínimo, máximo, contagem, último).
+# A janela fecha por tempo e é consumida pelo envio periódico (envio_service).
+JANELA_HISTORICO = 150  # duração de cada janela de médias (s)
+buffer_sensores = JanelaAgregados(
+    ["Luminosidade", "TemperaturaDoSolo", "Temperatura", "Umidade", "UmidadeDoSolo"],
+    duracao=JANELA_HISTORICO,
+)
+
+# ⏱️ Coleta paralela
+PRAZO_LEITURA_PADRAO = 3.0  # prazo padrão por sensor (s)
+IDADE_MAXIMA_LEITURA = 120  # leitura antiga só é reaproveitada até esta idade (s)
+CHAVE_IDADES = "IdadeLeituras"  # chave com a idade dos valores reaproveitados
+
+# 🧵 Amostragem contínua (instantâneo dos buffers circulares)
+CHAVE_ESTATISTICAS = "EstatisticasJanela"  # média/mín/máx por métrica
+JANELA_ESTATISTICAS = 60  # janela das estatísticas do instantâneo (s)
+
+# Chaves de uso local: não são publicadas na nuvem
+CHAVES_LOCAIS = (CHAVE_IDADES, CHAVE_ESTATISTICAS)
+
+# Chave de `dados_atuais` → métrica correspondente em buffer_sensores
+_BUFFER_POR_CHAVE = {
+    "LuminosidadeAtual": "Luminosidade",
+    "TemperaturaDoArAtual": "Temperatura",
+    "UmidadeDoArAtual": "Umidade",
+    "TemperaturaDoSoloAtual": "TemperaturaDoSolo",
+    "UmidadeDoSoloAtual": "UmidadeDoSolo",
 }
 
+# Leitura → chaves de `dados_atuais` que ela preenche
+_CHAVES_POR_LEITURA = {
+    "Luminosidade": ("LuminosidadeAtual",),
+    "TemperaturaDoSolo": ("TemperaturaDoSoloAtual",),
+    "Ar": ("TemperaturaDoArAtual", "UmidadeDoArAtual"),
+    "UmidadeDoSolo": ("UmidadeDoSoloAtual",),
+}
+
+_lock_paralelo = threading.Lock()
+_executores = {}  # barramento → ThreadPoolExecutor(1)
+_leituras_em_andamento = {}  # leitura → Future
+_ultimas_leituras = {}  # leitura → (valor, instante monotônico)
+_amostras_consumidas = {}  # chave → (buffer circular, total já levado ao histórico)
 
-def tentar_ler(func, tentativas=5):
+
+def leitura_valida(valor):
+    """
+    Indica se uma leitura de sensor é utilizável.
+
+    None e tuplas com algum None (ex.: DHT22 devolvendo (None, None)) contam
+    como falha.
+    """
+    if valor is None:
+        return False
+    if isinstance(valor, tuple):
+        return all(v is not None for v in valor)
+    return True
+
+
+def tentar_ler(func, tentativas=5, validar=leitura_valida, saude=None):
     """
     Executa a função de leitura de sensor até N tentativas.
 
@@ -25,23 +83,45 @@ def tentar_ler(func, tentativas=5):
                             tentar_ler(sensor.read_temp)
 
         tentativas (int): número máximo de chamadas à função (default=5).
+                          Ignorado quando `saude` é informado.
+        validar (callable): decide se o valor retornado é válido
+                            (default=leitura_valida).
+        saude (SaudeSensor|None): disjuntor e política de tentativas do
+                                  sensor (ver saude_sensores_service).
 
     Retorna:
         - Valor retornado pela função (float, tupla ou outro tipo esperado),
-          se em alguma tentativa não for None.
-        - None, se todas as tentativas retornarem None ou gerarem erro.
+          se em alguma tentativa for válido.
+        - None, se todas as tentativas falharem, gerarem erro ou se o
+          disjuntor do sensor estiver aberto (nenhuma leitura é feita).
 
     Observações:
         - Útil para lidar com leituras instáveis (ex.: DHT22).
         - Cada chamada é protegida com try/except para evitar crash.
+        - Com `saude`, as tentativas seguem a política do sensor (com pausa
+          crescente entre elas) e o resultado alimenta o disjuntor.
     """
-    for _ in range(tentativas):
+    if saude is not None:
+        if not saude.disponivel():
+            return None
+        esperas = saude.politica.esperas()
+    else:
+        esperas = [0.0] * tentativas
+
+    for espera in esperas:
+        if espera:
+            time.sleep(espera)
         try:
             valor = func()
-            if valor is not None:
+            if validar(valor):
+                if saude is not None:
+                    saude.registrar(True)
                 return valor
         except Exception:
             pass
+
+    if saude is not None:
+        saude.registrar(False)
     return None
 
 
@@ -64,24 +144,222 @@ def arredondar(valor, casas=2):
     return round(valor, casas) if valor is not None else None
 
 
+def _ler_dht(temperatura_ar_sensor):
+    """Lê o DHT22 com tentativas e devolve sempre uma tupla (temp, umidade)."""
+    leitura = tentar_ler(
+        temperatura_ar_sensor.ler_dados, saude=monitor_saude.obter("DHT22")
+    )
+    return leitura if leitura is not None else (None, None)
+
+
+def _tarefas_leitura(
+    luminosidade_sensor,
+    temperatura_solo_sensor,
+    temperatura_ar_sensor,
+    umidade_solo_sensor,
+):
+    """
+    Define as leituras da rodada: nome → (barramento, função).
+
+    Sensores no mesmo barramento (BH1750 e ADS1115 dividem o I²C) são lidos
+    em série; barramentos diferentes são lidos em paralelo.
+    """
+    return {
+        "Luminosidade": (
+            "i2c",
+            lambda: tentar_ler(
+                luminosidade_sensor.ler_luminosidade,
+                saude=monitor_saude.obter("BH1750"),
+            ),
+        ),
+        "UmidadeDoSolo": (
+            "i2c",
+            lambda: tentar_ler(
+                umidade_solo_sensor.ler_umidade,
+                saude=monitor_saude.obter("UmidadeSolo"),
+            ),
+        ),
+        "TemperaturaDoSolo": (
+            "1wire",
+            lambda: tentar_ler(
+                temperatura_solo_sensor.read_temp,
+                saude=monitor_saude.obter("DS18B20"),
+            ),
+        ),
+        "Ar": ("gpio", lambda: _ler_dht(temperatura_ar_sensor)),
+    }
+
+
+def _executor_barramento(barramento):
+    """Executor de uma thread por barramento (criado sob demanda)."""
+    with _lock_paralelo:
+        executor = _executores.get(barramento)
+        if executor is None:
+            executor = ThreadPoolExecutor(
+                max_workers=1, thread_name_prefix=f"coleta-{barramento}"
+            )
+            _executores[barramento] = executor
+        return executor
+
+
+def _registrar_leitura(nome, futuro):
+    """Guarda o último valor válido de uma leitura (callback do Future)."""
+    if futuro.cancelled() or futuro.exception() is not None:
+        return
+    valor = futuro.result()
+    if valor is not None and valor != (None, None):
+        _ultimas_leituras[nome] = (valor, time.monotonic())
+
+
+def _ler_sequencial(tarefas):
+    """Lê todos os sensores em série (modo original); a falha de um não descarta os outros."""
+    valores = {}
+    for nome, (_, funcao) in tarefas.items():
+        try:
+            valores[nome] = funcao()
+        except Exception as e:
+            print(f"⚠️ Erro na leitura de {nome}: {e}")
+            valores[nome] = None
+    return valores, {}
+
+
+def _ler_paralelo(tarefas, prazo, prazos=None):
+    """
+    Lê os barramentos em paralelo, respeitando um prazo por sensor.
+
+    Sensor que não responde no prazo (ou ainda está preso na leitura do
+    ciclo anterior) devolve o último valor válido, com sua idade em segundos,
+    desde que não seja mais antigo que IDADE_MAXIMA_LEITURA.
+
+    Retorna:
+        tuple(dict, dict): (nome → valor, nome → idade dos valores antigos).
+    """
+    inicio = time.monotonic()
+    futuros = {}
+    for nome, (barramento, funcao) in tarefas.items():
+        anterior = _leituras_em_andamento.get(nome)
+        if anterior is not None and not anterior.done():
+            continue  # leitura anterior ainda travada → não empilha outra
+        futuro = _executor_barramento(barramento).submit(funcao)
+        # Registra a leitura ao terminar, mesmo que termine após o prazo
+        futuro.add_done_callback(lambda f, nome=nome: _registrar_leitura(nome, f))
+        _leituras_em_andamento[nome] = futuro
+        futuros[nome] = futuro
+
+    valores = {}
+    idades = {}
+    for nome in tarefas:
+        futuro = futuros.get(nome)
+        limite = inicio + (prazos or {}).get(nome, prazo)
+        try:
+            if futuro is None:
+                raise FuturoTimeout
+            valores[nome] = futuro.result(timeout=max(0.0, limite - time.monotonic()))
+        except FuturoTimeout:
+            ultimo = _ultimas_leituras.get(nome)
+            idade = time.monotonic() - ultimo[1] if ultimo else None
+            if ultimo and idade <= IDADE_MAXIMA_LEITURA:
+                valores[nome] = ultimo[0]
+                idades[nome] = round(idade, 1)
+                print(f"⏱️ {nome}: prazo excedido, usando leitura de {idade:.0f}s atrás")
+            else:
+                valores[nome] = None
+                print(f"⏱️ {nome}: prazo excedido, sem leitura recente")
+        except Exception as e:
+            print(f"⚠️ Erro na leitura paralela de {nome}: {e}")
+            valores[nome] = None
+
+    return valores, idades
+
+
+def _registrar_historico(amostras):
+    """
+    Entrega amostras aceitas aos consumidores do histórico.
+
+    Na thread da coleta fica só a janela de médias (buffer_sensores, em
+    memória); rollups e histórico local em disco recebem as amostras pelo
+    evento AmostrasColetadas, em um assinante em fila (ver
+    `registrar_consumidores_ciclo`), sem SQLite no caminho do controle.
+
+    Parâmetros:
+        amostras (list[tuple(str, float, float)]): (métrica, instante, valor).
+    """
+    for nome, _, valor in amostras:
+        buffer_sensores.adicionar(nome, valor)
+    barramento_eventos.publicar(AmostrasColetadas(hal.tempo(), tuple(amostras)))
+
+
+def _coletar_instantaneo(amostragem, janela):
+    """
+    Monta `dados_atuais` a partir dos buffers da amostragem contínua.
+
+    Não acessa hardware: devolve o último valor de cada métrica, a idade de
+    cada um e as estatísticas da janela. No histórico (ver
+    `_registrar_historico`) entram todas as amostras novas de cada métrica
+    desde a coleta anterior.
+    """
+    valores, idades, estatisticas = amostragem.instantaneo(janela, IDADE_MAXIMA_LEITURA)
+
+    dados_atuais = {
+        chave: arredondar(valores.get(chave)) for chave in _BUFFER_POR_CHAVE
+    }
+    dados_atuais["timestamp"] = round(hal.tempo(), 2)  # relógio do backend
+    dados_atuais[CHAVE_IDADES] = idades
+    dados_atuais[CHAVE_ESTATISTICAS] = {
+        chave: {
+            "media": arredondar(e["media"]),
+            "minimo": arredondar(e["minimo"]),
+            "maximo": arredondar(e["maximo"]),
+            "amostras": e["amostras"],
+        }
+        for chave, e in estatisticas.items()
+        if e is not None
+    }
+
+    amostras = []
+    for chave, nome_buffer in _BUFFER_POR_CHAVE.items():
+        buffer = amostragem.buffers[chave]
+        consumido = _amostras_consumidas.get(chave)
+        anterior = consumido[1] if consumido and consumido[0] is buffer else 0
+        novos, total = buffer.amostras_desde(anterior)
+        _amostras_consumidas[chave] = (buffer, total)
+        amostras.extend((nome_buffer, instante, valor) for valor, instante in novos)
+    _registrar_historico(amostras)
+
+    return dados_atuais
+
+
 def coletar_dados(
     luminosidade_sensor,
     temperatura_solo_sensor,
     temperatura_ar_sensor,
     umidade_solo_sensor,
+    paralelo=False,
+    prazo=PRAZO_LEITURA_PADRAO,
+    prazos=None,
+    janela=JANELA_ESTATISTICAS,
 ):
     """
     Executa uma rodada única de coleta de dados dos sensores da estufa.
 
+    Com a amostragem contínua ativa (`iniciar_amostragem`), nenhum sensor é
+    lido aqui: a rodada vira um instantâneo dos buffers circulares, com as
+    chaves CHAVE_IDADES e CHAVE_ESTATISTICAS sempre presentes.
+
     Fluxo:
         1. Lê cada sensor individualmente:
             - Luminosidade (BH1750)
             - Temperatura do solo (DS18B20)
             - Temperatura e umidade do ar (DHT22)
             - Umidade do solo (sensor capacitivo)
-        2. Aplica arredondamento e validações.
+           Em modo paralelo, I²C, 1-Wire e GPIO são lidos ao mesmo tempo e o
+           tempo total fica limitado pelo sensor mais lento (ou pelo prazo).
+        2. Aplica arredondamento, validações e o filtro de outliers
+           (filtro_service) às leituras novas.
         3. Monta um dicionário `dados_atuais` com os valores.
-        4. Atualiza o buffer_sensores com valores válidos (não-None).
+        4. Atualiza o buffer_sensores com valores válidos (não-None) e novos
+           e os publica em AmostrasColetadas (rollups e histórico local
+           gravam fora da thread da coleta).
         5. Retorna o dicionário com as leituras da rodada.
 
     Parâmetros:
@@ -89,6 +367,11 @@ def coletar_dados(
         temperatura_solo_sensor (obj): instância do sensor DS18B20.
         temperatura_ar_sensor (obj): instância do sensor DHT22.
         umidade_solo_sensor (obj): instância do sensor de umidade do solo.
+        paralelo (bool): lê os barramentos em paralelo com prazo por sensor.
+        prazo (float): prazo padrão por sensor no modo paralelo (s).
+        prazos (dict|None): prazos específicos ("Luminosidade", "UmidadeDoSolo",
+            "TemperaturaDoSolo", "Ar") que substituem `prazo`.
+        janela (float): janela das estatísticas no modo instantâneo (s).
 
     Retorna:
         dict: com os valores atuais de cada sensor + timestamp.
@@ -101,22 +384,44 @@ def coletar_dados(
                 "UmidadeDoSoloAtual": 41.7,
                 "timestamp": 1725405678.12
             }
+            Se algum valor veio de uma leitura anterior (prazo excedido), a
+            chave CHAVE_IDADES traz a idade em segundos de cada um:
+                "IdadeLeituras": {"TemperaturaDoArAtual": 31.0}
+            No modo instantâneo, CHAVE_ESTATISTICAS traz a janela por métrica:
+                "EstatisticasJanela": {"LuminosidadeAtual":
+                    {"media": 230.1, "minimo": 221.7, "maximo": 240.0,
+                     "amostras": 60}}
         None: em caso de erro inesperado.
     """
     try:
+        amostragem = amostragem_service.amostragem_ativa
+        if amostragem is not None:
+            return _coletar_instantaneo(amostragem, janela)
+
+        tarefas = _tarefas_leitura(
+            luminosidade_sensor,
+            temperatura_solo_sensor,
+            temperatura_ar_sensor,
+            umidade_solo_sensor,
+        )
+        if paralelo:
+            leituras, idades = _ler_paralelo(tarefas, prazo, prazos)
+        else:
+            leituras, idades = _ler_sequencial(tarefas)
+
         # Luminosidade
-        lux = arredondar(tentar_ler(luminosidade_sensor.ler_luminosidade))
+        lux = arredondar(leituras["Luminosidade"])
 
         # Temperatura do solo
-        temperatura_solo = arredondar(tentar_ler(temperatura_solo_sensor.read_temp))
+        temperatura_solo = arredondar(leituras["TemperaturaDoSolo"])
 
         # Temperatura e umidade do ar (DHT22)
-        (temperatura_ar, umidade_ar) = tentar_ler(temperatura_ar_sensor.ler_dados)
+        (temperatura_ar, umidade_ar) = leituras["Ar"] or (None, None)
         temperatura_ar = arredondar(temperatura_ar)
         umidade_ar = arredondar(umidade_ar)
 
         # Umidade do solo
-        umidade_solo = arredondar(tentar_ler(umidade_solo_sensor.ler_umidade))
+        umidade_solo = arredondar(leituras["UmidadeDoSolo"])
 
         # Dicionário com as leituras atuais
         dados_atuais = {
@@ -125,20 +430,40 @@ def coletar_dados(
             "UmidadeDoArAtual": umidade_ar,
             "TemperaturaDoSoloAtual": temperatura_solo,
             "UmidadeDoSoloAtual": umidade_solo,
-            "timestamp": round(time.time(), 2),
+            "timestamp": round(hal.tempo(), 2),  # relógio do backend
         }
+        if idades:
+            dados_atuais[CHAVE_IDADES] = {
+                chave: idades[nome]
+                for nome, chaves in _CHAVES_POR_LEITURA.items()
+                if nome in idades
+                for chave in chaves
+            }
+
+        # Filtro de outliers (apenas valores novos): o controle recebe o
+        # substituto da amostra rejeitada, o histórico não recebe nada
+        antigas = {chave for nome in idades for chave in _CHAVES_POR_LEITURA[nome]}
+        rejeitadas = set()
+        for chave in _BUFFER_POR_CHAVE:
+            valor = dados_atuais[chave]
+            if valor is None or chave in antigas:
+                continue
+            filtrado, rejeitado = filtro_metricas.filtrar(
+                chave, valor, dados_atuais["timestamp"]
+            )
+            if rejeitado:
+                print(f"🧹 {chave}: amostra {valor} rejeitada pelo filtro")
+                rejeitadas.add(chave)
+            dados_atuais[chave] = arredondar(filtrado)
 
-        # Preenchimento do buffer histórico (apenas valores válidos)
-        if lux is not None:
-            buffer_sensores["Luminosidade"].append(lux)
-        if temperatura_solo is not None:
-            buffer_sensores["TemperaturaDoSolo"].append(temperatura_solo)
-        if temperatura_ar is not None:
-            buffer_sensores["Temperatura"].append(temperatura_ar)
-        if umidade_ar is not None:
-            buffer_sensores["Umidade"].append(umidade_ar)
-        if umidade_solo is not None:
-            buffer_sensores["UmidadeDoSolo"].append(umidade_solo)
+        # Preenchimento do histórico (apenas valores válidos, novos e aceitos)
+        _registrar_historico(
+            [
+                (nome_buffer, dados_atuais["timestamp"], dados_atuais[chave])
+                for chave, nome_buffer in _BUFFER_POR_CHAVE.items()
+                if dados_atuais[chave] is not None and chave not in antigas | rejeitadas
+            ]
+        )
 
         return dados_atuais
 
@@ -1,5 +1,9 @@
 # services/controle_service.py
 
+ATUADORES_SEGURANCA = ("Aquecedor", "Ventoinha")
+ATUADORES_CICLO = ("Luminaria", "Bomba")
+ATUADORES = ATUADORES_SEGURANCA + ATUADORES_CICLO
+
 
 def controlar_atuadores(
     ventoinha,
@@ -53,83 +57,104 @@ def controlar_atuadores(
         - Fases normais → decisão feita pelas lógicas individuais de cada atuador.
 
     Segurança:
-        - Qualquer exceção capturada resulta em desligamento de todos os atuadores,
-          com motivo "Erro no controle".
+        - Uma exceção no controle de um grupo (aquecedor/ventoinha ou
+          luminária/bomba) resulta em motivo "Erro no controle" para os
+          atuadores desse grupo.
+    """
+    if not config:
+        print("🚫 Configuração local não encontrada.")
+        return _status_erro(ATUADORES)
+
+    status_atuadores = controlar_seguranca(
+        ventoinha, aquecedor, temperatura_ar, umidade_ar, config
+    )
+    status_atuadores.update(
+        controlar_irrigacao_iluminacao(luminaria, bomba, umidade_solo, config)
+    )
+    return status_atuadores
+
+
+def _status_erro(nomes):
+    return {nome: (False, "Erro no controle") for nome in nomes}
+
+
+def _motivo_desligamento(config):
+    """
+    Motivo para manter todos os atuadores desligados (Standby, Colheita ou
+    sistema desativado), ou None em operação normal.
+    """
+    if config.get("FaseAtual") == "Standby":
+        return "Estufa em Standby"
+    if config.get("FaseAtual") == "Colheita":
+        return "Fase Colheita"
+    if not config.get("EstadoSistema", False):
+        return "Sistema desativado"
+    return None
+
+
+def controlar_seguranca(ventoinha, aquecedor, temperatura_ar, umidade_ar, config):
+    """
+    Controle térmico (aquecedor e ventoinha), rápido o bastante para rodar a
+    cada poucos segundos (ver agendador_service).
+
+    Parâmetros e casos especiais: os mesmos de controlar_atuadores.
+
+    Retorna:
+        dict: {"Aquecedor": (bool, str), "Ventoinha": (bool, str)}.
     """
     try:
         if not config:
-            print("🚫 Configuração local não encontrada.")
-            return {
-                "Aquecedor": (False, "Erro no controle"),
-                "Ventoinha": (False, "Erro no controle"),
-                "Luminaria": (False, "Erro no controle"),
-                "Bomba": (False, "Erro no controle"),
-            }
+            return _status_erro(ATUADORES_SEGURANCA)
 
-        # --- Standby ---
-        if config.get("FaseAtual") == "Standby":
-            motivo = "Estufa em Standby"
+        motivo = _motivo_desligamento(config)
+        if motivo:
             ventoinha.desligar()
-            luminaria.desligar()
-            bomba.desligar()
             aquecedor.desligar()
+            return {"Aquecedor": (False, motivo), "Ventoinha": (False, motivo)}
 
-            status_atuadores = {
-                "Aquecedor": (False, motivo),
-                "Ventoinha": (False, motivo),
-                "Luminaria": (False, motivo),
-                "Bomba": (False, motivo),
-            }
-
-        # --- Colheita ou sistema parado ---
-        elif config.get("FaseAtual") == "Colheita" or not config.get(
-            "EstadoSistema", False
-        ):
-            motivo = (
-                "Fase Colheita"
-                if config.get("FaseAtual") == "Colheita"
-                else "Sistema desativado"
-            )
-            ventoinha.desligar()
-            luminaria.desligar()
-            bomba.desligar()
-            aquecedor.desligar()
+        aquecedor_ativo, motivo_aquecedor = aquecedor.controlar(temperatura_ar, config)
+        ventoinha_ativa, motivo_ventoinha = ventoinha.controlar(
+            temperatura_ar, umidade_ar, aquecedor_ativo, config
+        )
+        return {
+            "Aquecedor": (aquecedor_ativo, motivo_aquecedor),
+            "Ventoinha": (ventoinha_ativa, motivo_ventoinha),
+        }
 
-            status_atuadores = {
-                "Aquecedor": (False, motivo),
-                "Ventoinha": (False, motivo),
-                "Luminaria": (False, motivo),
-                "Bomba": (False, motivo),
-            }
+    except Exception as e:
+        print(f"⚠️ Erro ao controlar aquecedor/ventoinha: {e}")
+        return _status_erro(ATUADORES_SEGURANCA)
 
-        # --- Operação normal ---
-        else:
-            aquecedor_ativo, motivo_aquecedor = aquecedor.controlar(
-                temperatura_ar, config
-            )
 
-            ventoinha_ativa, motivo_ventoinha = ventoinha.controlar(
-                temperatura_ar, umidade_ar, aquecedor_ativo, config
-            )
+def controlar_irrigacao_iluminacao(luminaria, bomba, umidade_solo, config):
+    """
+    Controle da luminária e da bomba, no ritmo do ciclo.
 
-            luminaria_ativa, motivo_luminaria = luminaria.controlar(config=config)
+    A bomba fica no ritmo do ciclo: a umidade do solo reage em minutos
+    (Bomba.TEMPO_REACAO_UMIDADE), não há ganho em decidir mais rápido.
 
-            bomba_ativa, motivo_bomba = bomba.controlar(umidade_solo, config)
+    Parâmetros e casos especiais: os mesmos de controlar_atuadores.
 
-            status_atuadores = {
-                "Aquecedor": (aquecedor_ativo, motivo_aquecedor),
-                "Ventoinha": (ventoinha_ativa, motivo_ventoinha),
-                "Luminaria": (luminaria_ativa, motivo_luminaria),
-                "Bomba": (bomba_ativa, motivo_bomba),
-            }
+    Retorna:
+        dict: {"Luminaria": (bool, str), "Bomba": (bool, str)}.
+    """
+    try:
+        if not config:
+            return _status_erro(ATUADORES_CICLO)
 
-        return status_atuadores
+        motivo = _motivo_desligamento(config)
+        if motivo:
+            luminaria.desligar()
+            bomba.desligar()
+            return {"Luminaria": (False, motivo), "Bomba": (False, motivo)}
 
-    except Exception as e:
-        print(f"⚠️ Erro ao controlar atuadores: {e}")
+        luminaria_ativa, motivo_luminaria = luminaria.controlar(config=config)
+        bomba_ativa, motivo_bomba = bomba.controlar(umidade_solo, config)
         return {
-            "Aquecedor": (False, "Erro no controle"),
-            "Ventoinha": (False, "Erro no controle"),
-            "Luminaria": (False, "Erro no controle"),
-            "Bomba": (False, "Erro no controle"),
+            "Luminaria": (luminaria_ativa, motivo_luminaria),
+            "Bomba": (bomba_ativa, motivo_bomba),
         }
+
+    except Exception as e:
+        print(f"⚠️ Erro ao controlar luminária/bomba: {e}")
+        return _status_erro(ATUADORES_CICLO)
@@ -1,67 +1,72 @@
 # services/envio_service.py
 import time
-from config.firebase_config import enviar_dados_firestore
+from config.firebase_config import (
+    CHAVE_ESTATISTICAS_HISTORICO,
+    enviar_dados_firestore,
+    enviar_resumos_firestore,
+)
 from services.coleta_service import buffer_sensores  # reaproveita o mesmo buffer
+from services.rollup_service import motor_rollup
 
 
-def media(lista):
-    """
-    Calcula a média de uma lista.
-
-    Parâmetros:
-        lista (list[float]): lista de valores numéricos.
-
-    Retorna:
-        float | None:
-            - Média dos valores, se a lista não estiver vazia.
-            - None, se a lista estiver vazia.
-    """
-    return sum(lista) / len(lista) if lista else None
-
-
-def enviar_dados_periodicamente(estufa_id, exibir_dados_periodicos=None):
+def enviar_dados_periodicamente(
+    estufa_id, exibir_dados_periodicos=None, enviar=enviar_dados_firestore
+):
     """
     Executa uma rodada única de envio de médias dos sensores.
 
     Fluxo:
-        1. Verifica se há dados suficientes no buffer (>= 5 leituras de Luminosidade).
-        2. Calcula a média de cada sensor.
-        3. Limpa os buffers após o envio.
-        4. Envia as médias para o Firestore (histórico).
-        5. Opcionalmente exibe as médias no terminal.
+        1. Verifica se a janela do buffer venceu (JANELA_HISTORICO segundos
+           desde a primeira amostra).
+        2. Fecha a janela: média, mínimo, máximo e desvio padrão de cada sensor.
+        3. Envia o resumo para o Firestore (histórico).
+        4. Opcionalmente exibe o resumo no terminal.
 
     Critério de envio:
-        - É necessário pelo menos 5 valores de Luminosidade acumulados.
-        - As demais variáveis podem ter menos leituras:
-            - Se houver dados → média calculada.
-            - Se não houver → retorna None.
+        - A janela fecha por tempo, qualquer que seja o sensor com amostras.
+        - Sensor sem amostras na janela → média None e sem estatísticas.
+
+    Formato enviado:
+        {
+            "Luminosidade": média, ..., "timestamp": fim da janela,
+            "Estatisticas": {
+                "Luminosidade": {"minimo", "maximo", "desvio_padrao", "amostras"},
+                ...
+            }
+        }
 
     Parâmetros:
         estufa_id (str): Identificador único da estufa.
         exibir_dados_periodicos (callable|None): função opcional para exibir no terminal.
+        enviar (callable): função (estufa_id, medias) que grava o histórico.
+            Default = `enviar_dados_firestore` (bloqueante); o ciclo passa uma
+            função que apenas enfileira o envio.
 
     Retorna:
         None, em execução normal.
-        dict com valores None, em caso de erro.
+        dict no formato enviado, com médias None e `Estatisticas` vazio, em
+        caso de erro.
     """
     try:
-        # critério de disparo → 5 valores de Luminosidade
-        if len(buffer_sensores["Luminosidade"]) >= 5:
-            media_dados = {
-                "Luminosidade": media(buffer_sensores["Luminosidade"]),
-                "TemperaturaDoSolo": media(buffer_sensores["TemperaturaDoSolo"]),
-                "Temperatura": media(buffer_sensores["Temperatura"]),
-                "Umidade": media(buffer_sensores["Umidade"]),
-                "UmidadeDoSolo": media(buffer_sensores["UmidadeDoSolo"]),
-                "timestamp": round(time.time(), 2),
-            }
+        # critério de disparo → janela vencida (por tempo)
+        if buffer_sensores.vencida():
+            resumos, _, fim = buffer_sensores.fechar()
 
-            # 🔄 Limpa buffers
-            for key in buffer_sensores:
-                buffer_sensores[key].clear()
+            media_dados = {sensor: r["media"] for sensor, r in resumos.items()}
+            media_dados["timestamp"] = round(fim, 2)
+            media_dados[CHAVE_ESTATISTICAS_HISTORICO] = {
+                sensor: {
+                    "minimo": r["minimo"],
+                    "maximo": r["maximo"],
+                    "desvio_padrao": r["desvio_padrao"],
+                    "amostras": r["amostras"],
+                }
+                for sensor, r in resumos.items()
+                if r["amostras"]
+            }
 
             # ☁️ Envia ao Firestore
-            enviar_dados_firestore(estufa_id, media_dados)
+            enviar(estufa_id, media_dados)
 
             # 🖥️ Exibe no terminal (se função passada)
             if exibir_dados_periodicos:
@@ -69,11 +74,62 @@ def enviar_dados_periodicamente(estufa_id, exibir_dados_periodicos=None):
 
     except Exception as e:
         print(f"⚠️ Erro ao enviar dados periódicos: {e}")
-        return {
-            "Luminosidade": None,
-            "TemperaturaDoSolo": None,
-            "Temperatura": None,
-            "Umidade": None,
-            "UmidadeDoSolo": None,
-            "timestamp": round(time.time(), 2),
-        }
+        media_dados = {sensor: None for sensor in buffer_sensores}
+        media_dados["timestamp"] = round(time.time(), 2)
+        media_dados[CHAVE_ESTATISTICAS_HISTORICO] = {}
+        return media_dados
+
+
+def gravar_resumos(estufa_id, blocos):
+    """
+    Grava os blocos de resumo na outbox e, em seguida, o estado dos
+    intervalos ainda abertos (nessa ordem: um reinício não perde nem
+    duplica intervalos).
+
+    Parâmetros:
+        estufa_id (str): Identificador único da estufa.
+        blocos (list[dict]): blocos retirados de `motor_rollup.pendentes_envio`.
+
+    Retorna:
+        bool: True se os blocos chegaram à outbox.
+    """
+    ok = enviar_resumos_firestore(estufa_id, blocos) if blocos else True
+    if ok:
+        try:
+            motor_rollup.salvar()
+        except Exception as e:
+            print(f"⚠️ Erro ao salvar estado dos rollups: {e}")
+    return ok
+
+
+def enviar_resumos_periodicamente(estufa_id, enviar=gravar_resumos, forcar=False):
+    """
+    Executa uma rodada dos rollups multi-resolução (rollup_service).
+
+    Fluxo:
+        1. Fecha os intervalos vencidos (1 min, 15 min, 1 h, 1 dia), mesmo
+           sem amostras novas.
+        2. Grava na outbox os blocos que fecharam, cada um com o instante
+           de liberação da sua agenda (15 min de hora em hora, 1 h a cada
+           6 h, 1 dia ao fechar), e salva os intervalos abertos. Blocos de
+           1 min ficam apenas no dispositivo.
+
+    Parâmetros:
+        estufa_id (str): Identificador único da estufa.
+        enviar (callable): função (estufa_id, blocos) que grava os resumos
+            e o estado do motor (ver `gravar_resumos`).
+        forcar (bool): libera os blocos já e salva o estado mesmo sem blocos
+            novos (ex.: no encerramento).
+
+    Retorna:
+        int: número de blocos gravados.
+    """
+    try:
+        motor_rollup.processar()
+        blocos = motor_rollup.pendentes_envio(forcar=forcar)
+        if blocos or forcar:
+            enviar(estufa_id, blocos)
+        return len(blocos)
+    except Exception as e:
+        print(f"⚠️ Erro ao enviar resumos: {e}")
+        return 0
@@ -0,0 +1,419 @@
+# services/eventos_service.py
+"""
+Barramento de eventos em processo entre as etapas do ciclo da estufa.
+
+Responsabilidades:
+- Eventos tipados publicados pelo ciclo: LeituraSensores, DecisaoAtuadores,
+  DecisaoSeguranca, AmostrasColetadas, ConfiguracaoAlterada e FaseAvancada.
+- Assinantes síncronos (rodam na thread de quem publica; para consumidores
+  de microssegundos, ex.: enfileirar um envio) e assinantes em fila
+  (rodam em um pool de threads; para terminal, logger, exportadores...).
+- Cada assinante em fila tem uma fila limitada: se atrasar, os eventos mais
+  antigos são descartados (contados e avisados) e o ciclo nunca espera.
+- Assinantes que não podem perder eventos (ex.: histórico durável) usam
+  fila sem limite (capacidade=None) e uma thread própria (dedicado=True),
+  fora do pool compartilhado.
+- Métricas por assinante: entregues, processados, descartados, falhas,
+  espera na fila e tempo de processamento (ms).
+
+Um novo consumidor não acrescenta latência ao controle: em fila, o custo
+para quem publica é um append em uma deque.
+
+Uso:
+    barramento_eventos.assinar(DecisaoAtuadores, tratar, nome="logger")
+    barramento_eventos.publicar(DecisaoAtuadores(1, time.time(), {}, config))
+    print(barramento_eventos.estatisticas())
+"""
+
+import threading
+import time
+from collections import deque
+from concurrent.futures import ThreadPoolExecutor
+from dataclasses import dataclass
+
+from services.agregacao_service import AgregadoWelford
+
+TRABALHADORES_PADRAO = 2
+CAPACIDADE_PADRAO = 100
+
+SINCRONO = "sincrono"
+FILA = "fila"
+
+
+# ===============================
+# Eventos
+# ===============================
+@dataclass(frozen=True, slots=True)
+class LeituraSensores:
+    """Leituras da coleta de um ciclo (dados: chave → valor)."""
+
+    ciclo: int
+    instante: float
+    dados: dict
+
+
+@dataclass(frozen=True, slots=True)
+class AmostrasColetadas:
+    """
+    Amostras aceitas por uma coleta, para os consumidores do histórico
+    (rollups e histórico local em disco).
+
+    amostras: tupla de (métrica, instante, valor); publicado a cada coleta,
+    mesmo vazio (os rollups fecham intervalos sem amostras novas).
+    """
+
+    instante: float
+    amostras: tuple
+
+
+@dataclass(frozen=True, slots=True)
+class DecisaoAtuadores:
+    """
+    Decisões do controle em um ciclo.
+
+    atuadores: nome → (ligado, motivo); config: configuração (imutável)
+    usada na decisão, com `versao`.
+    """
+
+    ciclo: int
+    instante: float
+    atuadores: dict
+    config: dict
+
+
+@dataclass(frozen=True, slots=True)
+class DecisaoSeguranca:
+    """
+    Mudança de estado do controle térmico entre dois ciclos (etapa de
+    segurança do ciclo agendado).
+
+    Não é um ciclo: só o status dos atuadores reage (logger e envios
+    periódicos assinam apenas DecisaoAtuadores). atuadores: nome →
+    (ligado, motivo) apenas dos atuadores da etapa.
+    """
+
+    instante: float
+    atuadores: dict
+    config: dict
+
+
+@dataclass(frozen=True, slots=True)
+class ConfiguracaoAlterada:
+    """Nova configuração publicada pelo cache de configuração."""
+
+    instante: float
+    versao: int
+    versao_anterior: int | None
+    config: dict
+
+
+@dataclass(frozen=True, slots=True)
+class FaseAvancada:
+    """Avanço automático de fase detectado pelo ciclo."""
+
+    instante: float
+    estufa_id: str
+    planta: str | None
+    fase: str
+
+
+# ===============================
+# Assinantes
+# ===============================
+class Assinante:
+    """
+    Consumidor de um ou mais tipos de evento.
+
+    Criado por BarramentoEventos.assinar; em modo FILA os eventos de um
+    assinante são processados um de cada vez, na ordem de publicação.
+    """
+
+    def __init__(
+        self,
+        barramento,
+        nome,
+        tipos,
+        callback,
+        modo,
+        capacidade,
+        ao_encerrar,
+        dedicado=False,
+    ):
+        self._barramento = barramento
+        self.nome = nome
+        self.tipos = tipos
+        self._callback = callback
+        self.modo = modo
+        self._ao_encerrar = ao_encerrar
+        self._fila = deque(maxlen=capacidade)
+        self._condicao = threading.Condition()
+        self._agendado = False
+        self._dedicado = dedicado
+        self._pool = None  # thread própria (dedicado)
+        self.ativo = True
+
+        self.entregues = 0
+        self.processados = 0
+        self.descartados = 0
+        self.falhas = 0
+        self._espera = AgregadoWelford()  # ms entre publicar e processar
+        self._processamento = AgregadoWelford()  # ms dentro do callback
+
+    def _entregar(self, evento):
+        publicado = time.perf_counter()
+        if self.modo == SINCRONO:
+            with self._condicao:
+                if not self.ativo:
+                    return
+                self.entregues += 1
+            self._processar(evento, publicado)
+            return
+
+        with self._condicao:
+            if not self.ativo:
+                return
+            descartou = len(self._fila) == self._fila.maxlen
+            if descartou:
+                self.descartados += 1
+            self._fila.append((evento, publicado))
+            self.entregues += 1
+            agendar = not self._agendado
+            self._agendado = True
+        if descartou:
+            print(
+                f"⚠️ Assinante '{self.nome}' atrasado: evento mais antigo "
+                f"descartado ({self.descartados} no total)"
+            )
+        if not agendar:
+            return
+        try:
+            self._executor().submit(self._drenar)
+        except RuntimeError:
+            # pool já encerrado
+            with self._condicao:
+                self._agendado = False
+
+    def _executor(self):
+        if not self._dedicado:
+            return self._barramento._executor()
+        with self._condicao:
+            if self._pool is None:
+                self._pool = ThreadPoolExecutor(
+                    max_workers=1, thread_name_prefix=f"eventos-{self.nome}"
+                )
+            return self._pool
+
+    def _drenar(self):
+        while True:
+            with self._condicao:
+                if not self._fila:
+                    self._agendado = False
+                    self._condicao.notify_all()
+                    return
+                evento, publicado = self._fila.popleft()
+            self._processar(evento, publicado)
+
+    def _processar(self, evento, publicado):
+        inicio = time.perf_counter()
+        try:
+            self._callback(evento)
+            falhou = False
+        except Exception as e:
+            falhou = True
+            print(f"⚠️ Erro no assinante '{self.nome}': {e}")
+        fim = time.perf_counter()
+        with self._condicao:
+            self._espera.adicionar((inicio - publicado) * 1000)
+            self._processamento.adicionar((fim - inicio) * 1000)
+            self.processados += 1
+            self.falhas += falhou
+
+    def pendentes(self):
+        """Número de eventos na fila."""
+        with self._condicao:
+            return len(self._fila)
+
+    def cancelar(self, timeout=5):
+        """
+        Deixa de receber eventos, espera a fila esvaziar (até `timeout`
+        segundos) e chama `ao_encerrar`.
+
+        Retorna:
+            bool: True se a fila foi drenada a tempo.
+        """
+        self._barramento._remover(self)
+        with self._condicao:
+            self.ativo = False
+            drenado = self._condicao.wait_for(
+                lambda: not self._fila and not self._agendado, timeout
+            )
+            pool, self._pool = self._pool, None
+        if pool is not None:
+            pool.shutdown(wait=False)
+        if self._ao_encerrar is not None:
+            try:
+                self._ao_encerrar()
+            except Exception as e:
+                print(f"⚠️ Erro ao encerrar o assinante '{self.nome}': {e}")
+        return drenado
+
+    def estatisticas(self):
+        """
+        Retorna:
+            dict: {modo, entregues, processados, descartados, falhas,
+            pendentes, espera_ms, processamento_ms}, com as latências em
+            {media, maximo, amostras}.
+        """
+
+        def latencia(agregado):
+            resumo = agregado.resumo(casas=3)
+            return {
+                "media": resumo["media"],
+                "maximo": resumo["maximo"],
+                "amostras": resumo["amostras"],
+            }
+
+        with self._condicao:
+            return {
+                "modo": self.modo,
+                "entregues": self.entregues,
+                "processados": self.processados,
+                "descartados": self.descartados,
+                "falhas": self.falhas,
+                "pendentes": len(self._fila),
+                "espera_ms": latencia(self._espera),
+                "processamento_ms": latencia(self._processamento),
+            }
+
+
+class BarramentoEventos:
+    """
+    Publicação de eventos tipados para N assinantes.
+
+    Uso:
+        barramento = BarramentoEventos()
+        barramento.assinar((LeituraSensores, DecisaoAtuadores), tratar,
+                           nome="terminal", capacidade=50)
+        barramento.assinar(LeituraSensores, enfileirar, modo=SINCRONO)
+        barramento.publicar(LeituraSensores(1, time.time(), dados))
+    """
+
+    def __init__(self, trabalhadores=TRABALHADORES_PADRAO):
+        """
+        Parâmetros:
+            trabalhadores (int): threads do pool dos assinantes em fila
+                (criado no primeiro evento).
+        """
+        self.trabalhadores = trabalhadores
+        self._lock = threading.Lock()
+        self._assinantes = []
+        self._pool = None
+        self._pool_proprio = True
+        self.publicados = 0
+
+    def _executor(self):
+        with self._lock:
+            if self._pool is None:
+                self._pool = ThreadPoolExecutor(
+                    max_workers=self.trabalhadores, thread_name_prefix="eventos"
+                )
+                self._pool_proprio = True
+            return self._pool
+
+    def usar_executor(self, executor):
+        """
+        Roda os assinantes em fila em um executor externo (ex.: o executor
+        limitado do runtime asyncio), em vez de um pool próprio.
+        """
+        with self._lock:
+            self._pool = executor
+            self._pool_proprio = False
+
+    def assinar(
+        self,
+        tipos,
+        callback,
+        nome=None,
+        modo=FILA,
+        capacidade=CAPACIDADE_PADRAO,
+        ao_encerrar=None,
+        dedicado=False,
+    ):
+        """
+        Registra um consumidor.
+
+        Parâmetros:
+            tipos (type|tuple[type]): classes de evento recebidas.
+            callback (callable): função chamada com cada evento.
+            nome (str|None): identificação nas métricas (default = callback).
+            modo (str): FILA (pool de threads) ou SINCRONO (thread de quem
+                publica; use só para trabalho de microssegundos).
+            capacidade (int|None): tamanho máximo da fila do assinante
+                (FILA); None = sem limite (nenhum evento é descartado).
+            ao_encerrar (callable|None): chamado ao cancelar, depois de
+                drenar a fila (ex.: fechar arquivos).
+            dedicado (bool): processa a fila em uma thread própria, fora do
+                pool compartilhado (e do executor de `usar_executor`).
+
+        Retorna:
+            Assinante
+        """
+        if modo not in (SINCRONO, FILA):
+            raise ValueError(f"Modo de assinante inválido: {modo}")
+        if not isinstance(tipos, tuple):
+            tipos = (tipos,)
+        assinante = Assinante(
+            self,
+            nome or getattr(callback, "__name__", repr(callback)),
+            tipos,
+            callback,
+            modo,
+            capacidade,
+            ao_encerrar,
+            dedicado,
+        )
+        with self._lock:
+            self._assinantes.append(assinante)
+        return assinante
+
+    def _remover(self, assinante):
+        with self._lock:
+            if assinante in self._assinantes:
+                self._assinantes.remove(assinante)
+
+    def publicar(self, evento):
+        """Entrega o evento aos assinantes do seu tipo (não espera os em fila)."""
+        with self._lock:
+            assinantes = list(self._assinantes)
+            self.publicados += 1
+        for assinante in assinantes:
+            if isinstance(evento, assinante.tipos):
+                assinante._entregar(evento)
+
+    def estatisticas(self):
+        """
+        Retorna:
+            dict: {publicados, assinantes: {nome: Assinante.estatisticas()}}.
+        """
+        with self._lock:
+            assinantes = list(self._assinantes)
+        return {
+            "publicados": self.publicados,
+            "assinantes": {a.nome: a.estatisticas() for a in assinantes},
+        }
+
+    def parar(self, timeout=5):
+        """Cancela todos os assinantes (drenando as filas) e encerra o pool."""
+        with self._lock:
+            assinantes = list(self._assinantes)
+        limite = time.monotonic() + timeout
+        for assinante in assinantes:
+            assinante.cancelar(timeout=max(0.0, limite - time.monotonic()))
+        with self._lock:
+            pool, self._pool = self._pool, None
+        if pool is not None and self._pool_proprio:
+            pool.shutdown(wait=False)
+
+
+# Instância única: eventos do ciclo da estufa
+barramento_eventos = BarramentoEventos()
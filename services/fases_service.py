@@ -5,7 +5,8 @@ Serviço de controle de fases da estufa.
 Responsabilidades:
 - Calcular a próxima fase de cultivo.
 - Verificar e avançar automaticamente a fase com base no tempo decorrido.
-- Agendar avanço automático exato (threading.Timer).
+- Agendar avanço automático exato (modules.hal.agendar_tempo_real: threading.Timer, ou
+  timer do laço no runtime asyncio).
 - Cancelar avanço automático em casos de reinício/standby.
 
 Fluxo esperado:
@@ -15,12 +16,14 @@ Fluxo esperado:
 - ciclo_estufa → verificar_e_avancar_fase (fallback de segurança)
 """
 
-import threading
 from datetime import datetime, timezone, timedelta
 from dateutil.parser import isoparse
 
 from config.firebase_config import firestore_db
-from config.configuracao_local import carregar_preset, carregar_configuracao_local
+from config.configuracao_local import carregar_preset
+from config.cache_presets import ORDEM_FASES
+from config.cache_configuracao import obter_configuracao, recarregar_configuracao
+from modules import hal
 
 
 # Timer global para avanço automático
@@ -53,11 +56,12 @@ def agendar_avanco_fase(estufa_id: str) -> None:
     Observações:
         - Se já passou do tempo previsto, não agenda (o ciclo normal avançará).
         - Substitui qualquer timer anterior (_timer_fase global).
-        - Usa threading.Timer com função local `_avancar`.
+        - Usa hal.agendar_tempo_real com função local `_avancar`.
     """
     global _timer_fase
 
-    config = carregar_configuracao_local(estufa_id)
+    # Leitura direta: normalmente chamado logo após gravar uma nova fase
+    config = recarregar_configuracao(estufa_id)
     if not config:
         return
 
@@ -92,14 +96,13 @@ def agendar_avanco_fase(estufa_id: str) -> None:
     def _avancar():
         """
         Função interna executada pelo timer no momento exato.
-        - Revalida config local
+        - Revalida config (cache em memória)
         - Chama verificar_e_avancar_fase
         - Se avançar, reseta ciclo e agenda próximo avanço
         """
         from services.ciclo_service import ciclo_reset_event, verificar_e_avancar_fase
-        from config.configuracao_local import carregar_configuracao_local
 
-        config_local = carregar_configuracao_local(estufa_id)
+        config_local = obter_configuracao(estufa_id)
         nova = verificar_e_avancar_fase(estufa_id, config_local)
         if nova:
             print(f"⏩ Avanço agendado disparado: {nova}")
@@ -107,9 +110,7 @@ def agendar_avanco_fase(estufa_id: str) -> None:
             agendar_avanco_fase(estufa_id)
 
     # Agenda execução exata
-    _timer_fase = threading.Timer(segundos_restantes, _avancar)
-    _timer_fase.daemon = True
-    _timer_fase.start()
+    _timer_fase = hal.agendar_tempo_real(segundos_restantes, _avancar)
 
     print(f"⏳ Avanço agendado para {fim.isoformat()}")
 
@@ -128,10 +129,9 @@ def proxima_fase(fase_atual: str) -> str | None:
             - Nome da próxima fase, se existir.
             - None, se já estiver em Colheita ou fase inválida.
     """
-    ordem = ["Germinacao", "Crescimento", "Floracao", "Colheita"]
-    if fase_atual in ordem:
-        idx = ordem.index(fase_atual)
-        return ordem[idx + 1] if idx + 1 < len(ordem) else None
+    if fase_atual in ORDEM_FASES:
+        idx = ORDEM_FASES.index(fase_atual)
+        return ORDEM_FASES[idx + 1] if idx + 1 < len(ORDEM_FASES) else None
     return None
 
 
@@ -0,0 +1,278 @@
+# services/fila_envio_service.py
+"""
+Fila de envio assíncrona para gravações na nuvem.
+
+Responsabilidades:
+- Desacoplar o ciclo de controle das chamadas bloqueantes ao Firebase:
+  o ciclo apenas enfileira e segue (microssegundos).
+- Uma fila limitada e uma thread de trabalho por destino ("firestore",
+  "realtime"), para que um destino lento não atrase o outro.
+- Coalescência por chave: se já existe um envio pendente com a mesma chave,
+  ele é substituído pelo mais recente (ou mesclado, se houver `mesclar`).
+- Métricas de pressão: profundidade, descartes, coalescências e latência.
+- No runtime asyncio (`usar_laco`), cada worker é uma tarefa do laço:
+  funções corrotina são aguardadas e as bloqueantes rodam no executor.
+
+Uso:
+    fila_envio.enfileirar("realtime", "DadosAtuais", funcao, arg1, arg2)
+    print(fila_envio.estatisticas())
+"""
+
+import asyncio
+import inspect
+import threading
+import time
+from collections import OrderedDict
+
+DESTINOS_PADRAO = ("firestore", "realtime")
+
+
+class _Destino:
+    """Estado interno de um destino: fila pendente, worker e contadores."""
+
+    def __init__(self, nome, capacidade):
+        self.nome = nome
+        self.capacidade = capacidade
+        self.pendentes = OrderedDict()  # chave → (funcao, args, instante)
+        self.condicao = threading.Condition()
+        self.thread = None
+        self.tarefa = None  # runtime asyncio
+        self.sinal = None
+
+        self.enfileirados = 0
+        self.coalescidos = 0
+        self.descartados = 0
+        self.enviados = 0
+        self.falhas = 0
+        self.latencia_media = None
+        self.latencia_maxima = 0.0
+
+
+class FilaEnvio:
+    """
+    Fila limitada com coalescência por chave e um worker por destino.
+
+    Cada tarefa é uma função chamada no worker. Se ela retornar False ou
+    levantar exceção, conta como falha (o reenvio fica a cargo de quem
+    gerou a tarefa, ex.: heartbeat dos publicadores).
+    """
+
+    def __init__(self, destinos=DESTINOS_PADRAO, capacidade=100):
+        """
+        Parâmetros:
+            destinos (tuple[str]): nomes dos destinos (um worker para cada).
+            capacidade (int): máximo de tarefas pendentes por destino; ao
+                exceder, a tarefa mais antiga é descartada.
+        """
+        self._destinos = {nome: _Destino(nome, capacidade) for nome in destinos}
+        self._ativo = True
+        self._laco = None
+        self._executor = None
+
+    def enfileirar(self, destino, chave, funcao, *args, mesclar=None):
+        """
+        Agenda uma gravação e retorna imediatamente.
+
+        Parâmetros:
+            destino (str): nome do destino ("firestore" ou "realtime").
+            chave (hashable): identifica o conteúdo; pendências com a mesma
+                chave são coalescidas (a mais recente vence).
+            funcao (callable): função que faz a gravação.
+            *args: argumentos da função.
+            mesclar (callable|None): (args_pendentes, args_novos) → args usados
+                no lugar do "mais recente vence".
+
+        Retorna:
+            bool: False se a fila já foi encerrada.
+        """
+        d = self._destinos[destino]
+        with d.condicao:
+            if not self._ativo:
+                return False
+
+            d.enfileirados += 1
+            pendente = d.pendentes.pop(chave, None)
+            if pendente is not None:
+                d.coalescidos += 1
+                if mesclar is not None:
+                    args = mesclar(pendente[1], args)
+                # mantém o instante original para medir a latência real
+                instante = pendente[2]
+            else:
+                instante = time.monotonic()
+                while len(d.pendentes) >= d.capacidade:
+                    d.pendentes.popitem(last=False)
+                    d.descartados += 1
+
+            d.pendentes[chave] = (funcao, args, instante)
+            self._garantir_worker(d)
+            d.condicao.notify()
+        return True
+
+    def profundidade(self, destino=None):
+        """
+        Retorna o número de tarefas pendentes.
+
+        Parâmetros:
+            destino (str|None): destino específico ou None para o total.
+        """
+        if destino is not None:
+            return len(self._destinos[destino].pendentes)
+        return sum(len(d.pendentes) for d in self._destinos.values())
+
+    def estatisticas(self):
+        """
+        Retorna métricas por destino.
+
+        Retorna:
+            dict: destino → {profundidade, enfileirados, coalescidos, descartados,
+                  enviados, falhas, latencia_media_ms, latencia_maxima_ms}.
+        """
+        resultado = {}
+        for nome, d in self._destinos.items():
+            with d.condicao:
+                resultado[nome] = {
+                    "profundidade": len(d.pendentes),
+                    "enfileirados": d.enfileirados,
+                    "coalescidos": d.coalescidos,
+                    "descartados": d.descartados,
+                    "enviados": d.enviados,
+                    "falhas": d.falhas,
+                    "latencia_media_ms": (
+                        round(d.latencia_media * 1000, 1)
+                        if d.latencia_media is not None
+                        else None
+                    ),
+                    "latencia_maxima_ms": round(d.latencia_maxima * 1000, 1),
+                }
+        return resultado
+
+    def parar(self, timeout=5):
+        """
+        Encerra a fila, esperando os workers esvaziarem as pendências.
+
+        Parâmetros:
+            timeout (float): tempo máximo de espera, somando todos os
+                destinos (s).
+        """
+        self._ativo = False
+        limite = time.monotonic() + timeout
+        for d in self._destinos.values():
+            with d.condicao:
+                d.condicao.notify_all()
+            if d.thread:
+                d.thread.join(max(0.0, limite - time.monotonic()))
+
+    def usar_laco(self, laco, executor=None):
+        """
+        Passa os workers para tarefas do laço asyncio (runtime asyncio).
+        Deve ser chamado no próprio laço; `enfileirar` continua podendo ser
+        chamado de qualquer thread.
+
+        Parâmetros:
+            laco (asyncio.AbstractEventLoop): laço em execução.
+            executor (Executor|None): onde rodam as funções bloqueantes
+                (None = executor padrão do laço).
+        """
+        self._laco = laco
+        self._executor = executor
+        for d in self._destinos.values():
+            d.sinal = asyncio.Event()
+            d.tarefa = laco.create_task(self._trabalhar_async(d))
+
+    async def parar_async(self, timeout=5):
+        """Como `parar`, para os workers do laço asyncio."""
+        self._ativo = False
+        tarefas = []
+        for d in self._destinos.values():
+            if d.sinal is not None:
+                d.sinal.set()
+            if d.tarefa is not None:
+                tarefas.append(d.tarefa)
+        if tarefas:
+            _, pendentes = await asyncio.wait(tarefas, timeout=timeout)
+            for tarefa in pendentes:
+                tarefa.cancel()
+        self._laco = None
+
+    # ------------------------------------------------------------------
+    # Internos
+    # ------------------------------------------------------------------
+    def _garantir_worker(self, d):
+        """Inicia o worker do destino na primeira tarefa (chamado com lock)."""
+        if self._laco is not None:
+            self._laco.call_soon_threadsafe(d.sinal.set)
+            return
+        if d.thread is None or not d.thread.is_alive():
+            d.thread = threading.Thread(
+                target=self._trabalhar,
+                args=(d,),
+                name=f"fila-envio-{d.nome}",
+                daemon=True,
+            )
+            d.thread.start()
+
+    def _trabalhar(self, d):
+        """Loop do worker: retira a tarefa mais antiga e executa."""
+        while True:
+            with d.condicao:
+                while not d.pendentes and self._ativo:
+                    d.condicao.wait()
+                if not d.pendentes:
+                    return
+                _, (funcao, args, instante) = d.pendentes.popitem(last=False)
+
+            try:
+                ok = funcao(*args) is not False
+            except Exception as e:
+                print(f"⚠️ Erro no envio ({d.nome}): {e}")
+                ok = False
+            self._registrar_resultado(d, ok, instante)
+
+    async def _trabalhar_async(self, d):
+        """Worker do runtime asyncio: mesmo protocolo de `_trabalhar`."""
+        laco = asyncio.get_running_loop()
+        while True:
+            with d.condicao:
+                tarefa = d.pendentes.popitem(last=False)[1] if d.pendentes else None
+            if tarefa is None:
+                if not self._ativo:
+                    return
+                d.sinal.clear()
+                with d.condicao:
+                    vazio = not d.pendentes
+                if vazio and self._ativo:
+                    await d.sinal.wait()
+                continue
+
+            funcao, args, instante = tarefa
+            try:
+                if inspect.iscoroutinefunction(funcao):
+                    resultado = await funcao(*args)
+                else:
+                    resultado = await laco.run_in_executor(
+                        self._executor, funcao, *args
+                    )
+                ok = resultado is not False
+            except Exception as e:
+                print(f"⚠️ Erro no envio ({d.nome}): {e}")
+                ok = False
+            self._registrar_resultado(d, ok, instante)
+
+    def _registrar_resultado(self, d, ok, instante):
+        latencia = time.monotonic() - instante
+        with d.condicao:
+            if ok:
+                d.enviados += 1
+            else:
+                d.falhas += 1
+            d.latencia_maxima = max(d.latencia_maxima, latencia)
+            d.latencia_media = (
+                latencia
+                if d.latencia_media is None
+                else 0.9 * d.latencia_media + 0.1 * latencia
+            )
+
+
+# Instância única usada pelo backend
+fila_envio = FilaEnvio()
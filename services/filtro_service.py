@@ -0,0 +1,272 @@
+# services/filtro_service.py
+"""
+Filtros de outliers aplicados às leituras antes do controle e do histórico.
+
+Responsabilidades:
+- Etapas de filtro por métrica, com estado em janelas fixas (array de floats):
+    FiltroHampel     → rejeita amostras longe da mediana (em MADs)
+    MedianaMovel     → suaviza com a mediana das últimas N amostras
+    LimiteVariacao   → rejeita saltos maiores que a taxa física possível
+- Cadeia configurável por métrica (FILTROS_PADRAO).
+- Contadores de amostras e rejeições por métrica.
+
+Amostra rejeitada:
+- Não entra no buffer histórico.
+- O controle recebe o valor substituto da etapa (mediana da janela ou
+  último valor aceito), em vez do pico.
+"""
+
+import math
+import threading
+import time
+from array import array
+
+# Fator que torna o MAD comparável ao desvio padrão (distribuição normal)
+FATOR_MAD = 1.4826
+
+
+def _mediana(valores):
+    ordenados = sorted(valores)
+    n = len(ordenados)
+    meio = n // 2
+    if n % 2:
+        return ordenados[meio]
+    return (ordenados[meio - 1] + ordenados[meio]) / 2
+
+
+class JanelaFixa:
+    """Últimas N amostras em um array circular de floats."""
+
+    def __init__(self, tamanho):
+        self.tamanho = tamanho
+        self._valores = array("d", [math.nan]) * tamanho
+        self._total = 0
+
+    def adicionar(self, valor):
+        self._valores[self._total % self.tamanho] = valor
+        self._total += 1
+
+    def __len__(self):
+        return min(self._total, self.tamanho)
+
+    def valores(self):
+        """Amostras presentes na janela (ordem irrelevante)."""
+        return self._valores[: len(self)]
+
+
+class FiltroHampel:
+    """
+    Rejeita a amostra que se afasta da mediana da janela mais que
+    `limiar` desvios (MAD escalado), com um desvio mínimo para janelas
+    estáveis (MAD zero). A amostra bruta sempre entra na janela, então uma
+    mudança real de patamar passa a ser aceita após meia janela.
+    """
+
+    def __init__(self, janela=7, limiar=3.0, desvio_minimo=0.0):
+        """
+        Parâmetros:
+            janela (int): número de amostras anteriores consideradas.
+            limiar (float): distância máxima em desvios (MAD escalado).
+            desvio_minimo (float): distância mínima tolerada (unidade da métrica).
+        """
+        self.janela = JanelaFixa(janela)
+        self.limiar = limiar
+        self.desvio_minimo = desvio_minimo
+
+    def processar(self, valor, instante):
+        """Retorna (valor de saída, rejeitado)."""
+        resultado = (valor, False)
+        if len(self.janela) >= 3:
+            anteriores = self.janela.valores()
+            mediana = _mediana(anteriores)
+            mad = _mediana([abs(v - mediana) for v in anteriores]) * FATOR_MAD
+            if abs(valor - mediana) > max(self.limiar * mad, self.desvio_minimo):
+                resultado = (mediana, True)
+        self.janela.adicionar(valor)
+        return resultado
+
+
+class MedianaMovel:
+    """Substitui cada amostra pela mediana das últimas N (nunca rejeita)."""
+
+    def __init__(self, janela=5):
+        """
+        Parâmetros:
+            janela (int): número de amostras da mediana.
+        """
+        self.janela = JanelaFixa(janela)
+
+    def processar(self, valor, instante):
+        """Retorna (mediana da janela, False)."""
+        self.janela.adicionar(valor)
+        return _mediana(self.janela.valores()), False
+
+
+class LimiteVariacao:
+    """
+    Rejeita saltos acima do fisicamente possível desde a última amostra
+    aceita. Após `rejeicoes_maximas` rejeições seguidas, a amostra é aceita
+    como novo patamar (evita travar após uma mudança real).
+    """
+
+    def __init__(self, taxa_maxima, variacao_minima=0.0, rejeicoes_maximas=3):
+        """
+        Parâmetros:
+            taxa_maxima (float): variação máxima por segundo (unidade/s).
+            variacao_minima (float): variação sempre tolerada, qualquer que
+                seja o intervalo (unidade da métrica).
+            rejeicoes_maximas (int): rejeições seguidas antes de aceitar.
+        """
+        self.taxa_maxima = taxa_maxima
+        self.variacao_minima = variacao_minima
+        self.rejeicoes_maximas = rejeicoes_maximas
+        self._ultimo = None  # (valor, instante) aceito
+        self._rejeicoes_seguidas = 0
+
+    def processar(self, valor, instante):
+        """Retorna (valor de saída, rejeitado)."""
+        if self._ultimo is not None:
+            anterior, instante_anterior = self._ultimo
+            permitido = max(
+                self.variacao_minima,
+                self.taxa_maxima * max(0.0, instante - instante_anterior),
+            )
+            if (
+                abs(valor - anterior) > permitido
+                and self._rejeicoes_seguidas < self.rejeicoes_maximas
+            ):
+                self._rejeicoes_seguidas += 1
+                return anterior, True
+
+        self._rejeicoes_seguidas = 0
+        self._ultimo = (valor, instante)
+        return valor, False
+
+
+class CadeiaFiltros:
+    """
+    Sequência de etapas aplicada a uma métrica.
+
+    Se uma etapa rejeita, as seguintes não recebem a amostra e a saída é o
+    substituto dessa etapa.
+    """
+
+    def __init__(self, etapas):
+        """
+        Parâmetros:
+            etapas (list): objetos com `processar(valor, instante)`.
+        """
+        self.etapas = list(etapas)
+        self.amostras = 0
+        self.rejeitadas = 0
+
+    def processar(self, valor, instante):
+        """Retorna (valor de saída, rejeitado)."""
+        self.amostras += 1
+        for etapa in self.etapas:
+            valor, rejeitado = etapa.processar(valor, instante)
+            if rejeitado:
+                self.rejeitadas += 1
+                return valor, True
+        return valor, False
+
+
+# Etapas padrão por métrica (uma fábrica por métrica: cada cadeia tem estado
+# próprio). Luminosidade não é filtrada: a luminária muda o nível de uma vez.
+FILTROS_PADRAO = {
+    "TemperaturaDoArAtual": lambda: [
+        FiltroHampel(janela=7, limiar=3.0, desvio_minimo=1.0),
+        LimiteVariacao(taxa_maxima=0.1, variacao_minima=2.0),
+    ],
+    "UmidadeDoArAtual": lambda: [
+        FiltroHampel(janela=7, limiar=3.0, desvio_minimo=3.0),
+        LimiteVariacao(taxa_maxima=0.5, variacao_minima=5.0),
+    ],
+    "TemperaturaDoSoloAtual": lambda: [
+        FiltroHampel(janela=7, limiar=3.0, desvio_minimo=0.5),
+    ],
+    "UmidadeDoSoloAtual": lambda: [
+        FiltroHampel(janela=7, limiar=3.0, desvio_minimo=3.0),
+        LimiteVariacao(taxa_maxima=0.5, variacao_minima=5.0),
+    ],
+}
+
+
+class FiltroMetricas:
+    """
+    Cadeias de filtro de todas as métricas.
+
+    Uso:
+        filtro = FiltroMetricas()
+        valor, rejeitado = filtro.filtrar("TemperaturaDoArAtual", 85.0)
+        print(filtro.estatisticas())
+    """
+
+    def __init__(self, configuracao=None):
+        """
+        Parâmetros:
+            configuracao (dict|None): métrica → fábrica de etapas
+                (default = FILTROS_PADRAO). Métricas ausentes passam direto.
+        """
+        self.configuracao = FILTROS_PADRAO if configuracao is None else configuracao
+        self._lock = threading.Lock()
+        self._cadeias = {}
+
+    def _cadeia(self, metrica):
+        cadeia = self._cadeias.get(metrica)
+        if cadeia is None and metrica in self.configuracao:
+            cadeia = CadeiaFiltros(self.configuracao[metrica]())
+            self._cadeias[metrica] = cadeia
+        return cadeia
+
+    def filtrar(self, metrica, valor, instante=None):
+        """
+        Aplica a cadeia da métrica a uma amostra.
+
+        Parâmetros:
+            metrica (str): chave da métrica (ex.: "UmidadeDoSoloAtual").
+            valor (float|None): amostra (None passa direto).
+            instante (float|None): instante da amostra (default = agora).
+
+        Retorna:
+            tuple(float|None, bool): (valor para o controle, rejeitado).
+        """
+        if valor is None:
+            return None, False
+        instante = time.time() if instante is None else instante
+        with self._lock:
+            cadeia = self._cadeia(metrica)
+            if cadeia is None:
+                return valor, False
+            return cadeia.processar(valor, instante)
+
+    def reiniciar(self, metrica=None):
+        """Descarta o estado das janelas (de uma métrica ou de todas)."""
+        with self._lock:
+            if metrica is None:
+                self._cadeias.clear()
+            else:
+                self._cadeias.pop(metrica, None)
+
+    def estatisticas(self):
+        """
+        Retorna contadores por métrica.
+
+        Retorna:
+            dict: métrica → {amostras, rejeitadas, taxa_rejeicao}.
+        """
+        with self._lock:
+            return {
+                metrica: {
+                    "amostras": cadeia.amostras,
+                    "rejeitadas": cadeia.rejeitadas,
+                    "taxa_rejeicao": (
+                        cadeia.rejeitadas / cadeia.amostras if cadeia.amostras else None
+                    ),
+                }
+                for metrica, cadeia in self._cadeias.items()
+            }
+
+
+# Instância única usada pelo backend
+filtro_metricas = FiltroMetricas()
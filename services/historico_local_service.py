@@ -0,0 +1,101 @@
+# services/historico_local_service.py
+"""
+Histórico local das leituras (séries temporais em SQLite no dispositivo).
+
+Responsabilidades:
+- Receber as amostras aceitas pela coleta (evento AmostrasColetadas, no
+  assinante em fila "historico", junto com os rollups) e gravá-las em lote
+  em `utils.serie_temporal.SerieTemporal`, fora da thread do controle.
+- Expor consultas reduzidas ("o que aconteceu nas últimas 6 horas") sem
+  leituras na nuvem nem varredura do CSV de testes.
+
+O banco é criado na primeira gravação; compactação e retenção rodam
+automaticamente a cada INTERVALO_MANUTENCAO_PADRAO segundos de gravação.
+"""
+
+import os
+import threading
+
+from modules import hal
+from utils.serie_temporal import SerieTemporal
+
+CAMINHO_SERIES = os.path.join(
+    os.path.dirname(os.path.dirname(__file__)), "config", "series.db"
+)
+
+# False → a coleta não grava o histórico local
+HISTORICO_LOCAL_ATIVO = True
+
+_serie = None
+_opcoes = {}
+_lock = threading.Lock()
+
+
+def configurar_historico_local(caminho=None, ativo=True, **opcoes):
+    """
+    Redefine o armazenamento local (antes da primeira gravação ou para
+    trocar de arquivo, ex.: ":memory:" em simulações).
+
+    Parâmetros:
+        caminho (str|None): arquivo SQLite (default = CAMINHO_SERIES).
+        ativo (bool): liga/desliga a gravação pela coleta.
+        **opcoes: argumentos de SerieTemporal (compactar_apos, retencao, ...).
+    """
+    global _serie, HISTORICO_LOCAL_ATIVO, CAMINHO_SERIES, _opcoes
+    with _lock:
+        if _serie is not None:
+            _serie.fechar()
+            _serie = None
+        if caminho is not None:
+            CAMINHO_SERIES = caminho
+        HISTORICO_LOCAL_ATIVO = ativo
+        _opcoes = opcoes
+
+
+def obter_historico_local():
+    """Retorna o armazenamento local (criado na primeira chamada)."""
+    global _serie
+    if _serie is None:
+        with _lock:
+            if _serie is None:
+                _serie = SerieTemporal(CAMINHO_SERIES, relogio=hal.tempo, **_opcoes)
+    return _serie
+
+
+def registrar_amostras(amostras):
+    """
+    Grava amostras da coleta no histórico local (falhas não interrompem a
+    coleta).
+
+    Parâmetros:
+        amostras (list[tuple(str, float, float)]): (métrica, instante, valor).
+    """
+    if not HISTORICO_LOCAL_ATIVO or not amostras:
+        return
+    try:
+        obter_historico_local().gravar(amostras)
+    except Exception as e:
+        print(f"⚠️ Erro ao gravar histórico local: {e}")
+
+
+def consultar_historico_local(metrica, segundos, pontos=300, metodo="agregado"):
+    """
+    Consulta as últimas `segundos` de uma métrica, reduzidas a `pontos`.
+
+    Parâmetros:
+        metrica (str): nome da métrica (ex.: "Temperatura").
+        segundos (float): tamanho do intervalo até agora.
+        pontos (int): número de baldes/pontos da resposta.
+        metodo (str): "agregado", "lttb" ou "bruto" (ver SerieTemporal.consultar).
+
+    Retorna:
+        list[tuple]: pontos reduzidos (vazia em caso de erro).
+    """
+    agora = hal.tempo()
+    try:
+        return obter_historico_local().consultar(
+            metrica, agora - segundos, agora + 1e-6, pontos, metodo
+        )
+    except Exception as e:
+        print(f"⚠️ Erro ao consultar histórico local: {e}")
+        return []
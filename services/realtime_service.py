@@ -0,0 +1,187 @@
+# services/realtime_service.py
+"""
+Política de publicação das leituras atuais no Realtime Database.
+
+Responsabilidades:
+- Aplicar bandas mortas (absoluta/relativa) por métrica: variações dentro
+  do ruído do sensor não geram envio.
+- Garantir um intervalo mínimo entre envios e um heartbeat (intervalo máximo)
+  que reenvia todas as métricas.
+- Enviar apenas as chaves alteradas (update parcial em DadosAtuais).
+- Contabilizar envios e supressões.
+"""
+
+import threading
+import time
+
+from config.firebase_config import enviar_dados_realtime
+
+# Bandas mortas padrão por métrica:
+#   absoluta → variação mínima na unidade do sensor
+#   relativa → fração do último valor enviado (ex.: 0.05 = 5%)
+# A variação precisa superar a maior das duas para ser publicada.
+BANDAS_PADRAO = {
+    "LuminosidadeAtual": {"absoluta": 20.0, "relativa": 0.05},
+    "TemperaturaDoArAtual": {"absoluta": 0.3},
+    "UmidadeDoArAtual": {"absoluta": 1.0},
+    "TemperaturaDoSoloAtual": {"absoluta": 0.2},
+    "UmidadeDoSoloAtual": {"absoluta": 1.0},
+}
+
+
+class PoliticaPublicacao:
+    """
+    Decide quais chaves de `DadosAtuais` devem ser enviadas.
+
+    Regras (em ordem):
+      1. Antes de `intervalo_minimo` desde o último envio → nada é enviado.
+      2. Após `intervalo_maximo` → heartbeat com todas as métricas.
+      3. Caso contrário → só métricas fora da banda morta (ou que passaram
+         de/para None). O "timestamp" acompanha qualquer envio.
+
+    Uso:
+        politica = PoliticaPublicacao()
+        delta = politica.selecionar(dados)
+        if delta and enviar(delta):
+            politica.confirmar(delta)
+    """
+
+    def __init__(self, bandas=None, intervalo_minimo=0, intervalo_maximo=300):
+        """
+        Parâmetros:
+            bandas (dict|None): métrica → {"absoluta": float, "relativa": float}.
+                Default = BANDAS_PADRAO.
+            intervalo_minimo (float): segundos mínimos entre envios.
+            intervalo_maximo (float): heartbeat — segundos máximos sem envio completo.
+        """
+        self.bandas = BANDAS_PADRAO if bandas is None else bandas
+        self.intervalo_minimo = intervalo_minimo
+        self.intervalo_maximo = intervalo_maximo
+
+        self._lock = threading.Lock()
+        self._enviados = {}  # métrica → último valor publicado
+        self._ultimo_envio = None
+        self._ultimo_completo = None
+
+        self.envios = 0
+        self.envios_suprimidos = 0
+        self.chaves_enviadas = 0
+        self.chaves_suprimidas = 0
+
+    def _fora_da_banda(self, chave, valor, anterior):
+        """Indica se `valor` se afastou de `anterior` além da banda morta."""
+        if valor is None or anterior is None:
+            return valor is not anterior
+        if not isinstance(valor, (int, float)) or not isinstance(
+            anterior, (int, float)
+        ):
+            return valor != anterior
+
+        banda = self.bandas.get(chave)
+        if not banda:
+            return valor != anterior
+
+        limite = max(
+            banda.get("absoluta", 0.0), banda.get("relativa", 0.0) * abs(anterior)
+        )
+        return abs(valor - anterior) > limite
+
+    def selecionar(self, dados):
+        """
+        Retorna o subconjunto de `dados` que deve ser publicado agora.
+
+        Parâmetros:
+            dados (dict): leituras atuais (formato de `coletar_dados`).
+
+        Retorna:
+            dict: chaves a enviar (vazio se nada mudou além da banda morta).
+        """
+        agora = time.monotonic()
+        metricas = {k: v for k, v in dados.items() if k != "timestamp"}
+
+        with self._lock:
+            if (
+                self._ultimo_envio is not None
+                and agora - self._ultimo_envio < self.intervalo_minimo
+            ):
+                self.envios_suprimidos += 1
+                self.chaves_suprimidas += len(metricas)
+                return {}
+
+            heartbeat = (
+                self._ultimo_completo is None
+                or agora - self._ultimo_completo >= self.intervalo_maximo
+            )
+            if heartbeat:
+                delta = dict(metricas)
+            else:
+                delta = {
+                    chave: valor
+                    for chave, valor in metricas.items()
+                    if chave not in self._enviados
+                    or self._fora_da_banda(chave, valor, self._enviados[chave])
+                }
+
+            self.chaves_suprimidas += len(metricas) - len(delta)
+            if not delta:
+                self.envios_suprimidos += 1
+                return {}
+
+        if "timestamp" in dados:
+            delta["timestamp"] = dados["timestamp"]
+        return delta
+
+    def confirmar(self, delta):
+        """
+        Registra um envio bem-sucedido.
+
+        Parâmetros:
+            delta (dict): chaves efetivamente publicadas.
+        """
+        agora = time.monotonic()
+        with self._lock:
+            metricas = {k: v for k, v in delta.items() if k != "timestamp"}
+            self._enviados.update(metricas)
+            self._ultimo_envio = agora
+            if self._ultimo_completo is None or len(metricas) >= len(self._enviados):
+                self._ultimo_completo = agora
+            self.envios += 1
+            self.chaves_enviadas += len(metricas)
+
+    def estatisticas(self):
+        """
+        Retorna contadores de envios e supressões.
+
+        Retorna:
+            dict: envios, envios_suprimidos, chaves_enviadas, chaves_suprimidas.
+        """
+        with self._lock:
+            return {
+                "envios": self.envios,
+                "envios_suprimidos": self.envios_suprimidos,
+                "chaves_enviadas": self.chaves_enviadas,
+                "chaves_suprimidas": self.chaves_suprimidas,
+            }
+
+
+def publicar_dados_realtime(estufa_id, dados, politica):
+    """
+    Envia ao Realtime Database apenas as chaves selecionadas pela política.
+
+    Parâmetros:
+        estufa_id (str): Identificador único da estufa.
+        dados (dict): leituras atuais dos sensores.
+        politica (PoliticaPublicacao): política de bandas/intervalos.
+
+    Retorna:
+        bool: True se nada precisava ser enviado ou o envio deu certo.
+    """
+    delta = politica.selecionar(dados)
+    if not delta:
+        return True
+
+    if not enviar_dados_realtime(estufa_id, delta):
+        return False
+
+    politica.confirmar(delta)
+    return True
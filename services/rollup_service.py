@@ -0,0 +1,402 @@
+# services/rollup_service.py
+"""
+Resumos em várias resoluções (rollups) calculados no próprio dispositivo.
+
+Responsabilidades:
+- Manter, a partir do fluxo de amostras brutas, agregados de Welford
+  (média, desvio padrão, mínimo, máximo, contagem) por métrica em
+  intervalos de 1 min, 15 min, 1 h e 1 dia, alinhados ao relógio (UTC).
+- Cada amostra atualiza apenas o intervalo de 1 min; ao fechar, ele é
+  combinado no de 15 min, que é combinado no de 1 h, e assim por diante.
+- Cada resolução tem a própria agenda de envio (RESOLUCOES):
+    1 min  → fica apenas no dispositivo (últimos intervalos em memória)
+    15 min → enviados de hora em hora
+    1 h    → enviados a cada 6 horas
+    1 dia  → enviado quando o dia fecha
+  Os blocos saem do motor assim que fecham (para a outbox em disco, com o
+  instante de liberação em "envio_em"); a agenda só decide quando a outbox
+  os entrega.
+- Persistir os intervalos ainda abertos (contagem, média, M2, mínimo e
+  máximo por métrica) para que a hora e o dia em andamento sobrevivam a um
+  reinício; intervalos iniciados antes da cobertura do motor (boot sem
+  estado salvo) saem marcados como "parcial".
+- Os envios de um dia vão para um único documento (ver
+  `enviar_resumos_firestore`), então um painel lê um documento por dia.
+
+Memória constante: um agregado aberto por métrica e resolução, mais filas
+limitadas de intervalos fechados.
+"""
+
+import json
+import math
+import os
+import tempfile
+import threading
+from collections import deque
+
+from modules import hal
+from services.agregacao_service import AgregadoWelford
+
+# (nome, duração do intervalo em s, intervalo de envio em s)
+# envio None → apenas local; 0 → envia assim que o intervalo fecha
+RESOLUCOES = (
+    ("1min", 60, None),
+    ("15min", 900, 3600),
+    ("1h", 3600, 6 * 3600),
+    ("1d", 86400, 0),
+)
+
+# Intervalos fechados mantidos em memória por resolução
+HISTORICO_LOCAL_PADRAO = 1440  # 1 dia de intervalos de 1 min
+
+# Estado dos intervalos abertos (restaurado no boot)
+CAMINHO_ESTADO_ROLLUP = os.path.join(
+    os.path.dirname(os.path.dirname(__file__)), "config", "rollup_estado.json"
+)
+VERSAO_ESTADO = 1
+
+
+class _Nivel:
+    """Intervalo aberto de uma resolução (um agregado por métrica)."""
+
+    def __init__(self, nome, duracao, envio, metricas, historico_local):
+        self.nome = nome
+        self.duracao = duracao
+        self.envio = envio
+        self.inicio = None
+        self.parcial = False
+        self.agregados = {metrica: AgregadoWelford() for metrica in metricas}
+        self.fechados = deque(maxlen=historico_local)
+        self.pendentes = []
+
+    def alinhar(self, instante):
+        return math.floor(instante / self.duracao) * self.duracao
+
+    def abrir(self, instante, cobertura):
+        """Abre o intervalo de `instante` (parcial se começou antes da cobertura)."""
+        self.inicio = self.alinhar(instante)
+        self.parcial = self.inicio < cobertura
+
+    def vencido(self, instante):
+        return self.inicio is not None and instante >= self.inicio + self.duracao
+
+    def fechar(self):
+        """Retorna o bloco do intervalo e deixa o nível vazio."""
+        bloco = {
+            "resolucao": self.nome,
+            "inicio": self.inicio,
+            "fim": self.inicio + self.duracao,
+            "parcial": self.parcial,
+            "metricas": {
+                metrica: _resumo(agregado)
+                for metrica, agregado in self.agregados.items()
+                if agregado.contagem
+            },
+        }
+        for agregado in self.agregados.values():
+            agregado.reiniciar()
+        self.inicio = None
+        self.parcial = False
+        return bloco
+
+
+def _resumo(agregado):
+    resumo = agregado.resumo()
+    resumo.pop("ultimo")
+    return resumo
+
+
+class MotorRollup:
+    """
+    Mantém os rollups de todas as métricas.
+
+    Uso:
+        motor = MotorRollup(["Temperatura", "Umidade"])
+        motor.adicionar("Temperatura", 21.5)
+        motor.processar()                 # fecha intervalos vencidos
+        blocos = motor.pendentes_envio()  # blocos fechados desde a última chamada
+        motor.recentes("1min")            # últimos intervalos locais
+        motor.salvar()                    # persiste os intervalos abertos
+    """
+
+    def __init__(
+        self,
+        metricas,
+        resolucoes=RESOLUCOES,
+        relogio=None,
+        historico_local=HISTORICO_LOCAL_PADRAO,
+        caminho_estado=None,
+    ):
+        """
+        Parâmetros:
+            metricas (list[str]): nomes das métricas.
+            resolucoes (tuple): (nome, duração, envio) da mais fina à mais
+                grossa; cada duração deve ser múltipla da anterior.
+            relogio (callable|None): fonte de tempo (default = hal.tempo).
+            historico_local (int): intervalos fechados mantidos por resolução.
+            caminho_estado (str|None): JSON dos intervalos abertos
+                (None → `salvar`/`carregar` não fazem nada).
+        """
+        self.metricas = list(metricas)
+        self.caminho_estado = caminho_estado
+        self._relogio = relogio or hal.tempo
+        self._lock = threading.Lock()
+        self._niveis = [
+            _Nivel(nome, duracao, envio, self.metricas, historico_local)
+            for nome, duracao, envio in resolucoes
+        ]
+        self._total_fechados = 0
+        # Primeiro instante coberto por amostras (intervalos anteriores a ele
+        # estão incompletos)
+        self._cobertura = None
+        # Fim do último intervalo base fechado: amostras anteriores chegaram
+        # atrasadas e não reabrem um intervalo já enviado
+        self._fechado_ate = None
+        self.descartadas = 0
+
+    def adicionar(self, metrica, valor, instante=None):
+        """
+        Inclui uma amostra bruta (None é ignorado; amostras de um intervalo
+        já fechado são descartadas e contadas em `descartadas`).
+
+        Parâmetros:
+            metrica (str): nome da métrica.
+            valor (float|None): amostra.
+            instante (float|None): instante da amostra (default = agora).
+        """
+        if valor is None:
+            return
+        instante = self._relogio() if instante is None else instante
+        with self._lock:
+            if self._cobertura is None:
+                self._cobertura = instante
+            base = self._niveis[0]
+            if base.vencido(instante):
+                self._fechar(0)
+            if base.inicio is None:
+                if self._fechado_ate is not None and instante < self._fechado_ate:
+                    self.descartadas += 1
+                    return
+                base.abrir(instante, self._cobertura)
+            base.agregados[metrica].adicionar(valor)
+
+    def _fechar(self, indice):
+        """Fecha o nível `indice` e combina o resultado no nível seguinte."""
+        nivel = self._niveis[indice]
+        acima = self._niveis[indice + 1] if indice + 1 < len(self._niveis) else None
+
+        if acima is not None:
+            if acima.vencido(nivel.inicio):
+                self._fechar(indice + 1)
+            if acima.inicio is None:
+                acima.abrir(nivel.inicio, self._cobertura)
+            for metrica, agregado in nivel.agregados.items():
+                acima.agregados[metrica].combinar(agregado)
+
+        if indice == 0:
+            self._fechado_ate = nivel.inicio + nivel.duracao
+        bloco = nivel.fechar()
+        if not bloco["metricas"]:
+            return
+        nivel.fechados.append(bloco)
+        self._total_fechados += 1
+        if nivel.envio is not None:
+            nivel.pendentes.append(
+                dict(bloco, envio_em=_liberacao(bloco["fim"], nivel.envio))
+            )
+
+    def processar(self, agora=None):
+        """
+        Fecha os intervalos vencidos (mesmo sem amostras novas).
+
+        Retorna:
+            int: número de intervalos fechados com amostras.
+        """
+        agora = self._relogio() if agora is None else agora
+        with self._lock:
+            antes = self._total_fechados
+            for indice, nivel in enumerate(self._niveis):
+                if nivel.vencido(agora):
+                    self._fechar(indice)
+            return self._total_fechados - antes
+
+    def pendentes_envio(self, agora=None, forcar=False):
+        """
+        Retira os blocos fechados desde a última chamada.
+
+        Os blocos saem assim que fecham, para que a outbox os grave em disco;
+        "envio_em" é o instante em que a agenda da resolução os libera
+        (15 min → próxima hora cheia, 1 h → próximo múltiplo de 6 h,
+        1 dia → imediatamente).
+
+        Parâmetros:
+            agora (float|None): instante atual (default = relógio).
+            forcar (bool): libera os blocos já (ex.: no encerramento).
+
+        Retorna:
+            list[dict]: blocos {resolucao, inicio, fim, parcial, envio_em, metricas}.
+        """
+        agora = self._relogio() if agora is None else agora
+        blocos = []
+        with self._lock:
+            for nivel in self._niveis:
+                blocos.extend(nivel.pendentes)
+                nivel.pendentes = []
+        if forcar:
+            for bloco in blocos:
+                bloco["envio_em"] = min(bloco["envio_em"], agora)
+        return blocos
+
+    def recentes(self, resolucao, limite=None):
+        """
+        Intervalos fechados de uma resolução mantidos no dispositivo.
+
+        Retorna:
+            list[dict]: blocos do mais antigo ao mais recente.
+        """
+        with self._lock:
+            for nivel in self._niveis:
+                if nivel.nome == resolucao:
+                    blocos = list(nivel.fechados)
+                    return blocos[-limite:] if limite else blocos
+        raise ValueError(f"Resolução desconhecida: {resolucao}")
+
+    def abertos(self):
+        """
+        Estado parcial dos intervalos ainda abertos.
+
+        Retorna:
+            dict: resolução → {inicio, metricas} (inicio None se vazio).
+        """
+        with self._lock:
+            return {
+                nivel.nome: {
+                    "inicio": nivel.inicio,
+                    "metricas": {
+                        metrica: _resumo(agregado)
+                        for metrica, agregado in nivel.agregados.items()
+                        if agregado.contagem
+                    },
+                }
+                for nivel in self._niveis
+            }
+
+    def estado(self):
+        """
+        Estado dos intervalos abertos, serializável em JSON.
+
+        Inclui os blocos já fechados que ainda não saíram por
+        `pendentes_envio` (a outbox ignora ids repetidos).
+
+        Retorna:
+            dict: {versao, cobertura, niveis: {resolução → {inicio, parcial,
+                  agregados: {métrica → estado Welford}, pendentes}}}.
+        """
+        with self._lock:
+            return {
+                "versao": VERSAO_ESTADO,
+                "cobertura": self._cobertura,
+                "niveis": {
+                    nivel.nome: {
+                        "inicio": nivel.inicio,
+                        "parcial": nivel.parcial,
+                        "agregados": {
+                            metrica: agregado.estado()
+                            for metrica, agregado in nivel.agregados.items()
+                            if agregado.contagem
+                        },
+                        "pendentes": list(nivel.pendentes),
+                    }
+                    for nivel in self._niveis
+                    if nivel.inicio is not None or nivel.pendentes
+                },
+            }
+
+    def restaurar(self, estado):
+        """
+        Recarrega os intervalos abertos salvos por `estado()`.
+
+        Deve ser chamado no boot, antes das primeiras amostras; intervalos
+        que venceram enquanto o dispositivo estava parado fecham no próximo
+        `processar`.
+
+        Parâmetros:
+            estado (dict): retorno de `estado()`.
+
+        Retorna:
+            bool: True se o estado foi aplicado.
+        """
+        if not estado or estado.get("versao") != VERSAO_ESTADO:
+            return False
+        with self._lock:
+            for nivel in self._niveis:
+                salvo = estado["niveis"].get(nivel.nome)
+                if not salvo:
+                    continue
+                nivel.inicio = salvo["inicio"]
+                nivel.parcial = salvo["parcial"]
+                for metrica, valores in salvo["agregados"].items():
+                    if metrica in nivel.agregados:
+                        nivel.agregados[metrica].restaurar(valores)
+                nivel.pendentes.extend(salvo["pendentes"])
+            self._cobertura = estado["cobertura"]
+        return True
+
+    def salvar(self):
+        """
+        Grava os intervalos abertos em `caminho_estado` (escrita atômica).
+
+        Chamado depois que os blocos retirados por `pendentes_envio` foram
+        gravados na outbox: todo intervalo está no estado salvo ou na outbox.
+
+        Retorna:
+            bool: True se o arquivo foi gravado.
+        """
+        if not self.caminho_estado:
+            return False
+        estado = self.estado()
+        diretorio = os.path.dirname(os.path.abspath(self.caminho_estado))
+        fd, caminho_tmp = tempfile.mkstemp(
+            prefix=".rollup_", suffix=".tmp", dir=diretorio
+        )
+        try:
+            with os.fdopen(fd, "w") as f:
+                json.dump(estado, f)
+                f.flush()
+                os.fsync(f.fileno())
+            os.replace(caminho_tmp, self.caminho_estado)
+        except BaseException:
+            if os.path.exists(caminho_tmp):
+                os.remove(caminho_tmp)
+            raise
+        return True
+
+    def carregar(self):
+        """
+        Restaura os intervalos abertos de `caminho_estado`, se existir.
+
+        Retorna:
+            bool: True se o estado foi restaurado.
+        """
+        if not self.caminho_estado or not os.path.exists(self.caminho_estado):
+            return False
+        try:
+            with open(self.caminho_estado) as f:
+                return self.restaurar(json.load(f))
+        except (OSError, ValueError, KeyError, TypeError) as e:
+            print(f"⚠️ Erro ao restaurar estado dos rollups: {e}")
+            return False
+
+
+def _liberacao(fim, passo):
+    """Primeiro instante alinhado a `passo` a partir de `fim` (passo 0 → fim)."""
+    if not passo:
+        return fim
+    return math.ceil(fim / passo) * passo
+
+
+# Instância única alimentada pela coleta (mesmas métricas do histórico)
+motor_rollup = MotorRollup(
+    ["Luminosidade", "TemperaturaDoSolo", "Temperatura", "Umidade", "UmidadeDoSolo"],
+    caminho_estado=CAMINHO_ESTADO_ROLLUP,
+)
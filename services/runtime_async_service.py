@@ -0,0 +1,210 @@
+# services/runtime_async_service.py
+"""
+Runtime asyncio opcional da estufa (alternativa às threads de main.py).
+
+Responsabilidades:
+- Um único laço de eventos com tarefas para: amostragem dos sensores (uma
+  por sensor), etapas do ciclo (segurança, ciclo e fase, pelo
+  Agendador.executar_async) e workers da fila de envio.
+- O laço só agenda e espera: nenhum trabalho bloqueante roda nele.
+- Executores limitados, um por tipo de trabalho, para que um não atrase o
+  outro:
+    controle → etapas de segurança e ciclo (GPIO, publicação no
+               barramento) e temporizadores de GPIO (desligar a bomba),
+               uma thread: nunca disputam os atuadores entre si
+    drivers  → leituras bloqueantes dos sensores (I²C, 1-Wire, DHT)
+    rede     → chamadas síncronas de rede (Firestore, Realtime DB,
+               verificação e avanço de fase) e assinantes em fila do
+               barramento (logger, histórico local, rollups)
+- Temporizadores (irrigação da bomba, avanço de fase) viram timers do laço
+  (modules.hal.definir_agendador) em vez de uma thread por chamada.
+- Status dos atuadores pelo cliente assíncrono do Firestore, se a versão do
+  firebase-admin tiver (obter_firestore_async).
+
+Continuam em threads próprias: os listeners do Firestore (on_snapshot do
+SDK) e os reenviadores das outboxes em disco.
+
+Uso (main.py, RUNTIME_ASYNC = True):
+    asyncio.run(executar_estufa_async(ESTUFA_ID, *sensores, *atuadores, 30))
+"""
+
+import asyncio
+import signal
+from concurrent.futures import ThreadPoolExecutor
+
+from config.firebase_config import obter_firestore_async
+from modules import hal
+from services.agendador_service import Agendador
+from services.amostragem_service import iniciar_amostragem, parar_amostragem
+from services.ciclo_service import (
+    PERIODO_FASE,
+    PERIODO_SEGURANCA,
+    EtapasEstufa,
+    agendar_etapas,
+    ciclo_reset_event,
+    registrar_consumidores_ciclo,
+)
+from services.eventos_service import barramento_eventos
+from services.fila_envio_service import fila_envio
+
+# Threads dos executores limitados
+TRABALHADORES_CONTROLE = 1  # etapas de controle e temporizadores de GPIO
+TRABALHADORES_DRIVERS = 2  # leituras de sensores
+TRABALHADORES_REDE = 2  # Firebase síncrono, fase, assinantes em fila
+
+# Tempo máximo para drenar barramento e fila de envio ao encerrar (s)
+TEMPO_ENCERRAMENTO = 5
+
+
+class TemporizadorLaco:
+    """
+    Temporizador do laço asyncio com a interface de threading.Timer
+    (.cancel()), seguro para ser criado e cancelado de qualquer thread.
+    A função roda no executor informado (não bloqueia o laço).
+    """
+
+    def __init__(self, laco, segundos, funcao, executor=None):
+        self._laco = laco
+        self._funcao = funcao
+        self._executor = executor
+        self._handle = None
+        self.cancelado = False
+        laco.call_soon_threadsafe(self._armar, segundos)
+
+    def _armar(self, segundos):
+        if not self.cancelado:
+            self._handle = self._laco.call_later(segundos, self._disparar)
+
+    def _disparar(self):
+        if not self.cancelado:
+            self._laco.run_in_executor(self._executor, self._executar)
+
+    def _executar(self):
+        try:
+            self._funcao()
+        except Exception as e:
+            print(f"⚠️ Erro no temporizador: {e}")
+
+    def cancel(self):
+        self.cancelado = True
+        handle = self._handle
+        if handle is not None:
+            self._laco.call_soon_threadsafe(handle.cancel)
+
+
+async def executar_estufa_async(
+    estufa_id,
+    luminosidade_sensor,
+    temperatura_solo_sensor,
+    temperatura_ar_sensor,
+    umidade_solo_sensor,
+    ventoinha,
+    luminaria,
+    bomba,
+    aquecedor,
+    tempo_ciclo,
+    periodo_seguranca=PERIODO_SEGURANCA,
+    periodo_fase=PERIODO_FASE,
+    intervalos_amostragem=None,
+    parar=None,
+):
+    """
+    Executa a estufa no laço asyncio até `parar` (ou SIGINT/SIGTERM).
+
+    As etapas são as mesmas de ciclo_estufa_agendado; ao encerrar, drena o
+    barramento de eventos (logger) e a fila de envio. Desligar atuadores
+    continua a cargo de quem chamou (main.encerrar).
+
+    Parâmetros:
+        (mesmos de ciclo_estufa_agendado)
+        intervalos_amostragem (dict|None): ver GerenciadorAmostragem.
+        parar (asyncio.Event|None): encerra o runtime.
+
+    Retorna:
+        Agendador: com as estatísticas das etapas.
+    """
+    laco = asyncio.get_running_loop()
+    parar = parar or asyncio.Event()
+    for sinal in (signal.SIGINT, signal.SIGTERM):
+        try:
+            laco.add_signal_handler(sinal, parar.set)
+        except (NotImplementedError, RuntimeError, ValueError):
+            pass  # fora da thread principal / Windows
+
+    controle = ThreadPoolExecutor(TRABALHADORES_CONTROLE, thread_name_prefix="controle")
+    drivers = ThreadPoolExecutor(TRABALHADORES_DRIVERS, thread_name_prefix="driver")
+    rede = ThreadPoolExecutor(TRABALHADORES_REDE, thread_name_prefix="rede")
+    laco.set_default_executor(rede)
+
+    # GPIO (bomba) na thread do controle, nunca atrás de uma leitura lenta de
+    # sensor; prazos de calendário (avanço de fase, com rede) no executor de rede
+    hal.definir_agendador(
+        lambda segundos, funcao: TemporizadorLaco(laco, segundos, funcao, controle),
+        tempo_real=lambda segundos, funcao: TemporizadorLaco(
+            laco, segundos, funcao, rede
+        ),
+    )
+    fila_envio.usar_laco(laco, rede)
+    barramento_eventos.usar_executor(rede)
+
+    despertar = asyncio.Event()
+
+    def acordar():
+        ciclo_reset_event.clear()
+        laco.call_soon_threadsafe(despertar.set)
+
+    ciclo_reset_event.registrar_ouvinte(acordar)
+
+    sensores = (
+        luminosidade_sensor,
+        temperatura_solo_sensor,
+        temperatura_ar_sensor,
+        umidade_solo_sensor,
+    )
+    amostragem = iniciar_amostragem(
+        *sensores, intervalos=intervalos_amostragem, threads=False
+    )
+    registrar_consumidores_ciclo(
+        estufa_id, assincrono=obter_firestore_async() is not None
+    )
+    etapas = EtapasEstufa(estufa_id, sensores, ventoinha, luminaria, bomba, aquecedor)
+
+    agendador = Agendador()
+    agendar_etapas(
+        agendador,
+        etapas,
+        tempo_ciclo,
+        periodo_seguranca,
+        periodo_fase,
+        fase=lambda: laco.run_in_executor(rede, etapas.fase),
+        seguranca=lambda: laco.run_in_executor(controle, etapas.seguranca),
+        ciclo=lambda: laco.run_in_executor(controle, etapas.ciclo),
+    )
+    print(
+        f"⚡ Runtime asyncio: segurança {periodo_seguranca}s, ciclo {tempo_ciclo}s, "
+        f"fase {periodo_fase}s"
+    )
+
+    tarefas = [
+        asyncio.create_task(amostragem.executar_async(drivers)),
+        asyncio.create_task(agendador.executar_async(parar, despertar)),
+    ]
+    try:
+        await parar.wait()
+    finally:
+        for tarefa in tarefas:
+            tarefa.cancel()
+        await asyncio.gather(*tarefas, return_exceptions=True)
+        ciclo_reset_event.remover_ouvinte(acordar)
+        parar_amostragem()
+
+        # logger e demais assinantes em fila terminam no executor de rede
+        await laco.run_in_executor(
+            drivers, barramento_eventos.parar, TEMPO_ENCERRAMENTO
+        )
+        await fila_envio.parar_async(timeout=TEMPO_ENCERRAMENTO)
+        hal.definir_agendador(None)
+        controle.shutdown(wait=False)
+        drivers.shutdown(wait=False)
+
+    return agendador
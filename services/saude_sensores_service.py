@@ -0,0 +1,245 @@
+# services/saude_sensores_service.py
+"""
+Saúde dos sensores: tentativas com backoff e disjuntor (circuit breaker).
+
+Responsabilidades:
+- Política de tentativas por sensor (número de tentativas e espera crescente
+  entre elas), em vez de repetir a leitura em sequência sem pausa.
+- Disjuntor por sensor: após N falhas seguidas o sensor deixa de ser lido
+  por um período de resfriamento; depois disso uma única leitura de teste
+  decide se ele volta (fechado) ou se o resfriamento dobra (aberto).
+- Contadores de saúde: taxa de sucesso, falhas consecutivas e idade da
+  última leitura válida.
+
+Estados do disjuntor:
+    "fechado"     → sensor lido normalmente
+    "aberto"      → sensor ignorado até o fim do resfriamento
+    "meio-aberto" → uma leitura de teste liberada
+"""
+
+import threading
+import time
+
+FECHADO = "fechado"
+ABERTO = "aberto"
+MEIO_ABERTO = "meio-aberto"
+
+
+class PoliticaTentativas:
+    """
+    Tentativas de leitura com espera exponencial entre elas.
+
+    Uso:
+        politica = PoliticaTentativas(tentativas=3, espera_inicial=0.1)
+        for espera in politica.esperas():
+            ...
+    """
+
+    def __init__(self, tentativas=3, espera_inicial=0.1, fator=2.0, espera_maxima=2.0):
+        """
+        Parâmetros:
+            tentativas (int): número máximo de leituras por rodada.
+            espera_inicial (float): pausa antes da 2ª tentativa (s).
+            fator (float): multiplicador da pausa a cada nova tentativa.
+            espera_maxima (float): teto da pausa (s).
+        """
+        self.tentativas = tentativas
+        self.espera_inicial = espera_inicial
+        self.fator = fator
+        self.espera_maxima = espera_maxima
+
+    def esperas(self):
+        """Pausa antes de cada tentativa (a primeira é sempre 0)."""
+        espera = self.espera_inicial
+        for i in range(self.tentativas):
+            if i == 0:
+                yield 0.0
+            else:
+                yield espera
+                espera = min(espera * self.fator, self.espera_maxima)
+
+
+# Políticas por sensor (o DHT22 não converte em menos de 2 s)
+POLITICAS_PADRAO = {
+    "BH1750": PoliticaTentativas(tentativas=3, espera_inicial=0.2),
+    "DS18B20": PoliticaTentativas(tentativas=3, espera_inicial=0.2),
+    "DHT22": PoliticaTentativas(tentativas=2, espera_inicial=2.0),
+    "UmidadeSolo": PoliticaTentativas(tentativas=3, espera_inicial=0.05),
+}
+
+
+class SaudeSensor:
+    """
+    Disjuntor e contadores de saúde de um sensor.
+
+    Uso:
+        saude = SaudeSensor("DHT22")
+        if saude.disponivel():
+            valor = ler()
+            saude.registrar(valor is not None)
+    """
+
+    def __init__(
+        self,
+        nome,
+        politica=None,
+        limite_falhas=3,
+        resfriamento_inicial=30,
+        resfriamento_maximo=600,
+    ):
+        """
+        Parâmetros:
+            nome (str): nome do sensor (logs).
+            politica (PoliticaTentativas|None): tentativas por rodada.
+            limite_falhas (int): falhas consecutivas que abrem o disjuntor.
+            resfriamento_inicial (float): primeiro período sem leituras (s).
+            resfriamento_maximo (float): teto do resfriamento (s).
+        """
+        self.nome = nome
+        self.politica = politica or PoliticaTentativas()
+        self.limite_falhas = limite_falhas
+        self.resfriamento_inicial = resfriamento_inicial
+        self.resfriamento_maximo = resfriamento_maximo
+
+        self._lock = threading.Lock()
+        self.estado = FECHADO
+        self._resfriamento = resfriamento_inicial
+        self._reabrir_em = None
+
+        self.sucessos = 0
+        self.falhas = 0
+        self.falhas_consecutivas = 0
+        self.leituras_evitadas = 0
+        self.aberturas = 0
+        self._ultimo_sucesso = None
+
+    def disponivel(self):
+        """
+        Indica se o sensor pode ser lido agora.
+
+        Com o disjuntor aberto retorna False até o fim do resfriamento; em
+        seguida libera uma única leitura de teste (meio-aberto).
+        """
+        with self._lock:
+            if self.estado == FECHADO:
+                return True
+            if self.estado == ABERTO and time.monotonic() >= self._reabrir_em:
+                self.estado = MEIO_ABERTO
+                return True
+            self.leituras_evitadas += 1
+            return False
+
+    def registrar(self, sucesso):
+        """
+        Registra o resultado de uma rodada de leitura.
+
+        Parâmetros:
+            sucesso (bool): True se a rodada produziu um valor válido.
+        """
+        with self._lock:
+            if sucesso:
+                if self.estado != FECHADO:
+                    print(f"🔌 Sensor {self.nome} voltou a responder.")
+                self.sucessos += 1
+                self.falhas_consecutivas = 0
+                self._ultimo_sucesso = time.monotonic()
+                self.estado = FECHADO
+                self._resfriamento = self.resfriamento_inicial
+                return
+
+            self.falhas += 1
+            self.falhas_consecutivas += 1
+            if self.estado == MEIO_ABERTO:
+                # Leitura de teste falhou → resfriamento dobra
+                self._resfriamento = min(
+                    self._resfriamento * 2, self.resfriamento_maximo
+                )
+                self._abrir()
+            elif (
+                self.estado == FECHADO
+                and self.falhas_consecutivas >= self.limite_falhas
+            ):
+                self._abrir()
+
+    def _abrir(self):
+        """Abre o disjuntor (chamado com lock)."""
+        self.estado = ABERTO
+        self._reabrir_em = time.monotonic() + self._resfriamento
+        self.aberturas += 1
+        print(
+            f"🔌 Sensor {self.nome} suspenso por {self._resfriamento:.0f}s "
+            f"após {self.falhas_consecutivas} falha(s) seguida(s)."
+        )
+
+    def estatisticas(self):
+        """
+        Retorna os contadores de saúde.
+
+        Retorna:
+            dict: estado, taxa_sucesso, falhas_consecutivas, idade_ultimo_sucesso
+                  (s), sucessos, falhas, leituras_evitadas, aberturas.
+        """
+        with self._lock:
+            total = self.sucessos + self.falhas
+            return {
+                "estado": self.estado,
+                "taxa_sucesso": self.sucessos / total if total else None,
+                "falhas_consecutivas": self.falhas_consecutivas,
+                "idade_ultimo_sucesso": (
+                    round(time.monotonic() - self._ultimo_sucesso, 1)
+                    if self._ultimo_sucesso is not None
+                    else None
+                ),
+                "sucessos": self.sucessos,
+                "falhas": self.falhas,
+                "leituras_evitadas": self.leituras_evitadas,
+                "aberturas": self.aberturas,
+            }
+
+
+class MonitorSaude:
+    """
+    Registro da saúde de todos os sensores (um SaudeSensor por nome).
+
+    Uso:
+        saude = monitor_saude.obter("DHT22")
+        print(monitor_saude.estatisticas())
+    """
+
+    def __init__(self, politicas=None):
+        """
+        Parâmetros:
+            politicas (dict|None): nome → PoliticaTentativas (default = POLITICAS_PADRAO).
+        """
+        self.politicas = POLITICAS_PADRAO if politicas is None else politicas
+        self._lock = threading.Lock()
+        self._sensores = {}
+
+    def obter(self, nome):
+        """Retorna (criando se preciso) a saúde do sensor `nome`."""
+        with self._lock:
+            saude = self._sensores.get(nome)
+            if saude is None:
+                saude = SaudeSensor(nome, self.politicas.get(nome))
+                self._sensores[nome] = saude
+            return saude
+
+    def estatisticas(self):
+        """Retorna nome → contadores de saúde de cada sensor."""
+        with self._lock:
+            sensores = dict(self._sensores)
+        return {nome: saude.estatisticas() for nome, saude in sensores.items()}
+
+    def suspensos(self):
+        """Nomes dos sensores com o disjuntor aberto ou em teste (meio-aberto)."""
+        with self._lock:
+            sensores = dict(self._sensores)
+        return [
+            nome
+            for nome, saude in sensores.items()
+            if saude.estado in (ABERTO, MEIO_ABERTO)
+        ]
+
+
+# Instância única usada pelo backend
+monitor_saude = MonitorSaude()
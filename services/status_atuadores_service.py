@@ -0,0 +1,173 @@
+# services/status_atuadores_service.py
+"""
+Publicação do status dos atuadores no Firestore apenas em transições.
+
+Responsabilidades:
+- Lembrar o último (Estado, categoria do Motivo) publicado de cada atuador.
+- Enviar somente atuadores que mudaram de estado ou de categoria de motivo.
+- Reenviar periodicamente (heartbeat) para que o app não veja status parado.
+- Agrupar todos os atuadores alterados em um único commit (batch).
+
+Categoria do motivo:
+    Motivos costumam trazer a leitura ao vivo ("25.3°C < desejada (24°C)"),
+    então os números são normalizados antes da comparação:
+        "25.3°C < desejada (24°C)" → "#°C < desejada (#°C)"
+"""
+
+import re
+import threading
+import time
+
+from config.firebase_config import (
+    atualizar_status_atuadores,
+    atualizar_status_atuadores_async,
+)
+
+_NUMERO = re.compile(r"[-+]?\d+(?:[.,]\d+)?")
+
+
+def categoria_motivo(motivo):
+    """
+    Remove os valores numéricos do motivo, mantendo apenas sua categoria.
+
+    Parâmetros:
+        motivo (str|None): motivo retornado pelo `controlar` do atuador.
+
+    Retorna:
+        str | None: motivo com números substituídos por "#".
+    """
+    if motivo is None:
+        return None
+    return _NUMERO.sub("#", str(motivo))
+
+
+class PublicadorStatusAtuadores:
+    """
+    Filtra e publica o status dos atuadores.
+
+    Uso:
+        publicador = PublicadorStatusAtuadores("EG001")
+        publicador.publicar(status_atuadores)
+        print(publicador.estatisticas())
+    """
+
+    def __init__(
+        self,
+        estufa_id,
+        intervalo_maximo=3600,
+        enviar=atualizar_status_atuadores,
+        enviar_async=atualizar_status_atuadores_async,
+    ):
+        """
+        Parâmetros:
+            estufa_id (str): Identificador único da estufa.
+            intervalo_maximo (float): heartbeat — tempo máximo (s) sem republicar
+                um atuador, mesmo sem mudanças.
+            enviar (callable): função (estufa_id, status_dict) → bool que grava
+                todos os atuadores em um commit.
+            enviar_async (callable): versão corrotina de `enviar`
+                (publicar_async).
+        """
+        self.estufa_id = estufa_id
+        self.intervalo_maximo = intervalo_maximo
+        self.enviar = enviar
+        self.enviar_async = enviar_async
+
+        self._lock = threading.Lock()
+        # nome → (estado, categoria, instante da publicação)
+        self._publicados = {}
+
+        self.commits = 0
+        self.enviados = 0
+        self.suprimidos = 0
+        self.falhas = 0
+
+    def selecionar(self, status_atuadores):
+        """
+        Retorna apenas os atuadores que precisam ser publicados.
+
+        Parâmetros:
+            status_atuadores (dict): nome → (ligado, motivo).
+
+        Retorna:
+            dict: subconjunto de `status_atuadores` com transições ou heartbeat.
+        """
+        agora = time.monotonic()
+        selecionados = {}
+        with self._lock:
+            for nome, (ligado, motivo) in status_atuadores.items():
+                anterior = self._publicados.get(nome)
+                if (
+                    anterior is None
+                    or anterior[0] != ligado
+                    or anterior[1] != categoria_motivo(motivo)
+                    or agora - anterior[2] >= self.intervalo_maximo
+                ):
+                    selecionados[nome] = (ligado, motivo)
+                else:
+                    self.suprimidos += 1
+        return selecionados
+
+    def confirmar(self, status_enviados):
+        """
+        Registra atuadores efetivamente gravados no Firestore.
+
+        Parâmetros:
+            status_enviados (dict): nome → (ligado, motivo) gravados.
+        """
+        agora = time.monotonic()
+        with self._lock:
+            for nome, (ligado, motivo) in status_enviados.items():
+                self._publicados[nome] = (ligado, categoria_motivo(motivo), agora)
+
+    def publicar(self, status_atuadores):
+        """
+        Seleciona as transições e grava todas em um único commit.
+
+        Parâmetros:
+            status_atuadores (dict): nome → (ligado, motivo).
+
+        Retorna:
+            bool: True se nada precisava ser enviado ou o envio deu certo.
+        """
+        selecionados = self.selecionar(status_atuadores or {})
+        if not selecionados:
+            return True
+
+        return self._registrar_envio(
+            selecionados, self.enviar(self.estufa_id, selecionados)
+        )
+
+    async def publicar_async(self, status_atuadores):
+        """Como `publicar`, com `enviar_async` (runtime asyncio)."""
+        selecionados = self.selecionar(status_atuadores or {})
+        if not selecionados:
+            return True
+
+        return self._registrar_envio(
+            selecionados, await self.enviar_async(self.estufa_id, selecionados)
+        )
+
+    def _registrar_envio(self, selecionados, sucesso):
+        if not sucesso:
+            self.falhas += 1
+            return False
+
+        self.confirmar(selecionados)
+        self.commits += 1
+        self.enviados += len(selecionados)
+        return True
+
+    def estatisticas(self):
+        """
+        Retorna contadores de publicação.
+
+        Retorna:
+            dict: commits, atuadores enviados, suprimidos e falhas.
+        """
+        return {
+            "commits": self.commits,
+            "enviados": self.enviados,
+            "suprimidos": self.suprimidos,
+            "falhas": self.falhas,
+        }
@@ -0,0 +1,150 @@
+# testes/benchmark_serie_temporal.py
+"""
+Benchmark do histórico local (utils.serie_temporal) para dimensionar o
+cartão SD.
+
+Grava N dias de amostras sintéticas no ritmo da coleta (lotes por ciclo),
+com compactação e retenção automáticas no relógio simulado, e mede:
+- tamanho em disco, bytes por ponto e estimativa para 1 ano;
+- vazão de gravação;
+- latência das consultas reduzidas (agregado e LTTB).
+
+Não usa Firebase nem hardware; o banco fica em um diretório temporário.
+
+Uso:
+    python -m testes.benchmark_serie_temporal --dias 7 --intervalo 5
+"""
+
+import argparse
+import math
+import os
+import random
+import tempfile
+import time
+
+from utils.serie_temporal import COMPACTAR_APOS_PADRAO, SerieTemporal
+
+# Métricas da coleta: (nome, média, amplitude diária, ruído)
+METRICAS = (
+    ("Luminosidade", 8000.0, 8000.0, 50.0),
+    ("Temperatura", 22.0, 4.0, 0.1),
+    ("Umidade", 65.0, 10.0, 0.3),
+    ("TemperaturaDoSolo", 21.0, 2.0, 0.05),
+    ("UmidadeDoSolo", 55.0, 5.0, 0.3),
+)
+
+
+def _tempo_consulta(funcao, repeticoes=5):
+    """Mediana do tempo de `funcao()` em ms."""
+    tempos = []
+    for _ in range(repeticoes):
+        t0 = time.perf_counter()
+        funcao()
+        tempos.append((time.perf_counter() - t0) * 1000)
+    return round(sorted(tempos)[len(tempos) // 2], 2)
+
+
+def executar(dias=7, intervalo=5, ciclo=30, semente=1):
+    """
+    Roda o benchmark e retorna as métricas.
+
+    Parâmetros:
+        dias (float): período simulado.
+        intervalo (float): intervalo entre amostras de cada métrica (s).
+        ciclo (float): intervalo entre gravações em lote (s).
+        semente (int): semente do ruído.
+
+    Retorna:
+        dict: métricas da execução.
+    """
+    aleatorio = random.Random(semente)
+    inicio = 1_750_000_000.0
+    relogio = [inicio]
+
+    with tempfile.TemporaryDirectory() as diretorio:
+        caminho = os.path.join(diretorio, "series.db")
+        serie = SerieTemporal(caminho, relogio=lambda: relogio[0])
+
+        total = 0
+        t = inicio
+        fim = inicio + dias * 86400
+        t0 = time.perf_counter()
+        while t < fim:
+            lote = []
+            limite = min(t + ciclo, fim)
+            while t < limite:
+                fase = 2 * math.pi * ((t % 86400) / 86400)
+                for nome, media, amplitude, ruido in METRICAS:
+                    valor = (
+                        media + amplitude * math.sin(fase) + aleatorio.gauss(0, ruido)
+                    )
+                    lote.append((nome, t, round(valor, 2)))
+                t += intervalo
+            relogio[0] = t
+            total += serie.gravar(lote)
+        duracao_gravacao = time.perf_counter() - t0
+
+        serie.manter()
+        tamanho = serie.tamanho_em_disco()
+        tabelas = serie.tamanho_tabelas()
+        contagem = serie.contagem()
+
+        agora = relogio[0]
+        consultas = {
+            "6h_agregado_300": _tempo_consulta(
+                lambda: serie.consultar("Temperatura", agora - 6 * 3600, agora, 300)
+            ),
+            f"{dias:g}d_agregado_500": _tempo_consulta(
+                lambda: serie.consultar("Temperatura", inicio, agora, 500)
+            ),
+            "1h_agregado_60": _tempo_consulta(
+                lambda: serie.consultar("Temperatura", agora - 3600, agora, 60)
+            ),
+            f"{dias:g}d_lttb_500": _tempo_consulta(
+                lambda: serie.consultar(
+                    "Temperatura", inicio, agora, 500, metodo="lttb"
+                ),
+                repeticoes=1,
+            ),
+        }
+        pontos_periodo = len(serie.pontos("Temperatura", inicio, agora))
+        serie.fechar()
+
+    # Estimativa de 1 ano: as amostras brutas ficam limitadas a
+    # `compactar_apos` (custo fixo); o restante é pago em segmentos
+    pontos_ano = len(METRICAS) * 365 * 86400 / intervalo
+    por_ponto_compactado = tabelas.get("segmentos", 0) / max(
+        1, contagem["pontos_compactados"]
+    )
+    por_ponto_bruto = tabelas.get("amostras", 0) / max(1, contagem["brutas"])
+    brutas_fixas = len(METRICAS) * COMPACTAR_APOS_PADRAO / intervalo
+    estimativa_ano = (
+        brutas_fixas * por_ponto_bruto
+        + max(0, pontos_ano - brutas_fixas) * por_ponto_compactado
+    )
+    return {
+        "pontos": total,
+        "pontos_por_metrica_consultados": pontos_periodo,
+        "gravacao_s": round(duracao_gravacao, 2),
+        "pontos_por_s": round(total / duracao_gravacao),
+        "contagem": contagem,
+        "tamanho_mb": round(tamanho / 1e6, 2),
+        "bytes_por_ponto_bruto": round(por_ponto_bruto, 2),
+        "bytes_por_ponto_compactado": round(por_ponto_compactado, 2),
+        "estimativa_1_ano_mb": round(estimativa_ano / 1e6, 1),
+        "consultas_ms": consultas,
+    }
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Benchmark do histórico local")
+    parser.add_argument("--dias", type=float, default=7)
+    parser.add_argument("--intervalo", type=float, default=5)
+    parser.add_argument("--ciclo", type=float, default=30)
+    parser.add_argument("--semente", type=int, default=1)
+    args = parser.parse_args()
+
+    metricas = executar(args.dias, args.intervalo, args.ciclo, args.semente)
+    print(f"\n{'='*20} 💾 Benchmark do histórico local {'='*20}\n")
+    for chave, valor in metricas.items():
+        print(f"   • {chave}: {valor}")
@@ -0,0 +1,175 @@
+# testes/benchmark_simulado.py
+"""
+Benchmark do controle da estufa sobre o backend simulado (modules.hal).
+
+Executa coleta → filtros → controle dos atuadores em ciclos sobre a estufa
+virtual, com o relógio simulado avançando o mais rápido possível, e mede:
+- desempenho: ciclos/s, aceleração sobre o tempo real, latência por ciclo;
+- controle: tempo na faixa do preset, transições dos relés, irrigações;
+- qualidade das leituras: rejeições dos filtros e saúde dos sensores.
+
+Não usa Firebase nem hardware.
+
+Uso:
+    python -m testes.benchmark_simulado --horas 72 --ciclo 30 --semente 1
+"""
+
+import argparse
+import contextlib
+import io
+import time
+
+from modules import hal
+from modules.hal.simulado import PINOS_PADRAO
+
+# Preset de exemplo (mesmas chaves da configuração ativa)
+CONFIG_EXEMPLO = {
+    "PlantaAtual": "Alface",
+    "FaseAtual": "Crescimento",
+    "EstadoSistema": True,
+    "TemperaturaMin": 18,
+    "TemperaturaMax": 26,
+    "UmidadeMax": 85,
+    "UmidadeDoSoloMin": 40,
+    "UmidadeDoSoloMax": 70,
+    "Fotoperiodo": 14,
+}
+
+
+def _percentil(valores, fracao):
+    ordenados = sorted(valores)
+    if not ordenados:
+        return None
+    return ordenados[min(len(ordenados) - 1, int(len(ordenados) * fracao))]
+
+
+def executar(horas=24, ciclo=30, semente=1, config=None, verboso=False):
+    """
+    Roda a simulação e retorna as métricas.
+
+    Parâmetros:
+        horas (float): duração simulada.
+        ciclo (float): intervalo simulado entre ciclos (s).
+        semente (int): semente do ruído/falhas dos sensores.
+        config (dict|None): configuração ativa (default = CONFIG_EXEMPLO).
+        verboso (bool): mostra as mensagens dos serviços.
+
+    Retorna:
+        dict: métricas da execução.
+    """
+    config = CONFIG_EXEMPLO if config is None else config
+    backend = hal.definir_backend("simulado", velocidade=None, semente=semente)
+
+    # Imports depois do backend: nada aqui toca hardware real
+    from modules.atuadores.aquecedor import Aquecedor
+    from modules.atuadores.bomba import Bomba
+    from modules.atuadores.luminaria import Luminaria
+    from modules.atuadores.ventoinha import Ventoinha
+    from services.coleta_service import coletar_dados
+    from services.controle_service import controlar_atuadores
+    from services.filtro_service import filtro_metricas
+    from services.historico_local_service import configurar_historico_local
+    from services.saude_sensores_service import (
+        POLITICAS_PADRAO,
+        PoliticaTentativas,
+        monitor_saude,
+    )
+
+    # Histórico local em memória (não grava o banco de series.db)
+    configurar_historico_local(":memory:")
+
+    # No tempo simulado não há conversão a esperar entre tentativas
+    monitor_saude.politicas = {
+        nome: PoliticaTentativas(politica.tentativas, espera_inicial=0.0)
+        for nome, politica in POLITICAS_PADRAO.items()
+    }
+
+    sensores = hal.criar_sensores()
+    ventoinha, luminaria, bomba, aquecedor = (
+        Ventoinha(),
+        Luminaria(),
+        Bomba(),
+        Aquecedor(),
+    )
+    transicoes_iniciais = dict(backend.gpio.transicoes)
+
+    total_ciclos = int(horas * 3600 / ciclo)
+    latencias = []
+    temperatura_na_faixa = 0
+    solo_na_faixa = 0
+
+    saida = None if verboso else io.StringIO()
+    inicio = time.perf_counter()
+    with contextlib.redirect_stdout(saida) if saida else contextlib.nullcontext():
+        for _ in range(total_ciclos):
+            t0 = time.perf_counter()
+            dados = coletar_dados(*sensores) or {}
+            controlar_atuadores(
+                ventoinha,
+                luminaria,
+                bomba,
+                aquecedor,
+                dados.get("TemperaturaDoArAtual"),
+                dados.get("UmidadeDoArAtual"),
+                dados.get("UmidadeDoSoloAtual"),
+                config,
+            )
+            latencias.append(time.perf_counter() - t0)
+
+            backend.relogio.avancar(ciclo)
+            estado = backend.modelo.estado()
+            if (
+                config["TemperaturaMin"]
+                <= estado["TemperaturaDoAr"]
+                <= config["TemperaturaMax"]
+            ):
+                temperatura_na_faixa += 1
+            if (
+                config["UmidadeDoSoloMin"]
+                <= estado["UmidadeDoSolo"]
+                <= config["UmidadeDoSoloMax"]
+            ):
+                solo_na_faixa += 1
+    duracao = time.perf_counter() - inicio
+
+    transicoes = {
+        atuador: backend.gpio.transicoes.get(pino, 0) - transicoes_iniciais.get(pino, 0)
+        for atuador, pino in PINOS_PADRAO.items()
+    }
+    irrigacoes = transicoes["bomba"] // 2
+    return {
+        "ciclos": total_ciclos,
+        "duracao_s": round(duracao, 3),
+        "ciclos_por_s": round(total_ciclos / duracao, 1) if duracao else None,
+        "aceleracao": round(total_ciclos * ciclo / duracao) if duracao else None,
+        "latencia_media_ms": round(sum(latencias) / len(latencias) * 1000, 3),
+        "latencia_p95_ms": round(_percentil(latencias, 0.95) * 1000, 3),
+        "temperatura_na_faixa": round(temperatura_na_faixa / total_ciclos, 3),
+        "solo_na_faixa": round(solo_na_faixa / total_ciclos, 3),
+        "transicoes": transicoes,
+        "irrigacoes": irrigacoes,
+        "agua_bombeada_ml": round(backend.modelo.agua_bombeada),
+        "agua_por_irrigacao_ml": (
+            round(backend.modelo.agua_bombeada / irrigacoes, 1) if irrigacoes else None
+        ),
+        "estado_final": {k: round(v, 2) for k, v in backend.modelo.estado().items()},
+        "filtros": filtro_metricas.estatisticas(),
+        "saude": {
+            nome: {k: s[k] for k in ("taxa_sucesso", "aberturas")}
+            for nome, s in monitor_saude.estatisticas().items()
+        },
+    }
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Benchmark da estufa simulada")
+    parser.add_argument("--horas", type=float, default=24)
+    parser.add_argument("--ciclo", type=float, default=30)
+    parser.add_argument("--semente", type=int, default=1)
+    parser.add_argument("--verboso", action="store_true")
+    args = parser.parse_args()
+
+    metricas = executar(args.horas, args.ciclo, args.semente, verboso=args.verboso)
+    print(f"\n{'='*20} 🧪 Benchmark da estufa simulada {'='*20}\n")
+    for chave, valor in metricas.items():
+        print(f"   • {chave}: {valor}")
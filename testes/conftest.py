@@ -0,0 +1,54 @@
+# testes/conftest.py
+"""
+config.firebase_config inicializa o Firebase com credenciais reais ao ser
+importado; os testes usam um módulo no lugar dele, em que o cliente global
+e as gravações na nuvem falham se forem usados.
+
+Sem python-dateutil instalado, `dateutil.parser.isoparse` (fases_service,
+utils.display) vira `datetime.fromisoformat`, para que os testes do ciclo
+rodem em vez de serem pulados.
+"""
+
+import sys
+import types
+from datetime import datetime
+
+
+class _ClienteProibido:
+    """Cliente global: qualquer uso indica leitura fora do `db` injetado."""
+
+    def __getattr__(self, nome):
+        raise AssertionError(f"firestore_db global usado ({nome})")
+
+
+def _rede_proibida(nome):
+    def funcao(*args, **kwargs):
+        raise AssertionError(f"{nome} chamado no teste")
+
+    funcao.__name__ = nome
+    return funcao
+
+
+if "config.firebase_config" not in sys.modules:
+    _firebase_config = types.ModuleType("config.firebase_config")
+    _firebase_config.firestore_db = _ClienteProibido()
+    _firebase_config.CHAVE_ESTATISTICAS_HISTORICO = "Estatisticas"
+    for _nome in (
+        "atualizar_status_atuadores",
+        "atualizar_status_atuadores_async",
+        "enviar_dados_firestore",
+        "enviar_dados_realtime",
+        "enviar_resumos_firestore",
+        "obter_firestore_async",
+    ):
+        setattr(_firebase_config, _nome, _rede_proibida(_nome))
+    sys.modules["config.firebase_config"] = _firebase_config
+
+try:
+    import dateutil.parser  # noqa: F401
+except ImportError:
+    _dateutil = types.ModuleType("dateutil")
+    _dateutil.parser = types.ModuleType("dateutil.parser")
+    _dateutil.parser.isoparse = datetime.fromisoformat
+    sys.modules["dateutil"] = _dateutil
+    sys.modules["dateutil.parser"] = _dateutil.parser
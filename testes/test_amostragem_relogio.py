@@ -0,0 +1,53 @@
+# testes/test_amostragem_relogio.py
+"""
+Regressão do relógio da amostragem contínua: as amostras levam o instante
+do backend (hal.tempo), o mesmo que fecha os intervalos do MotorRollup, então
+no backend simulado nenhuma amostra chega atrasada e os blocos saem cheios.
+
+Uso:
+    python -m pytest -q testes/test_amostragem_relogio.py
+"""
+
+import pytest
+
+from modules import hal
+from services.amostragem_service import Amostrador
+from services.rollup_service import MotorRollup
+
+INICIO = 20000 * 86400.0  # meia-noite UTC
+METRICAS = {"TemperaturaDoArAtual": "Temperatura", "UmidadeDoArAtual": "Umidade"}
+
+
+@pytest.fixture(autouse=True)
+def _restaurar_backend(monkeypatch):
+    monkeypatch.setattr(hal, "_backend", hal._backend)
+
+
+@pytest.fixture
+def backend():
+    return hal.definir_backend("simulado", velocidade=None, inicio=INICIO, semente=1)
+
+
+def test_amostras_do_simulado_chegam_ao_rollup(backend):
+    _, _, dht, _ = backend.criar_sensores(taxa_falhas_dht=0.0, taxa_picos=0.0)
+    amostrador = Amostrador("DHT22", dht.ler_dados, tuple(METRICAS), 60, 2)
+    motor = MotorRollup(list(METRICAS.values()))
+    consumidos = dict.fromkeys(METRICAS, 0)
+
+    for _ in range(31):  # uma leitura por minuto simulado
+        amostrador._amostrar()
+        for chave, metrica in METRICAS.items():
+            novos, consumidos[chave] = amostrador.buffers[chave].amostras_desde(
+                consumidos[chave]
+            )
+            for valor, instante in novos:
+                motor.adicionar(metrica, valor, instante)
+        motor.processar()
+        backend.relogio.avancar(60)
+
+    blocos = [b for b in motor.pendentes_envio() if b["resolucao"] == "15min"]
+
+    assert motor.descartadas == 0
+    assert [b["inicio"] for b in blocos] == [INICIO, INICIO + 15 * 60]
+    assert all(b["metricas"]["Temperatura"]["amostras"] == 15 for b in blocos)
+    assert all(b["metricas"]["Umidade"]["amostras"] == 15 for b in blocos)
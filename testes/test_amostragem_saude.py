@@ -0,0 +1,125 @@
+# testes/test_amostragem_saude.py
+"""
+Regressão do disjuntor no amostrador contínuo: a leitura de teste
+(meio-aberto) decide sozinha, e um sensor que falha no teste volta a ser
+lido quando se recupera.
+
+Uso:
+    python -m pytest -q testes/test_amostragem_saude.py
+"""
+
+import pytest
+
+from services import saude_sensores_service
+from services.amostragem_service import Amostrador
+from services.saude_sensores_service import (
+    ABERTO,
+    FECHADO,
+    MEIO_ABERTO,
+    MonitorSaude,
+    PoliticaTentativas,
+)
+
+TENTATIVAS = 2
+LIMITE_FALHAS = 3  # default do SaudeSensor
+RESFRIAMENTO = 30  # default do SaudeSensor (s)
+
+
+class RelogioFalso:
+    """Substitui o módulo `time` do serviço de saúde (só monotonic)."""
+
+    def __init__(self):
+        self.agora = 1000.0
+
+    def monotonic(self):
+        return self.agora
+
+
+class SensorFalso:
+    def __init__(self):
+        self.falhando = True
+
+    def ler(self):
+        return None if self.falhando else 21.5
+
+
+@pytest.fixture
+def relogio(monkeypatch):
+    relogio = RelogioFalso()
+    monkeypatch.setattr(saude_sensores_service, "time", relogio)
+    return relogio
+
+
+@pytest.fixture
+def monitor():
+    return MonitorSaude({"Falso": PoliticaTentativas(tentativas=TENTATIVAS)})
+
+
+@pytest.fixture
+def sensor():
+    return SensorFalso()
+
+
+@pytest.fixture
+def amostrador(monitor, sensor):
+    return Amostrador(
+        "Falso", sensor.ler, ("Temperatura",), 1.0, saude=monitor.obter("Falso")
+    )
+
+
+def tique(amostrador):
+    """Um passo do laço de `Amostrador._executar`."""
+    if amostrador.saude.disponivel():
+        amostrador._amostrar()
+
+
+def abrir_disjuntor(amostrador):
+    for _ in range(TENTATIVAS * LIMITE_FALHAS):
+        tique(amostrador)
+    assert amostrador.saude.estado == ABERTO
+
+
+def test_meio_aberto_conta_como_suspenso(relogio, monitor, amostrador):
+    abrir_disjuntor(amostrador)
+    assert monitor.suspensos() == ["Falso"]
+
+    relogio.agora += RESFRIAMENTO
+    assert amostrador.saude.disponivel()
+    assert amostrador.saude.estado == MEIO_ABERTO
+    assert monitor.suspensos() == ["Falso"]
+
+
+def test_leitura_de_teste_falha_reabre_com_resfriamento_dobrado(relogio, amostrador):
+    abrir_disjuntor(amostrador)
+
+    relogio.agora += RESFRIAMENTO
+    tique(amostrador)  # leitura de teste (única) falha
+
+    assert amostrador.saude.estado == ABERTO
+    assert amostrador.saude.aberturas == 2
+
+    relogio.agora += 2 * RESFRIAMENTO - 1
+    assert not amostrador.saude.disponivel()
+    relogio.agora += 1
+    assert amostrador.saude.disponivel()
+
+
+def test_leitura_de_teste_falha_e_sensor_se_recupera(
+    relogio, monitor, sensor, amostrador
+):
+    abrir_disjuntor(amostrador)
+    relogio.agora += RESFRIAMENTO
+    tique(amostrador)
+    assert amostrador.saude.estado == ABERTO
+
+    sensor.falhando = False
+    relogio.agora += 2 * RESFRIAMENTO
+    tique(amostrador)
+
+    assert amostrador.saude.estado == FECHADO
+    assert amostrador.leituras == 1
+    assert monitor.suspensos() == []
+
+    tique(amostrador)
+    assert amostrador.leituras == 2
+    assert amostrador.buffers["Temperatura"].ultimo()[0] == 21.5
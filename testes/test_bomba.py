@@ -0,0 +1,82 @@
+# testes/test_bomba.py
+"""
+Regressão da dose de irrigação no backend simulado: o controle não pode
+interromper uma irrigação em andamento (tempo de reação, ciclo adiantado
+por mudança de configuração), então cada irrigação entrega o volume
+configurado.
+
+Uso:
+    python -m pytest -q testes/test_bomba.py
+"""
+
+import pytest
+
+from modules import hal
+from testes import benchmark_simulado
+
+CONFIG = dict(benchmark_simulado.CONFIG_EXEMPLO)
+SOLO_SECO = 30.0  # % < UmidadeDoSoloMin
+
+
+@pytest.fixture(autouse=True)
+def _restaurar_backend(monkeypatch):
+    monkeypatch.setattr(hal, "_backend", hal._backend)
+
+
+@pytest.fixture
+def backend():
+    return hal.definir_backend("simulado", velocidade=None, semente=1)
+
+
+@pytest.fixture
+def bomba(backend):
+    from modules.atuadores.bomba import Bomba
+
+    return Bomba()
+
+
+def test_controle_durante_a_irrigacao_nao_corta_a_dose(backend, bomba):
+    ligada, _ = bomba.controlar(SOLO_SECO, CONFIG)
+    assert ligada
+
+    duracao = bomba._calcular_tempo_irrigacao()
+    decorrido = 0
+    while decorrido + 30 < duracao:
+        backend.relogio.avancar(30)
+        decorrido += 30
+        ligada, motivo = bomba.controlar(SOLO_SECO, CONFIG)
+        assert ligada and bomba.is_irrigando, motivo
+
+    backend.relogio.avancar(30)
+    assert not bomba.is_irrigando
+    assert backend.modelo.agua_bombeada == pytest.approx(
+        bomba.VOLUME_POR_IRRIGACAO, abs=0.5
+    )
+
+    ligada, motivo = bomba.controlar(SOLO_SECO, CONFIG)
+    assert not ligada and motivo.startswith("Aguardando reação")
+
+
+def test_ciclo_adiantado_nao_corta_a_dose(backend, bomba):
+    bomba.controlar(SOLO_SECO, CONFIG)
+    backend.relogio.avancar(5)
+
+    # ciclo extra logo após a irrigação (ex.: ciclo_reset_event)
+    ligada, _ = bomba.controlar(SOLO_SECO, CONFIG)
+    assert ligada
+
+    backend.relogio.avancar(bomba._calcular_tempo_irrigacao())
+    assert backend.modelo.agua_bombeada == pytest.approx(
+        bomba.VOLUME_POR_IRRIGACAO, abs=0.5
+    )
+
+
+def test_benchmark_entrega_o_volume_por_irrigacao():
+    metricas = benchmark_simulado.executar(horas=24, ciclo=30, semente=1)
+
+    from modules.atuadores.bomba import Bomba
+
+    assert metricas["irrigacoes"] > 0
+    assert metricas["agua_por_irrigacao_ml"] == pytest.approx(
+        Bomba.VOLUME_POR_IRRIGACAO, abs=1
+    )
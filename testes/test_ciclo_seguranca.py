@@ -0,0 +1,119 @@
+# testes/test_ciclo_seguranca.py
+"""
+Regressão da etapa de segurança do ciclo agendado: mudanças do controle
+térmico entre ciclos saem como DecisaoSeguranca (só com aquecedor e
+ventoinha), a que apenas o status dos atuadores reage; logger e envios
+periódicos continuam recebendo só os ciclos (DecisaoAtuadores).
+
+Uso:
+    python -m pytest -q testes/test_ciclo_seguranca.py
+"""
+
+import pytest
+
+from services import ciclo_service
+from services.eventos_service import (
+    SINCRONO,
+    BarramentoEventos,
+    DecisaoAtuadores,
+    DecisaoSeguranca,
+)
+
+CONFIG = {"EstadoSistema": True}
+DADOS = {"TemperaturaDoArAtual": 18.0, "UmidadeDoArAtual": 70.0, "timestamp": 1.0}
+
+
+class FilaFalsa:
+    def __init__(self):
+        self.enfileirados = []
+
+    def enfileirar(self, destino, chave, funcao, *args, mesclar=None):
+        self.enfileirados.append((chave, args, mesclar))
+        return True
+
+    def profundidade(self):
+        return 0
+
+
+@pytest.fixture
+def barramento(monkeypatch):
+    barramento = BarramentoEventos()
+    monkeypatch.setattr(ciclo_service, "barramento_eventos", barramento)
+    return barramento
+
+
+@pytest.fixture
+def fila(monkeypatch):
+    fila = FilaFalsa()
+    monkeypatch.setattr(ciclo_service, "fila_envio", fila)
+    return fila
+
+
+@pytest.fixture
+def aquecedor():
+    return {"ligado": True}
+
+
+@pytest.fixture
+def etapas(monkeypatch, aquecedor):
+    monkeypatch.setattr(ciclo_service, "obter_configuracao", lambda _: CONFIG)
+    monkeypatch.setattr(ciclo_service, "coletar_dados", lambda *a, **k: dict(DADOS))
+    monkeypatch.setattr(
+        ciclo_service,
+        "controlar_seguranca",
+        lambda *a: {
+            "aquecedor": (aquecedor["ligado"], "motivo"),
+            "ventoinha": (False, "motivo"),
+        },
+    )
+    monkeypatch.setattr(
+        ciclo_service,
+        "controlar_irrigacao_iluminacao",
+        lambda *a: {"luminaria": (True, "motivo"), "bomba": (False, "motivo")},
+    )
+    return ciclo_service.EtapasEstufa("EG001", (None,) * 4, *(None,) * 4)
+
+
+def test_seguranca_publica_decisao_propria(barramento, etapas, aquecedor):
+    ciclos, seguranca = [], []
+    barramento.assinar(DecisaoAtuadores, ciclos.append, modo=SINCRONO)
+    barramento.assinar(DecisaoSeguranca, seguranca.append, modo=SINCRONO)
+
+    etapas.ciclo()
+    aquecedor["ligado"] = False
+    etapas.seguranca()
+    etapas.seguranca()  # sem mudança → nada publicado
+
+    assert len(ciclos) == 1
+    assert len(seguranca) == 1
+    assert set(seguranca[0].atuadores) == {"aquecedor", "ventoinha"}
+    assert seguranca[0].atuadores["aquecedor"][0] is False
+
+
+def test_so_o_status_reage_a_decisao_de_seguranca(barramento, fila, monkeypatch):
+    periodicos = []
+    monkeypatch.setattr(
+        ciclo_service,
+        "enviar_dados_periodicamente",
+        lambda *a, **k: periodicos.append(a),
+    )
+    ciclo_service.registrar_consumidores_ciclo("EG001", barramento=barramento)
+
+    barramento.publicar(DecisaoSeguranca(1.0, {"aquecedor": (False, "motivo")}, CONFIG))
+
+    assert periodicos == []
+    assert [chave for chave, _, _ in fila.enfileirados] == ["StatusAtuadores"]
+    barramento.parar(timeout=1)
+
+
+def test_status_de_seguranca_nao_apaga_status_pendente(barramento, fila):
+    ciclo_service.registrar_consumidores_ciclo("EG001", barramento=barramento)
+
+    barramento.publicar(DecisaoSeguranca(1.0, {"aquecedor": (False, "motivo")}, CONFIG))
+    _, novos, mesclar = fila.enfileirados[-1]
+    pendentes = ({"bomba": (True, "motivo"), "aquecedor": (True, "motivo")},)
+
+    (status,) = mesclar(pendentes, novos)
+
+    assert status == {"bomba": (True, "motivo"), "aquecedor": (False, "motivo")}
+    barramento.parar(timeout=1)
@@ -0,0 +1,49 @@
+# testes/test_coleta_historico.py
+"""
+Regressão do histórico fora do caminho do controle: a coleta só atualiza a
+janela de médias em memória e publica AmostrasColetadas; rollups e SQLite
+ficam com o assinante em fila.
+
+Uso:
+    python -m pytest -q testes/test_coleta_historico.py
+"""
+
+import pytest
+
+from services import coleta_service, historico_local_service
+from services.eventos_service import SINCRONO, AmostrasColetadas, BarramentoEventos
+from services.rollup_service import motor_rollup
+
+
+@pytest.fixture
+def barramento(monkeypatch):
+    barramento = BarramentoEventos()
+    monkeypatch.setattr(coleta_service, "barramento_eventos", barramento)
+    return barramento
+
+
+def test_coleta_publica_amostras_sem_gravar_no_disco(barramento, monkeypatch):
+    recebidos = []
+    barramento.assinar(AmostrasColetadas, recebidos.append, modo=SINCRONO)
+
+    def proibido(*args, **kwargs):
+        raise AssertionError("histórico/rollup gravado na thread da coleta")
+
+    monkeypatch.setattr(historico_local_service, "obter_historico_local", proibido)
+    monkeypatch.setattr(motor_rollup, "adicionar", proibido)
+    antes = coleta_service.buffer_sensores.contagem("Temperatura")
+
+    amostras = [("Temperatura", 1000.0, 21.5), ("Umidade", 1000.0, 60.0)]
+    coleta_service._registrar_historico(amostras)
+
+    assert [evento.amostras for evento in recebidos] == [tuple(amostras)]
+    assert coleta_service.buffer_sensores.contagem("Temperatura") == antes + 1
+
+
+def test_coleta_sem_amostras_ainda_publica(barramento):
+    recebidos = []
+    barramento.assinar(AmostrasColetadas, recebidos.append, modo=SINCRONO)
+
+    coleta_service._registrar_historico([])
+
+    assert len(recebidos) == 1 and recebidos[0].amostras == ()
@@ -0,0 +1,264 @@
+# testes/test_configuracao_local.py
+"""
+Regressão da resolução da configuração (carregar_configuracao_local) contra
+um Firestore falso em memória: Standby, Colheita, overrides, metadados e a
+leitura em lote (um único get_all por chamada com o preset em cache).
+
+Uso:
+    python -m pytest -q testes/test_configuracao_local.py
+"""
+
+from datetime import datetime
+
+import pytest
+
+from config import configuracao_local
+from config.cache_presets import CachePresets
+from config.configuracao_local import carregar_configuracao_local
+
+
+# ===============================
+# Firestore falso
+# ===============================
+class _Snapshot:
+    def __init__(self, referencia, dados):
+        self.reference = referencia
+        self.exists = dados is not None
+        self._dados = dados
+
+    def to_dict(self):
+        return dict(self._dados) if self._dados is not None else None
+
+
+class _Referencia:
+    def __init__(self, banco, caminho):
+        self._banco = banco
+        self.path = caminho
+
+    def collection(self, nome):
+        return _Colecao(self._banco, f"{self.path}/{nome}")
+
+    def get(self):
+        self._banco.leituras.append(self.path)
+        return _Snapshot(self, self._banco.documentos.get(self.path))
+
+
+class _Colecao:
+    def __init__(self, banco, caminho):
+        self._banco = banco
+        self.path = caminho
+
+    def document(self, nome):
+        return _Referencia(self._banco, f"{self.path}/{nome}")
+
+
+class FirestoreFalso:
+    """Documentos por caminho; registra cada leitura e cada lote."""
+
+    def __init__(self, documentos):
+        self.documentos = documentos
+        self.leituras = []
+        self.lotes = []
+
+    def collection(self, nome):
+        return _Colecao(self, nome)
+
+    def get_all(self, referencias):
+        self.lotes.append([ref.path for ref in referencias])
+        for ref in referencias:
+            yield _Snapshot(ref, self.documentos.get(ref.path))
+
+
+PRESET_ALFACE = {
+    "TemperaturaDesejada": 22,
+    "UmidadeDesejada": 70,
+    "UmidadeDoSoloDesejada": 60,
+    "LuminosidadeDesejada": 12,
+    "DiasNaEtapa": 30,
+}
+
+
+def _documentos(estufa, overrides=None, preset=PRESET_ALFACE):
+    documentos = {"Dispositivos/EG001": estufa}
+    for categoria, dados in (overrides or {}).items():
+        documentos[f"Dispositivos/EG001/Dados/{categoria}"] = dados
+    if preset is not None:
+        documentos["Presets/Alface/Crescimento/Padrao"] = preset
+    return documentos
+
+
+@pytest.fixture(autouse=True)
+def _sem_chave_preset(monkeypatch):
+    monkeypatch.setattr(configuracao_local, "_ultima_chave_preset", None)
+
+
+@pytest.fixture
+def arquivo(tmp_path):
+    return str(tmp_path / "configuracao_ativa.json")
+
+
+def _carregar(db, arquivo, presets=None):
+    return carregar_configuracao_local(
+        "EG001", arquivo, db=db, presets=presets or CachePresets(db=db)
+    )
+
+
+# ===============================
+# Regras de resolução
+# ===============================
+def test_standby_retorna_config_minima_sem_preset(arquivo):
+    db = FirestoreFalso(_documentos({"PlantaAtual": "Standby", "FaseAtual": "X"}))
+
+    config = _carregar(db, arquivo)
+
+    assert config == {
+        "FaseAtual": "Standby",
+        "EstadoSistema": False,
+        "PlantaAtual": "Standby",
+    }
+    assert db.leituras == []
+    assert not any("Presets/" in caminho for lote in db.lotes for caminho in lote)
+
+
+def test_colheita_retorna_config_minima_com_planta(arquivo):
+    db = FirestoreFalso(
+        _documentos(
+            {"PlantaAtual": "Alface", "FaseAtual": "Colheita", "EstadoSistema": True}
+        )
+    )
+
+    config = _carregar(db, arquivo)
+
+    assert config == {
+        "FaseAtual": "Colheita",
+        "EstadoSistema": False,
+        "PlantaAtual": "Alface",
+    }
+    assert db.leituras == []
+
+
+def test_estufa_inexistente_retorna_none(arquivo):
+    db = FirestoreFalso({})
+
+    assert _carregar(db, arquivo) is None
+
+
+def test_preset_inexistente_retorna_none(arquivo):
+    db = FirestoreFalso(
+        _documentos({"PlantaAtual": "Alface", "FaseAtual": "Crescimento"}, preset=None)
+    )
+
+    assert _carregar(db, arquivo) is None
+
+
+def test_overrides_ativos_sobrescrevem_o_preset(arquivo):
+    estufa = {
+        "PlantaAtual": "Alface",
+        "FaseAtual": "Crescimento",
+        "OverrideTemperatura": True,
+        "OverrideUmidade": False,
+    }
+    overrides = {
+        "Temperatura": {"TemperaturaDesejada": 25},
+        "Umidade": {"UmidadeDesejada": 90},  # flag desligada → ignorado
+        "UmidadeDoSolo": {"UmidadeDoSoloDesejada": 10},  # sem flag → ignorado
+    }
+    db = FirestoreFalso(_documentos(estufa, overrides))
+
+    config = _carregar(db, arquivo)
+
+    assert config["TemperaturaDesejada"] == 25
+    assert config["UmidadeDesejada"] == PRESET_ALFACE["UmidadeDesejada"]
+    assert config["UmidadeDoSoloDesejada"] == PRESET_ALFACE["UmidadeDoSoloDesejada"]
+    assert config["DiasNaEtapa"] == PRESET_ALFACE["DiasNaEtapa"]
+
+
+def test_override_sem_valor_mantem_o_preset(arquivo):
+    estufa = {
+        "PlantaAtual": "Alface",
+        "FaseAtual": "Crescimento",
+        "OverrideLuminosidade": True,
+    }
+    db = FirestoreFalso(_documentos(estufa, {"Luminosidade": {"Outro": 1}}))
+
+    config = _carregar(db, arquivo)
+
+    assert config["LuminosidadeDesejada"] == PRESET_ALFACE["LuminosidadeDesejada"]
+
+
+def test_metadados_da_estufa(arquivo):
+    inicio = datetime(2025, 9, 1, 12, 30)
+    estufa = {
+        "PlantaAtual": "Alface",
+        "FaseAtual": "Crescimento",
+        "EstadoSistema": True,
+        "OverrideUmidadeDoSolo": True,
+        "ForcarAvancoFase": True,
+        "InicioFaseTimestamp": inicio,
+    }
+    db = FirestoreFalso(_documentos(estufa))
+
+    config = _carregar(db, arquivo)
+
+    assert config["EstadoSistema"] is True
+    assert config["PlantaAtual"] == "Alface"
+    assert config["FaseAtual"] == "Crescimento"
+    assert config["OverrideUmidadeDoSolo"] is True
+    assert config["OverrideTemperatura"] is False
+    assert config["ForcarAvancoFase"] is True
+    assert config["InicioFaseTimestamp"] == "2025-09-01T12:30:00+00:00"
+
+
+def test_timestamp_ausente_vira_none(arquivo):
+    db = FirestoreFalso(
+        _documentos({"PlantaAtual": "Alface", "FaseAtual": "Crescimento"})
+    )
+
+    assert _carregar(db, arquivo)["InicioFaseTimestamp"] is None
+
+
+# ===============================
+# Leitura em lote
+# ===============================
+def test_preset_em_cache_dispensa_leituras_extras(arquivo):
+    db = FirestoreFalso(
+        _documentos({"PlantaAtual": "Alface", "FaseAtual": "Crescimento"})
+    )
+    presets = CachePresets(db=db)
+
+    _carregar(db, arquivo, presets)
+    db.leituras.clear()
+    db.lotes.clear()
+    config = _carregar(db, arquivo, presets)
+
+    assert config["TemperaturaDesejada"] == PRESET_ALFACE["TemperaturaDesejada"]
+    assert db.leituras == []
+    assert len(db.lotes) == 1
+    assert len(db.lotes[0]) == 1 + len(configuracao_local.CAMPOS_OVERRIDE)
+
+
+def test_preset_presumido_entra_no_mesmo_lote(arquivo):
+    db = FirestoreFalso(
+        _documentos({"PlantaAtual": "Alface", "FaseAtual": "Crescimento"})
+    )
+
+    _carregar(db, arquivo)  # registra a última planta/fase
+    db.leituras.clear()
+    db.lotes.clear()
+    _carregar(db, arquivo, CachePresets(db=db))  # cache vazio
+
+    assert db.leituras == []
+    assert len(db.lotes) == 1
+    assert "Presets/Alface/Crescimento/Padrao" in db.lotes[0]
+
+
+def test_db_injetado_nao_usa_o_cliente_global(arquivo):
+    db = FirestoreFalso(
+        _documentos({"PlantaAtual": "Alface", "FaseAtual": "Crescimento"})
+    )
+
+    # sem `presets`: o cache é criado sobre o mesmo cliente
+    config = carregar_configuracao_local("EG001", arquivo, db=db)
+
+    assert config["PlantaAtual"] == "Alface"
+    assert db.leituras == ["Presets/Alface/Crescimento/Padrao"]
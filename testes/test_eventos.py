@@ -0,0 +1,66 @@
+# testes/test_eventos.py
+"""
+Regressão das filas do barramento de eventos: um assinante dedicado e sem
+limite (o histórico) não perde eventos quando o pool compartilhado trava, e
+a fila limitada continua descartando os mais antigos.
+
+Uso:
+    python -m pytest -q testes/test_eventos.py
+"""
+
+import threading
+
+import pytest
+
+from services.eventos_service import AmostrasColetadas, BarramentoEventos
+
+EVENTOS = 500
+
+
+@pytest.fixture
+def barramento():
+    barramento = BarramentoEventos(trabalhadores=1)
+    yield barramento
+    barramento.parar(timeout=2)
+
+
+@pytest.fixture
+def pool_travado(barramento):
+    """Assinante comum preso no único trabalhador do pool compartilhado."""
+    entrou, liberar = threading.Event(), threading.Event()
+
+    def travar(_):
+        entrou.set()
+        liberar.wait(5)
+
+    travado = barramento.assinar(AmostrasColetadas, travar, "travado", capacidade=10)
+    barramento.publicar(AmostrasColetadas(-1.0, ()))
+    assert entrou.wait(2)
+    yield travado
+    liberar.set()
+
+
+def test_assinante_dedicado_nao_perde_eventos(barramento, pool_travado):
+    recebidos = []
+    historico = barramento.assinar(
+        AmostrasColetadas,
+        recebidos.append,
+        "historico",
+        capacidade=None,
+        dedicado=True,
+    )
+
+    for i in range(EVENTOS):
+        barramento.publicar(AmostrasColetadas(float(i), ()))
+    assert historico.cancelar(timeout=2)
+
+    assert [evento.instante for evento in recebidos] == list(map(float, range(EVENTOS)))
+    assert historico.descartados == 0
+    assert pool_travado.descartados > 0
+
+
+def test_fila_limitada_descarta_os_mais_antigos(barramento, pool_travado):
+    for i in range(EVENTOS):
+        barramento.publicar(AmostrasColetadas(float(i), ()))
+
+    assert pool_travado.descartados == EVENTOS - pool_travado._fila.maxlen
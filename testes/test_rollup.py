@@ -0,0 +1,164 @@
+# testes/test_rollup.py
+"""
+Regressão da durabilidade dos rollups: blocos saem do motor assim que fecham
+(com o instante de liberação da agenda), os intervalos abertos sobrevivem a
+um reinício e a outbox só entrega registros liberados.
+
+Uso:
+    python -m pytest -q testes/test_rollup.py
+"""
+
+import sqlite3
+
+import pytest
+
+from services.rollup_service import MotorRollup
+from utils.outbox import Outbox
+
+DIA = 86400.0
+INICIO = 20000 * DIA  # meia-noite UTC
+METRICAS = ["Temperatura", "Umidade"]
+
+
+class RelogioFalso:
+    def __init__(self, agora=INICIO):
+        self.agora = agora
+
+    def __call__(self):
+        return self.agora
+
+
+def alimentar(motor, relogio, inicio, fim, passo=60.0):
+    """Uma amostra por métrica a cada `passo` s em [inicio, fim)."""
+    instante = inicio
+    while instante < fim:
+        relogio.agora = instante
+        motor.adicionar("Temperatura", 20.0 + (instante % 7), instante)
+        motor.adicionar("Umidade", 60.0 + (instante % 5), instante)
+        instante += passo
+
+
+@pytest.fixture
+def relogio():
+    return RelogioFalso()
+
+
+def test_bloco_sai_ao_fechar_com_liberacao_da_agenda(relogio):
+    motor = MotorRollup(METRICAS, relogio=relogio)
+
+    alimentar(motor, relogio, INICIO, INICIO + 16 * 60)
+    motor.processar()
+    blocos = motor.pendentes_envio()
+
+    assert [b["resolucao"] for b in blocos] == ["15min"]
+    assert blocos[0]["inicio"] == INICIO
+    assert blocos[0]["envio_em"] == INICIO + 3600  # próxima hora cheia
+    assert motor.pendentes_envio() == []
+
+
+def test_forcar_libera_os_blocos_ja(relogio):
+    motor = MotorRollup(METRICAS, relogio=relogio)
+
+    alimentar(motor, relogio, INICIO, INICIO + 16 * 60)
+    motor.processar()
+    blocos = motor.pendentes_envio(forcar=True)
+
+    assert blocos[0]["envio_em"] == relogio.agora
+
+
+def test_estado_restaurado_fecha_o_dia_completo(tmp_path, relogio):
+    caminho = str(tmp_path / "rollup_estado.json")
+    referencia = MotorRollup(METRICAS, relogio=relogio)
+    alimentar(referencia, relogio, INICIO, INICIO + DIA)
+    referencia.processar(INICIO + DIA)
+    dia_referencia = [
+        b for b in referencia.pendentes_envio() if b["resolucao"] == "1d"
+    ][0]
+
+    # Mesmo fluxo, com um reinício às 13h10
+    relogio.agora = INICIO
+    antes = MotorRollup(METRICAS, relogio=relogio, caminho_estado=caminho)
+    alimentar(antes, relogio, INICIO, INICIO + 13 * 3600 + 600)
+    antes.processar()
+    antes.pendentes_envio()
+    assert antes.salvar()
+
+    depois = MotorRollup(METRICAS, relogio=relogio, caminho_estado=caminho)
+    assert depois.carregar()
+    alimentar(depois, relogio, INICIO + 13 * 3600 + 600, INICIO + DIA)
+    depois.processar(INICIO + DIA)
+    dia = [b for b in depois.pendentes_envio() if b["resolucao"] == "1d"][0]
+
+    assert dia["metricas"] == dia_referencia["metricas"]
+    assert not dia["parcial"]
+
+
+def test_blocos_fechados_nao_retirados_entram_no_estado(tmp_path, relogio):
+    caminho = str(tmp_path / "rollup_estado.json")
+    antes = MotorRollup(METRICAS, relogio=relogio, caminho_estado=caminho)
+    alimentar(antes, relogio, INICIO, INICIO + 16 * 60)
+    antes.processar()  # 15 min fechado, ainda não retirado
+    antes.salvar()
+
+    depois = MotorRollup(METRICAS, relogio=relogio, caminho_estado=caminho)
+    depois.carregar()
+
+    assert [b["resolucao"] for b in depois.pendentes_envio()] == ["15min"]
+
+
+def test_boot_sem_estado_marca_intervalos_parciais(relogio):
+    motor = MotorRollup(METRICAS, relogio=relogio)
+
+    alimentar(motor, relogio, INICIO + 10 * 3600 + 1800, INICIO + DIA)
+    motor.processar(INICIO + DIA)
+    blocos = {
+        (b["resolucao"], b["inicio"]): b["parcial"] for b in motor.pendentes_envio()
+    }
+
+    assert blocos[("1d", INICIO)] is True
+    assert blocos[("1h", INICIO + 10 * 3600)] is True
+    assert blocos[("1h", INICIO + 11 * 3600)] is False
+    assert blocos[("15min", INICIO + 10 * 3600 + 1800)] is False
+
+
+def test_outbox_entrega_apenas_registros_liberados(tmp_path):
+    outbox = Outbox(str(tmp_path / "outbox.db"))
+    outbox.adicionar("a", "EG001", {"n": 1}, disponivel_em=1000.0)
+    outbox.adicionar("b", "EG001", {"n": 2})
+
+    assert [r[0] for r in outbox.pendentes(10, agora=999.0)] == ["b"]
+    outbox.remover(["b"])
+    assert outbox.pendentes(10, agora=999.0) == []
+    assert outbox.proxima_liberacao() == 1000.0
+    assert [r[0] for r in outbox.pendentes(10, agora=1000.0)] == ["a"]
+
+
+def test_outbox_antiga_ganha_coluna_de_liberacao(tmp_path):
+    caminho = str(tmp_path / "outbox.db")
+    conexao = sqlite3.connect(caminho)
+    conexao.execute(
+        "CREATE TABLE registros (id TEXT PRIMARY KEY, estufa_id TEXT NOT NULL, "
+        "dados TEXT NOT NULL, criado REAL NOT NULL, "
+        "tentativas INTEGER NOT NULL DEFAULT 0)"
+    )
+    conexao.execute("INSERT INTO registros VALUES ('x', 'EG001', '{}', 1.0, 0)")
+    conexao.commit()
+    conexao.close()
+
+    outbox = Outbox(caminho)
+
+    assert [r[0] for r in outbox.pendentes(10)] == ["x"]
+
+
+def test_amostra_atrasada_nao_reabre_intervalo_fechado(relogio):
+    motor = MotorRollup(METRICAS, relogio=relogio)
+
+    alimentar(motor, relogio, INICIO, INICIO + 15 * 60)
+    motor.processar(INICIO + 15 * 60 + 1)
+    motor.adicionar("Temperatura", 99.0, INICIO + 15 * 60 - 1)  # atrasada
+    alimentar(motor, relogio, INICIO + 15 * 60, INICIO + 31 * 60)
+    motor.processar()
+
+    blocos = [b for b in motor.pendentes_envio() if b["resolucao"] == "15min"]
+    assert [b["inicio"] for b in blocos] == [INICIO, INICIO + 15 * 60]
+    assert motor.descartadas == 1
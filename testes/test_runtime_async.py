@@ -0,0 +1,76 @@
+# testes/test_runtime_async.py
+"""
+Regressão dos temporizadores do runtime asyncio: GPIO (desligar a bomba)
+roda no executor do controle, separado das leituras de sensores, e prazos
+de calendário usam o seu próprio agendador.
+
+Uso:
+    python -m pytest -q testes/test_runtime_async.py
+"""
+
+import asyncio
+import threading
+from concurrent.futures import ThreadPoolExecutor
+
+import pytest
+
+from modules import hal
+
+
+@pytest.fixture(autouse=True)
+def _restaurar_agendadores():
+    yield
+    hal.definir_agendador(None)
+
+
+def test_tempo_real_usa_agendador_proprio():
+    chamadas = []
+    hal.definir_agendador(
+        lambda s, f: chamadas.append("gpio"),
+        tempo_real=lambda s, f: chamadas.append("calendario"),
+    )
+
+    hal.agendar_tempo_real(1, lambda: None)
+
+    assert chamadas == ["calendario"]
+
+
+def test_tempo_real_sem_agendador_proprio_usa_o_principal():
+    chamadas = []
+    hal.definir_agendador(lambda s, f: chamadas.append("gpio"))
+
+    hal.agendar_tempo_real(1, lambda: None)
+
+    assert chamadas == ["gpio"]
+
+
+def test_temporizador_roda_no_executor_do_controle():
+    from services.runtime_async_service import TemporizadorLaco
+
+    controle = ThreadPoolExecutor(1, thread_name_prefix="controle")
+    drivers = ThreadPoolExecutor(1, thread_name_prefix="driver")
+    ocupado = threading.Event()
+
+    async def executar():
+        laco = asyncio.get_running_loop()
+        # driver preso em uma leitura lenta
+        laco.run_in_executor(drivers, ocupado.wait, 5)
+        disparado = asyncio.Event()
+        threads = []
+
+        def desligar():
+            threads.append(threading.current_thread().name)
+            laco.call_soon_threadsafe(disparado.set)
+
+        TemporizadorLaco(laco, 0.01, desligar, controle)
+        await asyncio.wait_for(disparado.wait(), 1)
+        return threads
+
+    try:
+        threads = asyncio.run(executar())
+    finally:
+        ocupado.set()
+        controle.shutdown()
+        drivers.shutdown()
+
+    assert threads and threads[0].startswith("controle")
@@ -1,115 +1,132 @@
 # testes/teste_logger.py
-import time
-import csv
 import os
 from datetime import datetime
-from config.configuracao_local import carregar_configuracao_local
-from config.firebase_config import realtime_db, firestore_db
+from services.eventos_service import (
+    DecisaoAtuadores,
+    LeituraSensores,
+    barramento_eventos,
+)
+from utils.registro_rotativo import RegistroRotativo
 
 BASE_DIR = os.path.dirname(__file__)
-CSV_FILE = os.path.join(BASE_DIR, "fixtures", "dados_estufa.csv")
-
-ESTUFA_ID = "EG001"
-
-
-def inicializar_csv():
-    if not os.path.exists(CSV_FILE):
-        with open(CSV_FILE, mode="w", newline="") as f:
-            writer = csv.writer(f)
-            writer.writerow(
-                [
-                    "timestamp",
-                    "planta",
-                    "fase",
-                    "luminosidade",
-                    "temp_ar",
-                    "umid_ar",
-                    "temp_solo",
-                    "umid_solo",
-                    "aquecedor_estado",
-                    "aquecedor_motivo",
-                    "ventoinha_estado",
-                    "ventoinha_motivo",
-                    "luminaria_estado",
-                    "luminaria_motivo",
-                    "bomba_estado",
-                    "bomba_motivo",
-                ]
-            )
-
-
-def teste_logger():
-    inicializar_csv()
-    print("📝 Logger CSV iniciado (Realtime + Firestore).")
-
-    while True:
-        try:
-            # 🔹 Config da estufa (fase/planta)
-            config = carregar_configuracao_local(ESTUFA_ID)
-            if not config:
-                time.sleep(30)
-                continue
-
-            # 🔹 Sensores → Realtime DB
-            snapshot = realtime_db.child(f"Dispositivos/{ESTUFA_ID}/DadosAtuais").get()
-            if not snapshot:
-                print("⚠️ Nenhum dado encontrado no Realtime DB.")
-                time.sleep(10)
-                continue
-
-            sensores = {
-                "LuminosidadeAtual": snapshot.get("LuminosidadeAtual"),
-                "TemperaturaDoArAtual": snapshot.get("TemperaturaDoArAtual"),
-                "UmidadeDoArAtual": snapshot.get("UmidadeDoArAtual"),
-                "TemperaturaDoSoloAtual": snapshot.get("TemperaturaDoSoloAtual"),
-                "UmidadeDoSoloAtual": snapshot.get("UmidadeDoSoloAtual"),
-            }
-
-            # 🔹 Atuadores → Firestore
-            docs = (
-                firestore_db.collection("Dispositivos")
-                .document(ESTUFA_ID)
-                .collection("Dados")
-                .get()
-            )
-            atuadores = {
-                "Aquecedor": (None, None),
-                "Ventoinha": (None, None),
-                "Luminaria": (None, None),
-                "Bomba": (None, None),
-            }
-            for d in docs:
-                nome = d.id
-                dados = d.to_dict()
-                if nome in atuadores:
-                    atuadores[nome] = (dados.get("Estado"), dados.get("Motivo"))
-
-            # 🔹 Escreve no CSV
-            with open(CSV_FILE, mode="a", newline="") as f:
-                writer = csv.writer(f)
-                writer.writerow(
-                    [
-                        datetime.now().isoformat(),
-                        config.get("PlantaAtual"),
-                        config.get("FaseAtual"),
-                        sensores["LuminosidadeAtual"],
-                        sensores["TemperaturaDoArAtual"],
-                        sensores["UmidadeDoArAtual"],
-                        sensores["TemperaturaDoSoloAtual"],
-                        sensores["UmidadeDoSoloAtual"],
-                        atuadores["Aquecedor"][0],
-                        atuadores["Aquecedor"][1],
-                        atuadores["Ventoinha"][0],
-                        atuadores["Ventoinha"][1],
-                        atuadores["Luminaria"][0],
-                        atuadores["Luminaria"][1],
-                        atuadores["Bomba"][0],
-                        atuadores["Bomba"][1],
-                    ]
-                )
-
-            time.sleep(30)
-
-        except Exception as e:
-            print(f"⚠️ Erro no teste_logger: {e}")
-            time.sleep(30)
+# Segmentos "dados_estufa-AAAAMMDD-NNN.csv.gz" (+ colunas .npy por segmento)
+DIRETORIO_REGISTROS = os.path.join(BASE_DIR, "fixtures", "registros")
+PREFIXO_REGISTROS = "dados_estufa"
+
+# Colunas tipadas (.npy) para análise; False → apenas CSV
+GRAVAR_COLUNAS = True
+
+# Ciclos mantidos na fila do logger enquanto ele atrasa (ex.: SD lento)
+CAPACIDADE_FILA = 100
+
+SENSORES = (
+    "LuminosidadeAtual",
+    "TemperaturaDoArAtual",
+    "UmidadeDoArAtual",
+    "TemperaturaDoSoloAtual",
+    "UmidadeDoSoloAtual",
+)
+ATUADORES = ("Aquecedor", "Ventoinha", "Luminaria", "Bomba")
+
+CABECALHO = [
+    "timestamp",
+    "planta",
+    "fase",
+    "luminosidade",
+    "temp_ar",
+    "umid_ar",
+    "temp_solo",
+    "umid_solo",
+    "aquecedor_estado",
+    "aquecedor_motivo",
+    "ventoinha_estado",
+    "ventoinha_motivo",
+    "luminaria_estado",
+    "luminaria_motivo",
+    "bomba_estado",
+    "bomba_motivo",
+]
+
+# Colunas .npy: instante (epoch), sensores (float, NaN = ausente) e estado
+# dos atuadores (1 ligado, 0 desligado, -1 ausente)
+COLUNAS = (
+    [("instante", "<f8"), ("ciclo", "<i8"), ("versao_config", "<i8")]
+    + [(nome, "<f8") for nome in CABECALHO[3:8]]
+    + [(f"{nome.lower()}_estado", "|i1") for nome in ATUADORES]
+)
+
+
+def linha_evento(decisao, dados):
+    """
+    Converte as decisões de um ciclo (DecisaoAtuadores) e as leituras do
+    mesmo ciclo em uma linha do CSV, na mesma ordem do cabeçalho.
+    """
+    config = decisao.config or {}
+    linha = [
+        datetime.fromtimestamp(decisao.instante).isoformat(),
+        config.get("PlantaAtual"),
+        config.get("FaseAtual"),
+    ]
+    linha += [dados.get(sensor) for sensor in SENSORES]
+    for nome in ATUADORES:
+        linha += list(decisao.atuadores.get(nome) or (None, None))
+    return linha
+
+
+def colunas_evento(decisao, dados):
+    """Valores das colunas .npy de um ciclo."""
+    valores = {
+        "instante": decisao.instante,
+        "ciclo": decisao.ciclo,
+        "versao_config": getattr(decisao.config, "versao", None),
+    }
+    for nome, sensor in zip(CABECALHO[3:8], SENSORES):
+        valores[nome] = dados.get(sensor)
+    for nome in ATUADORES:
+        estado = (decisao.atuadores.get(nome) or (None, None))[0]
+        valores[f"{nome.lower()}_estado"] = estado
+    return valores
+
+
+def teste_logger(barramento=barramento_eventos, registro=None):
+    """
+    Grava uma linha por ciclo da estufa em segmentos CSV rotativos.
+
+    Assina LeituraSensores e DecisaoAtuadores no barramento de eventos
+    (assinante em fila: o ciclo não espera pela escrita) e junta os dois
+    eventos de cada ciclo; nenhuma leitura de rede. O arquivo fica aberto
+    com escrita bufferizada e fsync periódico; segmentos fechados são
+    comprimidos.
+
+    Parâmetros:
+        barramento (BarramentoEventos): origem dos eventos. Assinar antes de
+            iniciar o ciclo garante que o primeiro ciclo seja registrado.
+        registro (RegistroRotativo|None): destino das linhas
+            (default = DIRETORIO_REGISTROS, com colunas .npy se GRAVAR_COLUNAS).
+
+    Retorna:
+        Assinante: `cancelar()` grava o que estiver na fila e fecha o registro.
+    """
+    registro = registro or RegistroRotativo(
+        DIRETORIO_REGISTROS,
+        PREFIXO_REGISTROS,
+        CABECALHO,
+        colunas=COLUNAS if GRAVAR_COLUNAS else None,
+    )
+    leitura = {"ciclo": None, "dados": {}}
+
+    def registrar(evento):
+        if isinstance(evento, LeituraSensores):
+            leitura["ciclo"], leitura["dados"] = evento.ciclo, evento.dados
+            return
+        dados = leitura["dados"] if leitura["ciclo"] == evento.ciclo else {}
+        registro.registrar(linha_evento(evento, dados), colunas_evento(evento, dados))
+
+    print("📝 Logger CSV iniciado (eventos do ciclo).")
+    return barramento.assinar(
+        (LeituraSensores, DecisaoAtuadores),
+        registrar,
+        nome="logger",
+        capacidade=CAPACIDADE_FILA,
+        ao_encerrar=registro.fechar,
+    )
@@ -57,7 +57,8 @@ def exibir_dados_periodicos(dados):
         "Temperatura": float|None,
         "Umidade": float|None,
         "UmidadeDoSolo": float|None,
-        "timestamp": float
+        "timestamp": float,
+        "Estatisticas": {sensor: {"minimo", "maximo", "desvio_padrao", "amostras"}}
     }
     """
     hora = datetime.now().strftime("%H:%M:%S")
@@ -74,9 +75,19 @@ def exibir_dados_periodicos(dados):
             return f"{valor:.2f} Lux"
         return str(valor)
 
+    estatisticas = dados.get("Estatisticas") or {}
     for chave, valor in dados.items():
-        if chave != "timestamp":
-            print(f"📌 {chave:<25}: {formatar(chave, valor)}")
+        if chave in ("timestamp", "Estatisticas"):
+            continue
+        linha = f"📌 {chave:<25}: {formatar(chave, valor)}"
+        e = estatisticas.get(chave)
+        if e:
+            linha += (
+                f"  (mín {formatar(chave, e['minimo'])}, "
+                f"máx {formatar(chave, e['maximo'])}, "
+                f"σ {e['desvio_padrao']:.2f}, n={e['amostras']})"
+            )
+        print(linha)
 
     print("=" * 85)
 
@@ -0,0 +1,278 @@
+# utils/outbox.py
+"""
+Outbox durável (SQLite) para envios que não podem ser perdidos.
+
+Responsabilidades:
+- Gravar cada registro em disco ANTES de qualquer tentativa de envio.
+- Entregar os registros pendentes em lotes, na ordem de criação.
+- Reenviar em segundo plano com backoff exponencial enquanto a nuvem
+  estiver indisponível, drenando todo o acúmulo quando ela voltar.
+
+Cada registro tem um identificador determinístico (ex.: timestamp da janela),
+então reenvios sobrescrevem o mesmo documento e nunca criam duplicatas.
+
+Um registro pode ter um instante de liberação (`disponivel_em`): fica
+gravado em disco desde já, mas só é entregue a partir desse instante (ex.:
+resumos de 15 min gravados ao fechar e enviados de hora em hora).
+"""
+
+import json
+import sqlite3
+import threading
+import time
+
+
+class Outbox:
+    """
+    Fila persistente de registros pendentes.
+
+    Uso:
+        outbox = Outbox("/caminho/outbox.db")
+        outbox.adicionar("1725405678120", "EG001", {"Temperatura": 25.1})
+        for id_registro, estufa_id, dados in outbox.pendentes(100):
+            ...
+        outbox.remover([id_registro])
+    """
+
+    def __init__(self, caminho):
+        """
+        Parâmetros:
+            caminho (str): arquivo SQLite (criado se não existir).
+        """
+        self.caminho = caminho
+        self._lock = threading.Lock()
+        self._conexao = sqlite3.connect(
+            caminho, check_same_thread=False, isolation_level=None
+        )
+        self._conexao.execute("PRAGMA journal_mode=WAL")
+        self._conexao.execute("PRAGMA synchronous=NORMAL")
+        self._conexao.execute(
+            """
+            CREATE TABLE IF NOT EXISTS registros (
+                id TEXT PRIMARY KEY,
+                estufa_id TEXT NOT NULL,
+                dados TEXT NOT NULL,
+                criado REAL NOT NULL,
+                tentativas INTEGER NOT NULL DEFAULT 0,
+                disponivel_em REAL NOT NULL DEFAULT 0
+            )
+            """
+        )
+        # Outboxes criadas antes da coluna de liberação
+        colunas = {
+            linha[1] for linha in self._conexao.execute("PRAGMA table_info(registros)")
+        }
+        if "disponivel_em" not in colunas:
+            self._conexao.execute(
+                "ALTER TABLE registros "
+                "ADD COLUMN disponivel_em REAL NOT NULL DEFAULT 0"
+            )
+        self._conexao.execute(
+            "CREATE INDEX IF NOT EXISTS idx_registros_criado ON registros (criado)"
+        )
+
+    def adicionar(self, id_registro, estufa_id, dados, disponivel_em=0):
+        """
+        Grava um registro pendente (ignorado se o id já existir).
+
+        Parâmetros:
+            id_registro (str): identificador idempotente do registro.
+            estufa_id (str): Identificador único da estufa.
+            dados (dict): conteúdo serializável em JSON.
+            disponivel_em (float): instante (epoch) a partir do qual o
+                registro pode ser entregue (0 → imediatamente).
+
+        Retorna:
+            bool: True se o registro foi inserido.
+        """
+        with self._lock:
+            cursor = self._conexao.execute(
+                "INSERT OR IGNORE INTO registros "
+                "(id, estufa_id, dados, criado, disponivel_em) VALUES (?, ?, ?, ?, ?)",
+                (
+                    id_registro,
+                    estufa_id,
+                    json.dumps(dados),
+                    time.time(),
+                    disponivel_em,
+                ),
+            )
+            return cursor.rowcount > 0
+
+    def pendentes(self, limite, agora=None):
+        """
+        Retorna os registros liberados mais antigos ainda não enviados.
+
+        Parâmetros:
+            limite (int): número máximo de registros.
+            agora (float|None): instante de referência (default = time.time()).
+
+        Retorna:
+            list[tuple(str, str, dict)]: (id, estufa_id, dados).
+        """
+        agora = time.time() if agora is None else agora
+        with self._lock:
+            linhas = self._conexao.execute(
+                "SELECT id, estufa_id, dados FROM registros "
+                "WHERE disponivel_em <= ? ORDER BY criado LIMIT ?",
+                (agora, limite),
+            ).fetchall()
+        return [(id_, estufa_id, json.loads(dados)) for id_, estufa_id, dados in linhas]
+
+    def proxima_liberacao(self):
+        """
+        Instante de liberação mais próximo entre os registros pendentes.
+
+        Retorna:
+            float|None: epoch (s), ou None se a outbox estiver vazia.
+        """
+        with self._lock:
+            return self._conexao.execute(
+                "SELECT MIN(disponivel_em) FROM registros"
+            ).fetchone()[0]
+
+    def remover(self, ids):
+        """Remove registros confirmados pelo destino."""
+        if not ids:
+            return
+        with self._lock:
+            self._conexao.execute("BEGIN")
+            self._conexao.executemany(
+                "DELETE FROM registros WHERE id = ?", [(i,) for i in ids]
+            )
+            self._conexao.execute("COMMIT")
+
+    def registrar_falha(self, ids):
+        """Incrementa o contador de tentativas dos registros informados."""
+        if not ids:
+            return
+        with self._lock:
+            self._conexao.execute("BEGIN")
+            self._conexao.executemany(
+                "UPDATE registros SET tentativas = tentativas + 1 WHERE id = ?",
+                [(i,) for i in ids],
+            )
+            self._conexao.execute("COMMIT")
+
+    def tamanho(self):
+        """Número de registros pendentes."""
+        with self._lock:
+            return self._conexao.execute("SELECT COUNT(*) FROM registros").fetchone()[0]
+
+    def fechar(self):
+        """Fecha a conexão com o banco."""
+        with self._lock:
+            self._conexao.close()
+
+
+class ReenviadorOutbox:
+    """
+    Thread que drena a outbox em lotes, com backoff exponencial em falhas.
+
+    Uso:
+        reenviador = ReenviadorOutbox(outbox, enviar_lote, tamanho_lote=100)
+        reenviador.iniciar()
+        reenviador.sinalizar()  # após adicionar novos registros
+    """
+
+    def __init__(
+        self,
+        outbox,
+        enviar_lote,
+        tamanho_lote=100,
+        espera_inicial=5,
+        espera_maxima=600,
+        nome="outbox",
+    ):
+        """
+        Parâmetros:
+            outbox (Outbox): fila persistente a drenar.
+            enviar_lote (callable): recebe list[(id, estufa_id, dados)] e
+                retorna True se todos foram gravados no destino.
+            tamanho_lote (int): registros por chamada de `enviar_lote`.
+            espera_inicial (float): primeira espera após falha (s).
+            espera_maxima (float): teto do backoff (s).
+            nome (str): nome da thread (logs).
+        """
+        self.outbox = outbox
+        self.enviar_lote = enviar_lote
+        self.tamanho_lote = tamanho_lote
+        self.espera_inicial = espera_inicial
+        self.espera_maxima = espera_maxima
+        self.nome = nome
+
+        self._sinal = threading.Event()
+        self._parar = threading.Event()
+        self._thread = None
+        self._lock = threading.Lock()
+
+        self.lotes_enviados = 0
+        self.registros_enviados = 0
+        self.falhas = 0
+
+    def iniciar(self):
+        """Inicia a thread de reenvio (idempotente)."""
+        with self._lock:
+            if self._thread is None or not self._thread.is_alive():
+                self._parar.clear()
+                self._thread = threading.Thread(
+                    target=self._executar, name=f"reenvio-{self.nome}", daemon=True
+                )
+                self._thread.start()
+
+    def sinalizar(self):
+        """Acorda a thread para enviar novos registros imediatamente."""
+        self._sinal.set()
+
+    def parar(self, timeout=5):
+        """Encerra a thread de reenvio."""
+        self._parar.set()
+        self._sinal.set()
+        if self._thread:
+            self._thread.join(timeout)
+
+    def _executar(self):
+        espera = self.espera_inicial
+        while not self._parar.is_set():
+            try:
+                lote = self.outbox.pendentes(self.tamanho_lote)
+            except Exception as e:
+                print(f"⚠️ Erro ao ler outbox ({self.nome}): {e}")
+                lote = []
+
+            if not lote:
+                # Dorme até um novo registro ou a próxima liberação agendada
+                try:
+                    liberacao = self.outbox.proxima_liberacao()
+                except Exception as e:
+                    print(f"⚠️ Erro ao ler outbox ({self.nome}): {e}")
+                    liberacao = None
+                self._sinal.wait(
+                    max(0.0, liberacao - time.time()) if liberacao is not None else None
+                )
+                self._sinal.clear()
+                continue
+
+            ids = [id_registro for id_registro, _, _ in lote]
+            try:
+                ok = self.enviar_lote(lote)
+            except Exception as e:
+                print(f"⚠️ Erro ao reenviar outbox ({self.nome}): {e}")
+                ok = False
+
+            if ok:
+                self.outbox.remover(ids)
+                self.lotes_enviados += 1
+                self.registros_enviados += len(ids)
+                espera = self.espera_inicial
+                continue
+
+            # ⏳ Backoff exponencial (interrompido por parar(), não por sinalizar())
+            self.falhas += 1
+            self.outbox.registrar_falha(ids)
+            print(
+                f"⏳ Outbox ({self.nome}): {self.outbox.tamanho()} pendente(s), "
+                f"nova tentativa em {espera:.0f}s"
+            )
+            self._parar.wait(espera)
+            espera = min(espera * 2, self.espera_maxima)
@@ -0,0 +1,293 @@
+# utils/registro_rotativo.py
+"""
+Gravação de registros (logs de dados) em arquivos rotativos.
+
+Responsabilidades:
+- Manter o arquivo CSV aberto com escrita bufferizada e `fsync` periódico
+  (em vez de abrir/fechar o arquivo a cada linha).
+- Rotacionar por tamanho e por dia em segmentos
+  "{prefixo}-{AAAAMMDD}-{NNN}.csv"; segmentos fechados são comprimidos
+  (".csv.gz").
+- Opcionalmente, gravar colunas tipadas em formato .npy (um arquivo por
+  coluna, em "{segmento}/{coluna}.npy"), que podem ser mapeadas em memória
+  (`numpy.load(caminho, mmap_mode="r")`). Os .npy não são comprimidos para
+  continuarem mapeáveis.
+
+Após uma queda de energia, o cabeçalho de cada .npy reflete o último
+`sincronizar`; linhas gravadas depois disso são ignoradas na leitura.
+"""
+
+import ast
+import csv
+import glob
+import gzip
+import io
+import os
+import shutil
+import struct
+import time
+from array import array
+from datetime import datetime
+
+TAMANHO_MAXIMO_PADRAO = 8 * 1024 * 1024  # bytes por segmento CSV
+INTERVALO_FSYNC_PADRAO = 60.0  # s
+BUFFER_ESCRITA = 64 * 1024  # bytes
+
+# Cabeçalho .npy (versão 1.0) de tamanho fixo: o shape é reescrito no lugar
+_MAGICO_NPY = b"\x93NUMPY\x01\x00"
+_TAMANHO_CABECALHO_NPY = 128
+
+# Tipos aceitos nas colunas: dtype .npy → código do módulo array
+TIPOS_COLUNA = {"<f8": "d", "<f4": "f", "<i8": "q", "<i4": "i", "|i1": "b"}
+
+# Valor gravado para None em colunas inteiras (em float vira NaN)
+AUSENTE_INTEIRO = -1
+
+
+def _cabecalho_npy(dtype, linhas):
+    texto = f"{{'descr': '{dtype}', 'fortran_order': False, 'shape': ({linhas},), }}"
+    preenchimento = _TAMANHO_CABECALHO_NPY - len(_MAGICO_NPY) - 2 - len(texto) - 1
+    texto = texto + " " * preenchimento + "\n"
+    return _MAGICO_NPY + struct.pack("<H", len(texto)) + texto.encode("latin1")
+
+
+class ColunaNpy:
+    """Uma coluna tipada gravada incrementalmente em um arquivo .npy."""
+
+    def __init__(self, caminho, dtype):
+        """
+        Parâmetros:
+            caminho (str): arquivo .npy (sobrescrito).
+            dtype (str): tipo da coluna (ver TIPOS_COLUNA).
+        """
+        self.caminho = caminho
+        self.dtype = dtype
+        self._codigo = TIPOS_COLUNA[dtype]
+        self._pendentes = array(self._codigo)
+        self.linhas = 0
+        self._arquivo = open(caminho, "wb")
+        self._arquivo.write(_cabecalho_npy(dtype, 0))
+
+    def adicionar(self, valor):
+        if valor is None:
+            valor = float("nan") if self._codigo in "df" else AUSENTE_INTEIRO
+        elif self._codigo not in "df":
+            valor = int(valor)
+        self._pendentes.append(valor)
+
+    def sincronizar(self, fsync=False):
+        """Grava os valores pendentes e atualiza o shape do cabeçalho."""
+        if self._pendentes:
+            self._arquivo.seek(0, os.SEEK_END)
+            self._pendentes.tofile(self._arquivo)
+            self.linhas += len(self._pendentes)
+            self._pendentes = array(self._codigo)
+            self._arquivo.seek(0)
+            self._arquivo.write(_cabecalho_npy(self.dtype, self.linhas))
+        self._arquivo.flush()
+        if fsync:
+            os.fsync(self._arquivo.fileno())
+
+    def fechar(self):
+        self.sincronizar(fsync=True)
+        self._arquivo.close()
+
+
+def ler_npy(caminho):
+    """
+    Lê um .npy 1-D gravado por ColunaNpy sem depender do numpy.
+
+    Retorna:
+        array: valores da coluna (módulo array).
+    """
+    with open(caminho, "rb") as f:
+        if f.read(len(_MAGICO_NPY)) != _MAGICO_NPY:
+            raise ValueError(f"Arquivo .npy inválido: {caminho}")
+        (tamanho,) = struct.unpack("<H", f.read(2))
+        cabecalho = ast.literal_eval(f.read(tamanho).decode("latin1"))
+        valores = array(TIPOS_COLUNA[cabecalho["descr"]])
+        valores.fromfile(f, cabecalho["shape"][0])
+    return valores
+
+
+def ler_colunas(diretorio):
+    """
+    Lê todas as colunas .npy de um segmento.
+
+    Com numpy instalado, prefira `numpy.load(caminho, mmap_mode="r")`.
+
+    Retorna:
+        dict: coluna → array.
+    """
+    return {
+        os.path.splitext(os.path.basename(caminho))[0]: ler_npy(caminho)
+        for caminho in sorted(glob.glob(os.path.join(diretorio, "*.npy")))
+    }
+
+
+class RegistroRotativo:
+    """
+    Registro CSV rotativo com colunas .npy opcionais.
+
+    Uso:
+        registro = RegistroRotativo(
+            "/caminho/registros", "dados_estufa", ["timestamp", "temp_ar"],
+            colunas=[("instante", "<f8"), ("temp_ar", "<f8")],
+        )
+        registro.registrar(["2025-09-09T21:32:04", 22.3],
+                           {"instante": 1757453524.2, "temp_ar": 22.3})
+        registro.fechar()
+    """
+
+    def __init__(
+        self,
+        diretorio,
+        prefixo,
+        cabecalho,
+        colunas=None,
+        tamanho_maximo=TAMANHO_MAXIMO_PADRAO,
+        rotacao_diaria=True,
+        intervalo_fsync=INTERVALO_FSYNC_PADRAO,
+        comprimir=True,
+        relogio=time.time,
+    ):
+        """
+        Parâmetros:
+            diretorio (str): pasta dos segmentos (criada se não existir).
+            prefixo (str): prefixo dos arquivos (ex.: "dados_estufa").
+            cabecalho (list[str]): primeira linha de cada segmento CSV.
+            colunas (list[tuple(str, str)]|None): (nome, dtype) das colunas
+                .npy; None → apenas CSV.
+            tamanho_maximo (int): bytes do CSV que disparam a rotação.
+            rotacao_diaria (bool): abre um segmento novo a cada dia (local).
+            intervalo_fsync (float): intervalo mínimo entre fsyncs (s).
+            comprimir (bool): comprime (gzip) os segmentos CSV fechados.
+            relogio (callable): fonte de tempo.
+        """
+        self.diretorio = diretorio
+        self.prefixo = prefixo
+        self.cabecalho = list(cabecalho)
+        self.colunas = list(colunas or [])
+        self.tamanho_maximo = tamanho_maximo
+        self.rotacao_diaria = rotacao_diaria
+        self.intervalo_fsync = intervalo_fsync
+        self.comprimir = comprimir
+        self._relogio = relogio
+
+        self._arquivo = None
+        self._colunas = {}
+        self._dia = None
+        self._tamanho = 0
+        self._ultimo_fsync = 0.0
+        self.segmento = None
+        self.linhas = 0
+        self.rotacoes = 0
+        self.fsyncs = 0
+
+        os.makedirs(diretorio, exist_ok=True)
+        if self.comprimir:
+            # segmentos de uma execução anterior (ex.: queda de energia)
+            for caminho in glob.glob(os.path.join(diretorio, f"{prefixo}-*.csv")):
+                self._comprimir(caminho)
+
+    def _proximo_segmento(self, dia):
+        existentes = glob.glob(os.path.join(self.diretorio, f"{self.prefixo}-{dia}-*"))
+        numeros = [
+            int(os.path.basename(c)[len(self.prefixo) + 10 :][:3])
+            for c in existentes
+            if os.path.basename(c)[len(self.prefixo) + 10 :][:3].isdigit()
+        ]
+        numero = max(numeros) + 1 if numeros else 0
+        return os.path.join(self.diretorio, f"{self.prefixo}-{dia}-{numero:03d}")
+
+    def _abrir(self, agora):
+        self._dia = datetime.fromtimestamp(agora).strftime("%Y%m%d")
+        self.segmento = self._proximo_segmento(self._dia)
+        self._arquivo = open(
+            f"{self.segmento}.csv", "w", newline="", buffering=BUFFER_ESCRITA
+        )
+        self._tamanho = 0
+        self._escrever(self.cabecalho)
+        if self.colunas:
+            os.makedirs(self.segmento, exist_ok=True)
+            self._colunas = {
+                nome: ColunaNpy(os.path.join(self.segmento, f"{nome}.npy"), dtype)
+                for nome, dtype in self.colunas
+            }
+        self._ultimo_fsync = agora
+
+    def _escrever(self, campos):
+        texto = io.StringIO()
+        csv.writer(texto).writerow(campos)
+        linha = texto.getvalue()
+        self._arquivo.write(linha)
+        self._tamanho += len(linha.encode("utf-8"))
+
+    def _comprimir(self, caminho):
+        try:
+            with open(caminho, "rb") as origem, gzip.open(
+                f"{caminho}.gz", "wb"
+            ) as destino:
+                shutil.copyfileobj(origem, destino)
+            os.remove(caminho)
+        except Exception as e:
+            print(f"⚠️ Erro ao comprimir {caminho}: {e}")
+
+    def registrar(self, campos, valores_colunas=None):
+        """
+        Grava uma linha.
+
+        Parâmetros:
+            campos (list): valores da linha CSV (ordem do cabeçalho).
+            valores_colunas (dict|None): coluna → valor para os .npy
+                (colunas ausentes recebem NaN/AUSENTE_INTEIRO).
+        """
+        agora = self._relogio()
+        if self._arquivo is not None and (
+            self._tamanho >= self.tamanho_maximo
+            or (
+                self.rotacao_diaria
+                and datetime.fromtimestamp(agora).strftime("%Y%m%d") != self._dia
+            )
+        ):
+            self.rotacionar()
+        if self._arquivo is None:
+            self._abrir(agora)
+
+        self._escrever(campos)
+        valores_colunas = valores_colunas or {}
+        for nome, coluna in self._colunas.items():
+            coluna.adicionar(valores_colunas.get(nome))
+        self.linhas += 1
+
+        if agora - self._ultimo_fsync >= self.intervalo_fsync:
+            self.sincronizar()
+
+    def sincronizar(self):
+        """Descarrega o buffer e faz fsync do segmento atual."""
+        if self._arquivo is None:
+            return
+        self._arquivo.flush()
+        os.fsync(self._arquivo.fileno())
+        for coluna in self._colunas.values():
+            coluna.sincronizar(fsync=True)
+        self._ultimo_fsync = self._relogio()
+        self.fsyncs += 1
+
+    def rotacionar(self):
+        """Fecha (e comprime) o segmento atual; o próximo registro abre outro."""
+        if self._arquivo is None:
+            return
+        self.sincronizar()
+        self._arquivo.close()
+        for coluna in self._colunas.values():
+            coluna.fechar()
+        self._arquivo = None
+        self._colunas = {}
+        if self.comprimir:
+            self._comprimir(f"{self.segmento}.csv")
+        self.rotacoes += 1
+
+    def fechar(self):
+        """Fecha o segmento atual (comprimindo-o, se configurado)."""
+        self.rotacionar()
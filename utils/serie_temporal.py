@@ -0,0 +1,580 @@
+# utils/serie_temporal.py
+"""
+Armazenamento local de séries temporais (SQLite) com consulta reduzida.
+
+Responsabilidades:
+- Gravar amostras brutas (métrica, instante, valor) em lote, com índice por
+  (métrica, instante).
+- Compactação: amostras mais antigas que `compactar_apos` viram segmentos
+  de 1 hora por métrica (BLOB comprimido + mínimo/máximo/soma/contagem).
+- Retenção: segmentos e amostras mais antigos que `retencao` são apagados.
+- Consulta de intervalos reduzida a N pontos (o "agregado" é o caminho
+  rápido: milhões de pontos em milissegundos; o LTTB precisa de todos os
+  pontos e é linear no intervalo):
+    "agregado" → mínimo/máximo/média por balde (GROUP BY no SQLite para as
+                 amostras brutas; resumo do segmento quando ele cabe inteiro
+                 em um balde, sem descomprimir)
+    "lttb"     → Largest-Triangle-Three-Buckets sobre os pontos do intervalo
+    "bruto"    → todos os pontos
+
+Formato do segmento (zlib):
+    uint16[n]  → deltas de tempo em décimos de segundo (o 1º a partir do início)
+    int32[n]   → deltas do valor em centésimos (resolução 0.01)
+Leituras regulares e valores que variam pouco comprimem para poucos bytes
+por ponto. Cada segmento guarda também resumos de 5 min (mínimo, máximo,
+soma, contagem): consultas com baldes de 5 min ou mais são alinhadas a
+esses resumos e só descomprimem os segmentos das bordas do intervalo.
+"""
+
+import math
+import sqlite3
+import threading
+import time
+import zlib
+from array import array
+from bisect import bisect_left
+from itertools import accumulate
+
+DURACAO_SEGMENTO = 3600  # s
+SUBDIVISOES = 12  # resumos de 5 min dentro de cada segmento
+DURACAO_SUBDIVISAO = DURACAO_SEGMENTO // SUBDIVISOES
+ESCALA_TEMPO = 10  # décimos de segundo
+ESCALA_VALOR = 100  # centésimos
+
+COMPACTAR_APOS_PADRAO = 86400  # amostras brutas mantidas por 1 dia
+RETENCAO_PADRAO = 400 * 86400  # pouco mais de 1 ano
+INTERVALO_MANUTENCAO_PADRAO = 3600  # s
+
+
+def _codificar(pontos, inicio):
+    """Codifica [(t, v)] ordenados de um segmento em BLOB."""
+    tempos = array("H")
+    valores = array("i")
+    t_anterior = round(inicio * ESCALA_TEMPO)
+    v_anterior = 0
+    for t, v in pontos:
+        t_atual = round(t * ESCALA_TEMPO)
+        v_atual = round(v * ESCALA_VALOR)
+        tempos.append(min(65535, max(0, t_atual - t_anterior)))
+        valores.append(v_atual - v_anterior)
+        t_anterior, v_anterior = t_atual, v_atual
+    return zlib.compress(tempos.tobytes() + valores.tobytes(), 6)
+
+
+def _decodificar_colunas(blob, inicio, n):
+    """
+    Decodifica um BLOB de segmento em colunas (somas acumuladas em C).
+
+    Retorna:
+        tuple(list[float], list[float]): (instantes, valores).
+    """
+    bruto = zlib.decompress(blob)
+    tempos = array("H")
+    tempos.frombytes(bruto[: 2 * n])
+    valores = array("i")
+    valores.frombytes(bruto[2 * n :])
+    t0 = round(inicio * ESCALA_TEMPO)
+    instantes = [t / ESCALA_TEMPO for t in accumulate(tempos, initial=t0)][1:]
+    return instantes, [v / ESCALA_VALOR for v in accumulate(valores)]
+
+
+def _decodificar(blob, inicio, n):
+    """Decodifica um BLOB de segmento em [(t, v)]."""
+    return list(zip(*_decodificar_colunas(blob, inicio, n)))
+
+
+def _resumir(pontos, inicio):
+    """
+    Resumos das subdivisões de um segmento.
+
+    Retorna:
+        bytes: float64[SUBDIVISOES * 3] (mínimo, máximo, soma) +
+               uint16[SUBDIVISOES] (contagem).
+    """
+    estatisticas = array("d", [math.nan, math.nan, 0.0]) * SUBDIVISOES
+    contagens = array("H", [0]) * SUBDIVISOES
+    for t, v in pontos:
+        k = min(SUBDIVISOES - 1, int((t - inicio) // DURACAO_SUBDIVISAO))
+        if contagens[k]:
+            estatisticas[3 * k] = min(estatisticas[3 * k], v)
+            estatisticas[3 * k + 1] = max(estatisticas[3 * k + 1], v)
+        else:
+            estatisticas[3 * k] = estatisticas[3 * k + 1] = v
+        estatisticas[3 * k + 2] += v
+        contagens[k] += 1
+    return estatisticas.tobytes() + contagens.tobytes()
+
+
+def _ler_resumos(blob):
+    """Inverso de `_resumir`: list[(k, mínimo, máximo, soma, contagem)] não vazias."""
+    estatisticas = array("d")
+    estatisticas.frombytes(blob[: 24 * SUBDIVISOES])
+    contagens = array("H")
+    contagens.frombytes(blob[24 * SUBDIVISOES :])
+    return [
+        (k, estatisticas[3 * k], estatisticas[3 * k + 1], estatisticas[3 * k + 2], n)
+        for k, n in enumerate(contagens)
+        if n
+    ]
+
+
+def lttb(pontos, limite):
+    """
+    Reduz uma série a `limite` pontos preservando a forma visual
+    (Largest-Triangle-Three-Buckets).
+
+    Parâmetros:
+        pontos (list[tuple(float, float)]): (t, v) ordenados por t.
+        limite (int): número de pontos da saída (>= 3).
+
+    Retorna:
+        list[tuple(float, float)]
+    """
+    n = len(pontos)
+    if limite >= n or limite < 3:
+        return list(pontos)
+
+    saida = [pontos[0]]
+    largura = (n - 2) / (limite - 2)
+    a = 0
+    for i in range(limite - 2):
+        # média do próximo balde (terceiro vértice)
+        ini_prox = int((i + 1) * largura) + 1
+        fim_prox = min(int((i + 2) * largura) + 1, n)
+        if i == limite - 3:
+            fim_prox = n
+        trecho = pontos[ini_prox:fim_prox] or [pontos[-1]]
+        media_t = sum(p[0] for p in trecho) / len(trecho)
+        media_v = sum(p[1] for p in trecho) / len(trecho)
+
+        # ponto do balde atual que forma o maior triângulo
+        ta, va = pontos[a]
+        melhor, area_max = None, -1.0
+        for j in range(int(i * largura) + 1, int((i + 1) * largura) + 1):
+            tj, vj = pontos[j]
+            area = abs((ta - media_t) * (vj - va) - (ta - tj) * (media_v - va))
+            if area > area_max:
+                area_max, melhor = area, j
+        saida.append(pontos[melhor])
+        a = melhor
+
+    saida.append(pontos[-1])
+    return saida
+
+
+class SerieTemporal:
+    """
+    Séries temporais locais em um arquivo SQLite.
+
+    Uso:
+        serie = SerieTemporal("/caminho/series.db")
+        serie.gravar([("Temperatura", 1725405678.1, 25.3), ...])
+        serie.consultar("Temperatura", inicio, fim, pontos=300)
+        serie.manter()  # compactação + retenção (também automática)
+    """
+
+    def __init__(
+        self,
+        caminho,
+        compactar_apos=COMPACTAR_APOS_PADRAO,
+        retencao=RETENCAO_PADRAO,
+        intervalo_manutencao=INTERVALO_MANUTENCAO_PADRAO,
+        relogio=time.time,
+    ):
+        """
+        Parâmetros:
+            caminho (str): arquivo SQLite (criado se não existir).
+            compactar_apos (float): idade a partir da qual as amostras brutas
+                são compactadas em segmentos (s).
+            retencao (float): idade máxima dos dados (s).
+            intervalo_manutencao (float|None): intervalo entre manutenções
+                automáticas disparadas por `gravar` (None → só manual).
+            relogio (callable): fonte de tempo.
+        """
+        self.caminho = caminho
+        self.compactar_apos = compactar_apos
+        self.retencao = retencao
+        self.intervalo_manutencao = intervalo_manutencao
+        self._relogio = relogio
+        self._lock = threading.Lock()
+        self._proxima_manutencao = relogio() + (intervalo_manutencao or 0)
+
+        self._conexao = sqlite3.connect(
+            caminho, check_same_thread=False, isolation_level=None
+        )
+        # auto_vacuum só vale se definido antes da criação das tabelas.
+        # Segmentos ficam em tabela com rowid: linhas de ~1,5 KB caberiam
+        # mal em uma B-tree WITHOUT ROWID (páginas de overflow).
+        self._conexao.execute("PRAGMA auto_vacuum=INCREMENTAL")
+        self._conexao.execute("PRAGMA journal_mode=WAL")
+        self._conexao.execute("PRAGMA synchronous=NORMAL")
+        self._conexao.executescript(
+            """
+            CREATE TABLE IF NOT EXISTS metricas (
+                id INTEGER PRIMARY KEY,
+                nome TEXT NOT NULL UNIQUE
+            );
+            CREATE TABLE IF NOT EXISTS amostras (
+                metrica INTEGER NOT NULL,
+                t REAL NOT NULL,
+                v REAL NOT NULL,
+                PRIMARY KEY (metrica, t)
+            ) WITHOUT ROWID;
+            CREATE TABLE IF NOT EXISTS segmentos (
+                metrica INTEGER NOT NULL,
+                inicio REAL NOT NULL,
+                fim REAL NOT NULL,
+                n INTEGER NOT NULL,
+                minimo REAL NOT NULL,
+                maximo REAL NOT NULL,
+                soma REAL NOT NULL,
+                resumos BLOB NOT NULL,
+                dados BLOB NOT NULL,
+                PRIMARY KEY (metrica, inicio)
+            );
+            """
+        )
+        self._ids = dict(
+            (nome, id_)
+            for id_, nome in self._conexao.execute("SELECT id, nome FROM metricas")
+        )
+
+    # ------------------------------------------------------------------ escrita
+
+    def _id_metrica(self, nome):
+        id_ = self._ids.get(nome)
+        if id_ is None:
+            self._conexao.execute(
+                "INSERT OR IGNORE INTO metricas (nome) VALUES (?)", (nome,)
+            )
+            id_ = self._conexao.execute(
+                "SELECT id FROM metricas WHERE nome = ?", (nome,)
+            ).fetchone()[0]
+            self._ids[nome] = id_
+        return id_
+
+    def gravar(self, amostras):
+        """
+        Grava amostras em uma única transação.
+
+        Parâmetros:
+            amostras (list[tuple(str, float, float)]): (métrica, instante, valor);
+                valores None são ignorados e instantes repetidos sobrescrevem.
+
+        Retorna:
+            int: número de amostras gravadas.
+        """
+        with self._lock:
+            linhas = [
+                (self._id_metrica(nome), t, v)
+                for nome, t, v in amostras
+                if v is not None
+            ]
+            if linhas:
+                self._conexao.execute("BEGIN")
+                self._conexao.executemany(
+                    "INSERT OR REPLACE INTO amostras (metrica, t, v) VALUES (?, ?, ?)",
+                    linhas,
+                )
+                self._conexao.execute("COMMIT")
+
+        if (
+            self.intervalo_manutencao is not None
+            and self._relogio() >= self._proxima_manutencao
+        ):
+            self.manter()
+        return len(linhas)
+
+    # ------------------------------------------------------------- manutenção
+
+    def manter(self, agora=None):
+        """
+        Compacta amostras antigas em segmentos e aplica a retenção.
+
+        Retorna:
+            dict: {compactadas, segmentos, removidos}.
+        """
+        agora = self._relogio() if agora is None else agora
+        resultado = {"compactadas": 0, "segmentos": 0, "removidos": 0}
+        with self._lock:
+            if self.intervalo_manutencao is not None:
+                self._proxima_manutencao = agora + self.intervalo_manutencao
+            limite = (
+                math.floor((agora - self.compactar_apos) / DURACAO_SEGMENTO)
+                * DURACAO_SEGMENTO
+            )
+            corte = agora - self.retencao
+
+            self._conexao.execute("BEGIN")
+            try:
+                for id_ in list(self._ids.values()):
+                    compactadas, segmentos = self._compactar(id_, limite)
+                    resultado["compactadas"] += compactadas
+                    resultado["segmentos"] += segmentos
+                resultado["removidos"] += self._conexao.execute(
+                    "DELETE FROM segmentos WHERE fim <= ?", (corte,)
+                ).rowcount
+                resultado["removidos"] += self._conexao.execute(
+                    "DELETE FROM amostras WHERE t < ?", (corte,)
+                ).rowcount
+                self._conexao.execute("COMMIT")
+            except Exception:
+                self._conexao.execute("ROLLBACK")
+                raise
+            self._conexao.execute("PRAGMA incremental_vacuum")
+        return resultado
+
+    def _compactar(self, id_, limite):
+        """Move as amostras de `id_` anteriores a `limite` para segmentos."""
+        linhas = self._conexao.execute(
+            "SELECT t, v FROM amostras WHERE metrica = ? AND t < ? ORDER BY t",
+            (id_, limite),
+        ).fetchall()
+        if not linhas:
+            return 0, 0
+
+        grupos = {}
+        for t, v in linhas:
+            inicio = math.floor(t / DURACAO_SEGMENTO) * DURACAO_SEGMENTO
+            grupos.setdefault(inicio, []).append((t, v))
+
+        for inicio, pontos in grupos.items():
+            existente = self._conexao.execute(
+                "SELECT n, dados FROM segmentos WHERE metrica = ? AND inicio = ?",
+                (id_, inicio),
+            ).fetchone()
+            if existente:
+                # amostras atrasadas: mescla com o segmento já compactado
+                pontos = sorted(
+                    dict(
+                        _decodificar(existente[1], inicio, existente[0]) + pontos
+                    ).items()
+                )
+            # resumos com os valores já na resolução gravada
+            pontos = [(t, round(v * ESCALA_VALOR) / ESCALA_VALOR) for t, v in pontos]
+            valores = [v for _, v in pontos]
+            self._conexao.execute(
+                "INSERT OR REPLACE INTO segmentos "
+                "(metrica, inicio, fim, n, minimo, maximo, soma, resumos, dados) "
+                "VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?)",
+                (
+                    id_,
+                    inicio,
+                    inicio + DURACAO_SEGMENTO,
+                    len(pontos),
+                    min(valores),
+                    max(valores),
+                    sum(valores),
+                    _resumir(pontos, inicio),
+                    _codificar(pontos, inicio),
+                ),
+            )
+
+        self._conexao.execute(
+            "DELETE FROM amostras WHERE metrica = ? AND t < ?", (id_, limite)
+        )
+        return len(linhas), len(grupos)
+
+    # --------------------------------------------------------------- consulta
+
+    def metricas(self):
+        """Nomes das métricas gravadas."""
+        with self._lock:
+            return sorted(self._ids)
+
+    def _segmentos(self, id_, inicio, fim, colunas):
+        return self._conexao.execute(
+            f"SELECT inicio, fim, n, {colunas} FROM segmentos "
+            "WHERE metrica = ? AND inicio < ? AND fim > ? ORDER BY inicio",
+            (id_, fim, inicio),
+        ).fetchall()
+
+    def pontos(self, metrica, inicio, fim):
+        """
+        Todos os pontos de uma métrica em [inicio, fim).
+
+        Retorna:
+            list[tuple(float, float)]: (t, v) ordenados por t.
+        """
+        with self._lock:
+            id_ = self._ids.get(metrica)
+            if id_ is None:
+                return []
+            pontos = []
+            for seg_inicio, _, n, dados in self._segmentos(id_, inicio, fim, "dados"):
+                instantes, valores = _decodificar_colunas(dados, seg_inicio, n)
+                de = bisect_left(instantes, inicio)
+                ate = bisect_left(instantes, fim)
+                pontos.extend(zip(instantes[de:ate], valores[de:ate]))
+            pontos.extend(
+                self._conexao.execute(
+                    "SELECT t, v FROM amostras WHERE metrica = ? AND t >= ? AND t < ? "
+                    "ORDER BY t",
+                    (id_, inicio, fim),
+                ).fetchall()
+            )
+        pontos.sort()
+        return pontos
+
+    def consultar(self, metrica, inicio, fim, pontos=500, metodo="agregado"):
+        """
+        Consulta um intervalo reduzido a no máximo `pontos` pontos.
+
+        Parâmetros:
+            metrica (str): nome da métrica.
+            inicio (float): epoch (s) inicial, inclusivo.
+            fim (float): epoch (s) final, exclusivo.
+            pontos (int): número de baldes (agregado) ou de pontos (lttb).
+            metodo (str): "agregado", "lttb" ou "bruto".
+
+        Retorna:
+            "agregado" → list[tuple(float, float, float, float, int)]:
+                         (início do balde, média, mínimo, máximo, amostras),
+                         apenas baldes com amostras. Baldes de 5 min ou
+                         mais são alinhados a múltiplos de 5 min (o primeiro
+                         pode começar antes de `inicio`).
+            "lttb"/"bruto" → list[tuple(float, float)]: (t, v).
+        """
+        if metodo == "bruto":
+            return self.pontos(metrica, inicio, fim)
+        if metodo == "lttb":
+            return lttb(self.pontos(metrica, inicio, fim), pontos)
+        if metodo != "agregado":
+            raise ValueError(f"Método de consulta desconhecido: {metodo}")
+        if fim <= inicio or pontos < 1:
+            return []
+
+        # Baldes de 5 min ou mais são alinhados aos resumos dos segmentos:
+        # o primeiro balde começa no múltiplo de 5 min anterior a `inicio`
+        largura = (fim - inicio) / pontos
+        origem = inicio
+        alinhado = largura >= DURACAO_SUBDIVISAO
+        if alinhado:
+            origem = math.floor(inicio / DURACAO_SUBDIVISAO) * DURACAO_SUBDIVISAO
+            largura = math.ceil(largura / DURACAO_SUBDIVISAO) * DURACAO_SUBDIVISAO
+            while math.ceil((fim - origem) / largura) > pontos:
+                largura += DURACAO_SUBDIVISAO
+        baldes = {}  # índice → [soma, mínimo, máximo, contagem]
+
+        def acumular(indice, soma, minimo, maximo, n):
+            balde = baldes.get(indice)
+            if balde is None:
+                baldes[indice] = [soma, minimo, maximo, n]
+            else:
+                balde[0] += soma
+                balde[1] = min(balde[1], minimo)
+                balde[2] = max(balde[2], maximo)
+                balde[3] += n
+
+        with self._lock:
+            id_ = self._ids.get(metrica)
+            if id_ is None:
+                return []
+
+            for (
+                seg_inicio,
+                seg_fim,
+                n,
+                minimo,
+                maximo,
+                soma,
+                resumos,
+            ) in self._segmentos(id_, origem, fim, "minimo, maximo, soma, resumos"):
+                interno = seg_inicio >= origem and seg_fim <= fim
+                primeiro = int((seg_inicio - origem) // largura)
+                ultimo = int((seg_fim - origem - 1e-9) // largura)
+                if interno and primeiro == ultimo:
+                    acumular(primeiro, soma, minimo, maximo, n)
+                    continue
+                if interno and alinhado:
+                    for k, minimo, maximo, soma, n in _ler_resumos(resumos):
+                        inicio_sub = seg_inicio + k * DURACAO_SUBDIVISAO
+                        acumular(
+                            int((inicio_sub - origem) // largura),
+                            soma,
+                            minimo,
+                            maximo,
+                            n,
+                        )
+                    continue
+                # segmento nas bordas do intervalo: descomprime só este e
+                # agrega fatias contíguas (uma por balde)
+                dados = self._conexao.execute(
+                    "SELECT dados FROM segmentos WHERE metrica = ? AND inicio = ?",
+                    (id_, seg_inicio),
+                ).fetchone()[0]
+                instantes, valores = _decodificar_colunas(dados, seg_inicio, n)
+                for indice in range(max(primeiro, 0), ultimo + 1):
+                    de = bisect_left(instantes, max(origem + indice * largura, origem))
+                    ate = bisect_left(
+                        instantes, min(origem + (indice + 1) * largura, fim)
+                    )
+                    if ate > de:
+                        fatia = valores[de:ate]
+                        acumular(indice, sum(fatia), min(fatia), max(fatia), ate - de)
+
+            for indice, minimo, maximo, soma, n in self._conexao.execute(
+                "SELECT CAST((t - ?) / ? AS INTEGER) AS b, MIN(v), MAX(v), SUM(v), "
+                "COUNT(*) FROM amostras WHERE metrica = ? AND t >= ? AND t < ? "
+                "GROUP BY b",
+                (origem, largura, id_, origem, fim),
+            ):
+                acumular(indice, soma, minimo, maximo, n)
+
+        return [
+            (origem + indice * largura, soma / n, minimo, maximo, n)
+            for indice, (soma, minimo, maximo, n) in sorted(baldes.items())
+        ]
+
+    # ------------------------------------------------------------- utilidades
+
+    def contagem(self):
+        """
+        Retorna:
+            dict: {brutas, segmentos, pontos_compactados, bytes_segmentos}.
+        """
+        with self._lock:
+            brutas = self._conexao.execute("SELECT COUNT(*) FROM amostras").fetchone()[
+                0
+            ]
+            segmentos, compactados, bytes_segmentos = self._conexao.execute(
+                "SELECT COUNT(*), COALESCE(SUM(n), 0), COALESCE(SUM(LENGTH(dados)), 0) "
+                "FROM segmentos"
+            ).fetchone()
+        return {
+            "brutas": brutas,
+            "segmentos": segmentos,
+            "pontos_compactados": compactados,
+            "bytes_segmentos": bytes_segmentos,
+        }
+
+    def tamanho_em_disco(self):
+        """Tamanho do banco em bytes (páginas em uso, após checkpoint do WAL)."""
+        with self._lock:
+            self._conexao.execute("PRAGMA wal_checkpoint(TRUNCATE)")
+            paginas = self._conexao.execute("PRAGMA page_count").fetchone()[0]
+            livres = self._conexao.execute("PRAGMA freelist_count").fetchone()[0]
+            tamanho = self._conexao.execute("PRAGMA page_size").fetchone()[0]
+        return (paginas - livres) * tamanho
+
+    def tamanho_tabelas(self):
+        """
+        Bytes ocupados por tabela (requer o módulo dbstat do SQLite).
+
+        Retorna:
+            dict: tabela → bytes ({} se dbstat não estiver disponível).
+        """
+        with self._lock:
+            try:
+                return dict(
+                    self._conexao.execute(
+                        "SELECT name, SUM(pgsize) FROM dbstat GROUP BY name"
+                    ).fetchall()
+                )
+            except sqlite3.Error:
+                return {}
+
+    def fechar(self):
+        """Fecha a conexão com o banco."""
+        with self._lock:
+            self._conexao.close()